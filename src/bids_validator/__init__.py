@@ -4,6 +4,15 @@ from .bids_validator import BIDSValidator
 
 __all__ = ['BIDSValidator']
 
-from . import _version
 
-__version__ = _version.get_versions()['version']
+def __getattr__(name: str) -> str:
+    # Computing the version may call git, so only do it on request
+    if name == '__version__':
+        from . import _version
+
+        version: str = _version.get_versions()['version']
+        globals()['__version__'] = version
+        return version
+
+    msg = f'Module {__name__!r} has no attribute {name!r}'
+    raise AttributeError(msg)
@@ -1,5 +1,6 @@
 # ruff: noqa: D100
 # ruff: noqa: D103
+from __future__ import annotations
 
 try:
     import typer
@@ -8,19 +9,26 @@ except ImportError:
     raise SystemExit(1) from None
 
 import sys
-from collections.abc import Iterator
 from typing import Annotated
 
-from bidsschematools.schema import load_schema
-from bidsschematools.types.context import Subject
-from bidsschematools.types.namespace import Namespace
-
 from bids_validator import BIDSValidator
-from bids_validator.context import Context, Dataset, Sessions
-from bids_validator.types.files import FileTree
+
+# Schema, context and file tree modules are imported on use, to keep startup fast
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from bidsschematools.types.context import Subject
+    from bidsschematools.types.namespace import Namespace
+
+    from bids_validator.context import Context, Dataset
+    from bids_validator.types.files import FileTree
 
 app = typer.Typer()
 
+# Dataset and validator of a worker process, set once by _init_worker
+_WORKER: tuple[Dataset, BIDSValidator] | None = None
+
 
 def is_subject_dir(tree: FileTree) -> bool:
     return tree.name.startswith('sub-')
@@ -42,8 +50,12 @@ def walk(tree: FileTree, dataset: Dataset, subject: Subject | None = None) -> It
         object containing subject and session info
 
     """
+    from bidsschematools.types.context import Subject
+
+    from bids_validator.context import Context, Sessions
+
     if subject is None and is_subject_dir(tree):
-        subject = Subject(Sessions(tree))
+        subject = Subject(Sessions(tree, dataset.cache))
 
     for child in tree.children.values():
         if child.is_dir:
@@ -52,7 +64,73 @@ def walk(tree: FileTree, dataset: Dataset, subject: Subject | None = None) -> It
             yield Context(child, dataset, subject)
 
 
-def validate(tree: FileTree, schema: Namespace) -> None:
+def check_files(files: Iterable[Context], validator: BIDSValidator) -> Iterator[str]:
+    """Describe the problems with each file, in order."""
+    for file in files:
+        if not validator.is_bids(file.path):
+            yield f'{file.path} is not a valid bids filename'
+
+
+def _init_worker(tree: FileTree, schema: Namespace) -> None:
+    """Load the dataset and compile the filename rules once per worker process."""
+    global _WORKER
+    from bids_validator.context import Dataset
+
+    # Required under spawn and forkserver; a no-op in workers forked after compilation
+    BIDSValidator._init_regexes()
+    _WORKER = (Dataset(tree, schema), BIDSValidator())
+
+
+def _check_subject(name: str) -> list[str]:
+    """Check the files of one subject directory in a worker process."""
+    if _WORKER is None:
+        raise RuntimeError('Worker process was not initialized')
+    dataset, validator = _WORKER
+    return list(check_files(walk(dataset.tree.children[name], dataset), validator))
+
+
+def check_dataset(dataset: Dataset, validator: BIDSValidator, *, jobs: int = 1) -> Iterator[str]:
+    """Describe the problems with each file of a dataset, in the order of :func:`walk`.
+
+    With several jobs, subject directories are checked in a pool of
+    processes, while the rest of the dataset is checked in this process.
+    Results are yielded in the same order as when checking serially.
+
+    """
+    if jobs <= 1:
+        yield from check_files(walk(dataset.tree, dataset), validator)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    from bids_validator.context import Context
+
+    tree = dataset.tree
+    # Workers compile the rules in _init_worker, as spawned and forkserver workers do
+    # not inherit them. Compiling here serves this process, and lets forked workers skip it.
+    BIDSValidator._init_regexes()
+    with ProcessPoolExecutor(
+        jobs, initializer=_init_worker, initargs=(tree, dataset.schema)
+    ) as executor:
+        # Subtrees refer to the whole tree, so workers are sent directory names
+        subjects = [
+            name for name, child in tree.children.items() if child.is_dir and is_subject_dir(child)
+        ]
+        # Results are returned in order; batches amortize the cost of passing them back
+        results = executor.map(
+            _check_subject, subjects, chunksize=max(1, len(subjects) // (4 * jobs))
+        )
+        sharded = set(subjects)
+        for name, child in tree.children.items():
+            if name in sharded:
+                yield from next(results)
+            elif child.is_dir:
+                yield from check_files(walk(child, dataset), validator)
+            else:
+                yield from check_files([Context(child, dataset, None)], validator)
+
+
+def validate(tree: FileTree, schema: Namespace, *, jobs: int = 1) -> None:
     """Check if the file path is BIDS compliant.
 
     Parameters
@@ -61,14 +139,17 @@ def validate(tree: FileTree, schema: Namespace) -> None:
         Full FileTree object to iterate over and check
     schema : Namespace
         Schema object to validate dataset against
+    jobs : int
+        Number of processes to check subject directories in. Output is
+        identical to that of a single process.
 
     """
-    validator = BIDSValidator()
-    dataset = Dataset(tree, schema)
+    from bids_validator.context import Dataset
 
-    for file in walk(tree, dataset):
-        if not validator.is_bids(file.path):
-            print(f'{file.path} is not a valid bids filename')
+    validator = BIDSValidator()
+    with Dataset(tree, schema) as dataset:
+        for message in check_dataset(dataset, validator, jobs=jobs):
+            print(message)
 
 
 def show_version() -> None:
@@ -102,6 +183,15 @@ def main(
     bids_path: str,
     schema_path: str | None = None,
     verbose: Annotated[bool, typer.Option('--verbose', '-v', help='Show verbose output')] = False,
+    jobs: Annotated[
+        int,
+        typer.Option(
+            '--jobs',
+            '-j',
+            min=1,
+            help='Number of processes to validate subject directories in',
+        ),
+    ] = 1,
     version: Annotated[
         bool,
         typer.Option(
@@ -112,6 +202,10 @@ def main(
         ),
     ] = False,
 ) -> None:
+    from bidsschematools.schema import load_schema
+
+    from bids_validator.types.files import FileTree
+
     if verbose:
         show_version()
 
@@ -119,7 +213,7 @@ def main(
 
     schema = load_schema(schema_path)
 
-    validate(root_path, schema)
+    validate(root_path, schema, jobs=jobs)
 
 
 if __name__ == '__main__':
@@ -2,20 +2,21 @@
 
 from __future__ import annotations
 
-import logging
+import heapq
 import os
 import re
 from functools import lru_cache
 from itertools import chain
 
-import bidsschematools as bst
-import bidsschematools.rules
-import bidsschematools.schema
-import bidsschematools.utils
-import bidsschematools.validator
-
 from .types import _typings as t
 
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import logging
+
+# Minimum number of distinct paths for parse_many to shard across processes
+POOL_THRESHOLD = 50_000
+
 
 class LoggingContext:
     # From logging cookbook (CC0):
@@ -79,7 +80,15 @@ class BIDSValidator:
     checking whether a file path is compatible with BIDS.
     """
 
-    regexes = None
+    regexes: list[str] | None = None
+    _line_regexes: list[re.Pattern[str]] | None = None
+
+    # State for adaptive rule ordering, see enable_adaptive_ordering()
+    _rule_order: list[int] | None = None
+    _rule_hits: list[int] | None = None
+    _rule_overlaps: list[list[int]] | None = None
+    _reorder_interval = 0
+    _parses_until_reorder = 0
 
     def __init__(self, index_associated: bool = True) -> None:
         """Initialize BIDSValidator object.
@@ -98,6 +107,14 @@ class BIDSValidator:
     @classmethod
     def _init_regexes(cls) -> None:
         if cls.regexes is None:
+            # Defer loading schema tools until first use, for fast imports
+            import logging
+
+            import bidsschematools as bst
+            import bidsschematools.rules
+            import bidsschematools.schema
+            import bidsschematools.utils
+
             with LoggingContext(bst.utils.get_logger(), level=logging.WARNING):
                 schema = bst.schema.load_schema()
 
@@ -107,6 +124,88 @@ class BIDSValidator:
             )
             cls.regexes = [rule['regex'] for rule in all_rules]
 
+    @classmethod
+    def enable_adaptive_ordering(cls, interval: int = 10_000) -> None:
+        """Try the most frequently matched rules first in :meth:`parse`.
+
+        The number of paths matched by each rule is counted, and every
+        ``interval`` parses, rules are reordered by decreasing hit count.
+        A rule is never moved ahead of a preceding rule that may match the
+        same paths, so the results of :meth:`parse` do not change.
+
+        Parameters
+        ----------
+        interval : int
+            Number of parsed paths between reorderings. Defaults to 10000.
+
+        """
+        from .filenames import FilenameParser
+
+        cls._init_regexes()
+        assert cls.regexes is not None  # noqa: S101
+
+        overlaps = FilenameParser().overlapping_rules()
+        if len(overlaps) != len(cls.regexes):
+            raise RuntimeError('Schema rule tables do not match filename regexes')
+
+        cls._rule_overlaps = overlaps
+        cls._rule_hits = [0] * len(cls.regexes)
+        cls._rule_order = list(range(len(cls.regexes)))
+        cls._reorder_interval = cls._parses_until_reorder = interval
+
+    @classmethod
+    def disable_adaptive_ordering(cls) -> None:
+        """Restore schema order of rules in :meth:`parse` and discard rule statistics."""
+        cls._rule_order = cls._rule_hits = cls._rule_overlaps = None
+
+    @classmethod
+    def rule_hits(cls) -> dict[int, int]:
+        """Report the number of paths matched by each rule with adaptive ordering.
+
+        Returns
+        -------
+        dict
+            Hit counts of rules that matched at least one path, in decreasing
+            order. Keys are indices into :attr:`regexes`.
+
+        """
+        if cls._rule_hits is None:
+            return {}
+        hits = sorted(enumerate(cls._rule_hits), key=lambda item: -item[1])
+        return {index: count for index, count in hits if count}
+
+    @classmethod
+    def _reorder_rules(cls) -> None:
+        """Order rules by decreasing hits, keeping overlapping rules in schema order."""
+        hits, overlaps = cls._rule_hits, cls._rule_overlaps
+        if hits is None or overlaps is None:
+            return
+
+        blockers = [len(preceding) for preceding in overlaps]
+        blocking: list[list[int]] = [[] for _ in overlaps]
+        for index, preceding in enumerate(overlaps):
+            for prev in preceding:
+                blocking[prev].append(index)
+
+        # A rule is as urgent as the most frequently hit rule it holds back
+        priority = list(hits)
+        for index in reversed(range(len(priority))):
+            for following in blocking[index]:
+                priority[index] = max(priority[index], priority[following])
+
+        ready = [(-priority[index], index) for index, count in enumerate(blockers) if not count]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            _, index = heapq.heappop(ready)
+            order.append(index)
+            for following in blocking[index]:
+                blockers[following] -= 1
+                if not blockers[following]:
+                    heapq.heappush(ready, (-priority[following], following))
+
+        cls._rule_order = order
+
     @classmethod
     def parse(cls, path: str) -> dict[str, str]:
         """Parse a file path into a dictionary of BIDS entities.
@@ -162,6 +261,9 @@ class BIDSValidator:
                 ' and must include a leading forward slash `/`.'
             )
 
+        if cls._rule_order is not None:
+            return cls._parse_adaptive(path[1:])
+
         for regex in cls.regexes:
             match = re.match(regex, path[1:])
             if match:
@@ -169,6 +271,169 @@ class BIDSValidator:
 
         return {}
 
+    @classmethod
+    def _parse_adaptive(cls, relpath: str) -> dict[str, str]:
+        """Match a path against rules in adaptive order, counting hits."""
+        regexes, order, hits = cls.regexes, cls._rule_order, cls._rule_hits
+        assert regexes is not None  # noqa: S101
+        assert order is not None  # noqa: S101
+        assert hits is not None  # noqa: S101
+
+        result = {}
+        for index in order:
+            match = re.match(regexes[index], relpath)
+            if match:
+                hits[index] += 1
+                result = {k: v for k, v in match.groupdict().items() if v is not None}
+                break
+
+        cls._parses_until_reorder -= 1
+        if cls._parses_until_reorder <= 0:
+            cls._parses_until_reorder = cls._reorder_interval
+            cls._reorder_rules()
+
+        return result
+
+    @classmethod
+    def _init_line_regexes(cls) -> None:
+        """Compile rule regexes to match whole lines of a newline-joined listing."""
+        if cls._line_regexes is None:
+            if cls.regexes is None:
+                cls._init_regexes()
+                assert cls.regexes is not None  # noqa: S101
+
+            cls._line_regexes = []
+            for regex in cls.regexes:
+                # Inline DOTALL flags (from fnmatch) would allow matches to span lines
+                pattern = regex.removesuffix(r'\Z').replace('(?s:', '(?:')
+                # Each line is preceded by a newline, giving every match a literal prefix
+                cls._line_regexes.append(re.compile(f'\n({pattern})(?=\n)'))
+
+    @classmethod
+    def _match_lines(cls, lines: list[str]) -> dict[str, dict[str, str]]:
+        """Match newline-free relative paths against all rules, in rule order.
+
+        Returns a dictionary of parsed entities for each line that matched a rule.
+        """
+        cls._init_line_regexes()
+        assert cls.regexes is not None  # noqa: S101
+        assert cls._line_regexes is not None  # noqa: S101
+
+        results: dict[str, dict[str, str]] = {}
+        remaining = lines
+        for regex, line_regex in zip(cls.regexes, cls._line_regexes, strict=True):
+            if not remaining:
+                break
+
+            blob = '\n' + '\n'.join(remaining) + '\n'
+            matched = False
+            pos = 0
+            while match := line_regex.search(blob, pos):
+                if '\n' in match[1]:
+                    # Pattern can cross lines; fall back to matching one line at a time
+                    for line in remaining:
+                        if line_match := re.match(regex, line):
+                            groups = line_match.groupdict().items()
+                            results[line] = {k: v for k, v in groups if v is not None}
+                    matched = True
+                    break
+                results[match[1]] = {k: v for k, v in match.groupdict().items() if v is not None}
+                matched = True
+                pos = match.end()
+
+            if matched:
+                remaining = [line for line in remaining if line not in results]
+
+        return results
+
+    @classmethod
+    def parse_many(cls, paths: t.Iterable[str], *, jobs: int = 1) -> list[dict[str, str]]:
+        """Parse many file paths into dictionaries of BIDS entities.
+
+        Equivalent to ``[BIDSValidator.parse(path) for path in paths]``, but
+        duplicate paths are parsed once, and each rule is matched against a
+        single newline-joined listing of all paths that are not yet matched.
+
+        Parameters
+        ----------
+        paths : iterable of str
+            Paths of files to be parsed. Must be relative to root of a BIDS
+            dataset, and must include a leading forward slash `/`.
+        jobs : int
+            Number of processes to shard the paths across, if there are more
+            than ``POOL_THRESHOLD`` distinct paths. Defaults to 1.
+
+        Returns
+        -------
+        list of dict
+            Dictionaries of BIDS entities, in the order of ``paths``.
+            See :meth:`parse`.
+
+        Examples
+        --------
+        >>> from bids_validator import BIDSValidator
+        >>> BIDSValidator.parse_many(['/participants.tsv', '/sub-01/anat/sub-01_T1w.exe'])
+        [{'stem': 'participants', 'extension': '.tsv'}, {}]
+
+        """
+        keys = []
+        for path in paths:
+            if path.startswith(os.sep):
+                path = path.replace(os.sep, '/')
+            if not path.startswith('/'):
+                raise ValueError(
+                    'Path must be relative to root of a BIDS dataset,'
+                    ' and must include a leading forward slash `/`.'
+                )
+            keys.append(path[1:])
+        lines = dict.fromkeys(keys)
+
+        # Paths containing newlines cannot be split out of a joined listing
+        unique = [line for line in lines if '\n' not in line]
+        if jobs > 1 and len(unique) >= POOL_THRESHOLD:
+            from concurrent.futures import ProcessPoolExecutor
+
+            # Each worker compiles the rules in _match_lines, as spawned and forkserver
+            # workers do not inherit them; forked workers inherit those compiled here
+            cls._init_line_regexes()
+            shards = [unique[i::jobs] for i in range(jobs)]
+            results: dict[str, dict[str, str]] = {}
+            with ProcessPoolExecutor(jobs) as executor:
+                for shard_results in executor.map(_match_lines, shards):
+                    results.update(shard_results)
+        else:
+            results = cls._match_lines(unique)
+
+        results.update((line, cls.parse(f'/{line}')) for line in lines if '\n' in line)
+
+        return [dict(results.get(key, {})) for key in keys]
+
+    @classmethod
+    def is_bids_many(cls, paths: t.Iterable[str], *, jobs: int = 1) -> list[bool]:
+        """Check if many file paths adhere to BIDS.
+
+        Equivalent to ``[BIDSValidator.is_bids(path) for path in paths]``.
+        See :meth:`parse_many` for parameters.
+
+        Examples
+        --------
+        >>> from bids_validator import BIDSValidator
+        >>> BIDSValidator.is_bids_many(
+        ...     [
+        ...         '/sub-01/anat/sub-01_rec-CSD_T1w.nii.gz',
+        ...         '/sub-01/anat/sub-01_acq-23_rec-CSD_T1w.exe',  # wrong extension
+        ...         'home/username/my_dataset/participants.tsv',  # not relative to root
+        ...         '/participants.tsv',
+        ...     ]
+        ... )
+        [True, False, False, True]
+
+        """
+        paths = list(paths)
+        valid = [path for path in paths if path.startswith(('/', os.sep))]
+        parsed = dict(zip(valid, cls.parse_many(valid, jobs=jobs), strict=True))
+        return [bool(parsed.get(path)) for path in paths]
+
     @classmethod
     @lru_cache
     def is_bids(cls, path: str) -> bool:
@@ -263,3 +528,8 @@ class BIDSValidator:
         if not parts:
             return False
         return parts.get('datatype') not in (None, 'phenotype')
+
+
+def _match_lines(lines: list[str]) -> dict[str, dict[str, str]]:
+    """Match a shard of paths in a worker process."""
+    return BIDSValidator._match_lines(lines)
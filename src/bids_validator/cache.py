@@ -0,0 +1,186 @@
+"""Size-bounded caches for the contents of dataset files.
+
+Loaders decorated with :func:`cached_loader` store their results in the
+active :class:`LoaderCache`. Each :class:`~bids_validator.context.Dataset`
+owns a cache, which is activated while its files are loaded and released
+when the dataset is closed, so a long-lived process does not accumulate the
+contents of every dataset it has validated.
+
+>>> cache = LoaderCache(max_bytes=2**20)
+>>> with cache.activate():
+...     pass  # loaders called here use cache
+>>> cache.clear()
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from types import MappingProxyType
+
+from .types import _typings as t
+
+__all__ = ('DEFAULT_MAX_BYTES', 'LoaderCache', 'cached_loader', 'prime', 'sizeof')
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from typing import ParamSpec, TypeVar
+
+    P = ParamSpec('P')
+    R = TypeVar('R')
+
+#: Byte budget of caches that are not given one
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+_active_cache: ContextVar[LoaderCache | None] = ContextVar('active_cache', default=None)
+
+
+def sizeof(obj: object) -> int:
+    """Estimate the memory used by an object, including the objects it contains."""
+    total = 0
+    seen = set()
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, (dict, MappingProxyType)):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif getattr(getattr(item, 'dtype', None), 'hasobject', False):
+            # NumPy arrays count their buffer, but not the objects it refers to
+            stack.extend(item.flat)  # type: ignore[attr-defined]
+        elif hasattr(item, '__dict__'):
+            stack.append(vars(item))
+    return total
+
+
+class LoaderCache:
+    """Least-recently-used cache of loaded file contents with a byte budget.
+
+    Use :meth:`activate` to make a cache the active cache for
+    :func:`cached_loader` functions.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Approximate memory budget, as estimated by :func:`sizeof`. When an
+        insertion exceeds the budget, least recently used entries are evicted.
+        Entries larger than the budget are returned but not stored.
+
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[t.Any, tuple[t.Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return (
+            f'<{self.__class__.__name__} entries={len(self._entries)}'
+            f' nbytes={self.nbytes} max_bytes={self.max_bytes}>'
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    @contextmanager
+    def activate(self) -> Iterator[t.Self]:
+        """Make this the active cache in the current thread or task."""
+        token = _active_cache.set(self)
+        try:
+            yield self
+        finally:
+            _active_cache.reset(token)
+
+    @classmethod
+    def active(cls) -> LoaderCache:
+        """Return the active cache, or the module default cache."""
+        cache = _active_cache.get()
+        return _default_cache if cache is None else cache
+
+    def get(self, key: t.Any, default: t.Any = None) -> t.Any:
+        """Retrieve a cached value, marking it as recently used."""
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: t.Any, value: t.Any, nbytes: int | None = None) -> None:
+        """Store a value, evicting least recently used entries to fit the budget."""
+        if nbytes is None:
+            nbytes = sizeof(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self) -> None:
+        """Release all cached values."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+_default_cache = LoaderCache()
+
+_MISSING = object()
+
+
+def _cache_key(
+    func: Callable[..., t.Any], args: tuple[t.Any, ...], kwargs: dict[str, t.Any]
+) -> t.Any:
+    return (func, args, tuple(sorted(kwargs.items())))
+
+
+def cached_loader(func: Callable[P, R]) -> Callable[P, R]:
+    """Cache the results of a loader in the active :class:`LoaderCache`.
+
+    Arguments must be hashable, as with :func:`functools.cache`.
+    """
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        cache = LoaderCache.active()
+        key = _cache_key(func, args, kwargs)
+        value = cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = func(*args, **kwargs)
+            cache.put(key, value)
+        return value  # type: ignore[no-any-return]
+
+    return wrapper
+
+
+def prime(loader: Callable[P, R], value: R, *args: P.args, **kwargs: P.kwargs) -> None:
+    """Store a result for a :func:`cached_loader` call that was computed elsewhere.
+
+    Batch loaders use this to make their results available to later calls
+    of the per-file loader with the same arguments, in the active cache.
+    """
+    func = loader.__wrapped__  # type: ignore[attr-defined]
+    LoaderCache.active().put(_cache_key(func, args, kwargs), value)
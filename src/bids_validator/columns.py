@@ -0,0 +1,388 @@
+r"""Vectorized checks of TSV columns against their schema definitions.
+
+Columns of tabular files are defined in ``schema.objects.columns``, with a
+type, format or pattern that values must match, a list of allowed values, or
+bounds. Checking each cell with Python code takes seconds for tables with
+millions of rows. :class:`ColumnValidator` instead checks whole columns, as
+loaded by :attr:`Context.columns <bids_validator.context.Context.columns>`.
+Patterns are matched with a single regular expression search over all values
+of a column joined into one string, plain numbers are recognized by testing
+their characters with NumPy, and levels and bounds are checked with NumPy.
+
+>>> import numpy as np
+>>> from bidsschematools.schema import load_schema
+>>> validators = ColumnValidators(load_schema())
+>>> validators['duration'].check(np.array(['1.5', 'n/a', '-2', 'x']))
+ColumnErrors(n_invalid=2, rows=(2, 3), values=('-2', 'x'))
+>>> validators['sex'].check(np.array(['M', 'female'])) is None
+True
+"""
+
+from __future__ import annotations
+
+import re
+from contextlib import suppress
+from functools import cache
+
+import attrs
+import numpy as np
+from bidsschematools.types.namespace import Namespace
+
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from .context import Context
+    from .rules import Rule
+
+__all__ = ('ColumnErrors', 'ColumnValidator', 'ColumnValidators', 'check_columns')
+
+#: Value that stands for missing data in any column
+MISSING = 'n/a'
+
+#: Number of offending rows that are reported by default
+MAX_REPORTED_ROWS = 10
+
+# Formats of the values of each JSON type
+_TYPE_FORMATS = {'number': 'number', 'integer': 'integer', 'boolean': 'boolean'}
+_NUMERIC_FORMATS = frozenset({'number', 'integer', 'index'})
+
+
+@attrs.frozen
+class ColumnErrors:
+    """Values of a column that do not match its definition."""
+
+    #: Number of invalid values
+    n_invalid: int
+    #: Indices of the first rows with invalid values, counting from 0 after the header
+    rows: tuple[int, ...]
+    #: Invalid values of those rows
+    values: tuple[str, ...]
+
+
+# Syntax by which a pattern might match a newline, and so span several values of a buffer
+_MAY_MATCH_NEWLINE = re.compile(r'\[\^|\\[sDWn]|\n|\(\?[a-zA-Z]*s')
+
+
+@cache
+def _scanner(pattern: str) -> re.Pattern[str] | None:
+    """Compile a pattern that finds the values of a buffer that do not match ``pattern``.
+
+    Values are preceded by newlines in the buffer, and the scanner matches
+    the newlines before invalid values. Searching for the newlines is done by
+    the regular expression engine, so only invalid values are seen by Python.
+    Patterns that might match newlines have no scanner, as they could match
+    an invalid value together with the values that follow.
+    """
+    if _MAY_MATCH_NEWLINE.search(pattern):
+        return None
+    return re.compile(f'\\n(?!(?:{pattern})(?:\\n|\\Z))', re.MULTILINE | re.ASCII)
+
+
+def _match(pattern: re.Pattern[str], strings: list[str]) -> np.ndarray:
+    """Test which values fully match a pattern."""
+    buffer = '\n' + '\n'.join(strings)
+    scanner = _scanner(pattern.pattern)
+    if scanner is not None and buffer.count('\n') == len(strings):
+        valid = np.ones(len(strings), dtype=bool)
+        offsets = [match.start() for match in scanner.finditer(buffer)]
+        if offsets:
+            sizes = np.fromiter(map(len, strings), dtype=np.intp, count=len(strings)) + 1
+            valid[np.searchsorted(np.cumsum(sizes) - sizes, offsets)] = False
+        return valid
+    unique, inverse = np.unique(np.array(strings, dtype=str), return_inverse=True)
+    matched = [pattern.fullmatch(value) is not None for value in unique.tolist()]
+    return np.array(matched, dtype=bool)[inverse.reshape(-1)]
+
+
+# Patterns of numeric formats, with whether plain numbers of the format can have a sign
+# and a decimal point
+_PLAIN_NUMBERS = {
+    ' *[+-]?([0-9]+([.][0-9]*)?|[.][0-9]+)([eE][+-]?[0-9]+)? *': (True, True),
+    ' *[+-]?\\d+ *': (True, False),
+    '[0-9]+': (False, False),
+}
+
+
+def _plain_numbers(values: np.ndarray, signed: bool, decimal: bool) -> np.ndarray:
+    """Find values that are plain numbers, such as ``12`` or ``-0.5``.
+
+    Plain numbers have digits, at most one decimal point and a leading sign.
+    They match the patterns of numeric formats, and are found by testing the
+    characters of all values at once, which is faster than matching patterns.
+    """
+    # Strings of NumPy arrays are padded to the same length with null characters
+    codes = values.view(np.uint32).reshape(len(values), -1)
+    padding = codes == 0
+    digits = codes - ord('0') < 10
+    allowed = digits | padding
+    if decimal:
+        points = codes == ord('.')
+        allowed |= points
+    if signed:
+        allowed[:, 0] |= (codes[:, 0] == ord('+')) | (codes[:, 0] == ord('-'))
+    plain: np.ndarray = allowed.all(axis=1) & digits.any(axis=1)
+    plain &= ~(padding[:, :-1] & ~padding[:, 1:]).any(axis=1)
+    if decimal:
+        plain &= points.sum(axis=1) <= 1
+    return plain
+
+
+def _bound(value: t.Any) -> float | None:
+    """Convert the minimum or maximum of a definition to a number."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid bound: {value!r}') from None
+
+
+@attrs.frozen
+class ColumnValidator:
+    """Compiled test of the values of a column.
+
+    Values equal to ``n/a`` are always valid.
+    """
+
+    #: Pattern that values must fully match
+    pattern: re.Pattern[str] | None = None
+    #: Allowed values, if restricted
+    levels: frozenset[str] | None = None
+    #: Whether values are numbers, and their inclusive bounds
+    numeric: bool = False
+    minimum: float | None = None
+    maximum: float | None = None
+    #: Alternatives, for definitions with ``anyOf``; values must match one
+    alternatives: tuple[ColumnValidator, ...] = ()
+
+    @classmethod
+    def from_definition(cls, definition: Mapping[str, t.Any], formats: Namespace) -> t.Self:
+        """Compile a column definition of ``schema.objects.columns``, or of a sidecar.
+
+        Definitions either follow JSON schema, with ``type``, ``format``,
+        ``pattern``, ``enum``, ``minimum`` and ``maximum``, or describe the
+        column as a sidecar would, with ``Format``, ``Levels``, ``Minimum``
+        and ``Maximum``, possibly under ``definition``.
+
+        Raises
+        ------
+        ValueError
+            If the definition names an unknown format, has an invalid pattern,
+            or has levels or bounds of the wrong type.
+
+        """
+        if 'anyOf' in definition:
+            return cls(
+                alternatives=tuple(
+                    cls.from_definition(alternative, formats)
+                    for alternative in definition['anyOf']
+                )
+            )
+        definition = definition.get('definition', definition)
+
+        pattern = definition.get('pattern')
+        format_name = definition.get('format') or definition.get('Format')
+        if format_name is None:
+            format_name = _TYPE_FORMATS.get(definition.get('type', ''))
+        if pattern is None and format_name is not None:
+            try:
+                pattern = formats[format_name].pattern
+            except (KeyError, AttributeError):
+                raise ValueError(f'Unknown format: {format_name!r}') from None
+        if pattern == '.*':
+            pattern = None
+
+        levels = definition.get('enum')
+        if levels is None and 'Levels' in definition:
+            levels = definition['Levels']
+        if levels is not None and not isinstance(levels, (list, dict, Namespace)):
+            raise ValueError(f'Invalid levels: {levels!r}')
+        minimum = definition.get('minimum', definition.get('Minimum'))
+        maximum = definition.get('maximum', definition.get('Maximum'))
+
+        try:
+            # Python and JavaScript agree on character classes for ASCII
+            compiled = None if pattern is None else re.compile(pattern, re.ASCII)
+        except (re.error, TypeError):
+            raise ValueError(f'Invalid pattern: {pattern!r}') from None
+        return cls(
+            pattern=compiled,
+            levels=None if levels is None else frozenset(map(str, levels)),
+            numeric=format_name in _NUMERIC_FORMATS,
+            minimum=_bound(minimum),
+            maximum=_bound(maximum),
+        )
+
+    def _valid(self, values: np.ndarray) -> np.ndarray:
+        """Test values, none of which are missing."""
+        if self.alternatives:
+            valid = np.zeros(values.shape, dtype=bool)
+            for alternative in self.alternatives:
+                valid |= alternative._valid(values)
+            return valid
+
+        valid = np.ones(values.shape, dtype=bool)
+        if self.levels is not None:
+            valid &= np.isin(values, list(self.levels))
+        if self.pattern is not None and valid.any():
+            unmatched = valid.copy()
+            if (plain := _PLAIN_NUMBERS.get(self.pattern.pattern)) is not None:
+                unmatched[unmatched] = ~_plain_numbers(values[unmatched], *plain)
+            if unmatched.any():
+                valid[unmatched] = _match(self.pattern, values[unmatched].tolist())
+        if self.numeric and (self.minimum is not None or self.maximum is not None):
+            # Values that match numeric formats parse as floats, faster than with NumPy
+            strings = values[valid].tolist()
+            numbers = np.fromiter(map(float, strings), dtype=np.float64, count=len(strings))
+            in_range = np.ones(numbers.shape, dtype=bool)
+            if self.minimum is not None:
+                in_range &= numbers >= self.minimum
+            if self.maximum is not None:
+                in_range &= numbers <= self.maximum
+            valid[valid] = in_range
+        return valid
+
+    def invalid(self, values: t.Iterable[str]) -> np.ndarray:
+        """Find the values of a column that do not match the definition.
+
+        Parameters
+        ----------
+        values : array_like of str
+            Values of the column, such as an array of :attr:`Context.columns`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean mask of invalid values.
+
+        """
+        array = np.asarray(values, dtype=str)
+        invalid: np.ndarray = array != MISSING
+        invalid[invalid] = ~self._valid(array[invalid])
+        return invalid
+
+    def check(
+        self, values: t.Iterable[str], max_rows: int = MAX_REPORTED_ROWS
+    ) -> ColumnErrors | None:
+        """Check the values of a column, reporting the first ``max_rows`` invalid ones.
+
+        Returns
+        -------
+        ColumnErrors or None
+            Invalid values, or None if every value is valid.
+
+        """
+        array = np.asarray(values, dtype=str)
+        rows = np.flatnonzero(self.invalid(array))
+        if not rows.size:
+            return None
+        first = rows[:max_rows]
+        return ColumnErrors(
+            n_invalid=int(rows.size),
+            rows=tuple(first.tolist()),
+            values=tuple(str(value) for value in array[first].tolist()),
+        )
+
+
+class ColumnValidators:
+    """Validators of the columns of ``schema.objects.columns``, compiled on first use.
+
+    Validators are indexed by the keys of ``schema.objects.columns``, such as
+    ``type__channels``, which may differ from the column header, ``type``.
+
+    Parameters
+    ----------
+    schema : Namespace
+        BIDS schema, as loaded by :func:`bidsschematools.schema.load_schema`.
+
+    """
+
+    def __init__(self, schema: Namespace) -> None:
+        self.schema = schema
+        self._validators: dict[str, ColumnValidator] = {}
+
+    def __getitem__(self, key: str) -> ColumnValidator:
+        validator = self._validators.get(key)
+        if validator is None:
+            validator = self._validators[key] = ColumnValidator.from_definition(
+                self.schema.objects.columns[key], self.schema.objects.formats
+            )
+        return validator
+
+    def header(self, key: str) -> str:
+        """Find the header of the column with a key of ``schema.objects.columns``."""
+        return self.schema.objects.columns[key].name  # type: ignore[no-any-return]
+
+
+# Validators of the last schema used by check_columns
+_VALIDATORS: tuple[Namespace | None, ColumnValidators | None] = (None, None)
+
+
+def _validators(schema: Namespace) -> ColumnValidators:
+    global _VALIDATORS
+    cached_schema, validators = _VALIDATORS
+    if cached_schema is not schema or validators is None:
+        validators = ColumnValidators(schema)
+        _VALIDATORS = (schema, validators)
+    return validators
+
+
+def check_columns(
+    context: Context, rules: Iterable[Rule], *, max_rows: int = MAX_REPORTED_ROWS
+) -> dict[str, ColumnErrors]:
+    """Check the columns of a tabular file against their definitions.
+
+    Columns are defined by the ``columns`` of the tabular data rules that
+    apply to the file. Other columns are checked against their definition in
+    the sidecar, if it has a ``Format``, ``Levels``, ``Minimum`` or
+    ``Maximum``. Sidecar definitions that cannot be compiled, such as those
+    with an unknown ``Format``, are skipped.
+
+    Parameters
+    ----------
+    context : Context
+        Context of a tabular file.
+    rules : iterable of Rule
+        Rules that apply to the file, such as those selected by
+        :meth:`RuleIndex.select <bids_validator.rules.RuleIndex.select>`.
+    max_rows : int, optional
+        Number of invalid values to report for each column.
+
+    Returns
+    -------
+    dict
+        Invalid values, indexed by column header, for columns that have any.
+
+    """
+    columns = context.columns
+    if not columns:
+        return {}
+    validators = _validators(context.schema)
+
+    by_header: dict[str, ColumnValidator] = {}
+    for rule in rules:
+        if rule.name.startswith('tabular_data.'):
+            for key in rule.definition.columns:
+                by_header.setdefault(validators.header(key), validators[key])
+
+    sidecar: Mapping[str, t.Any] = context.sidecar or {}
+    for header in columns:
+        definition = sidecar.get(header)
+        if (
+            header not in by_header
+            and isinstance(definition, (dict, Namespace))
+            and {'Format', 'Levels', 'Minimum', 'Maximum'} & definition.keys()
+        ):
+            with suppress(ValueError):
+                by_header[header] = ColumnValidator.from_definition(
+                    definition, context.schema.objects.formats
+                )
+
+    errors = {}
+    for header, validator in by_header.items():
+        if header in columns and (result := validator.check(columns[header], max_rows)):
+            errors[header] = result
+    return errors
@@ -0,0 +1,95 @@
+"""Consistency checks between the subjects and sessions of a dataset and its tables.
+
+Rules such as ``checks.dataset.ParticipantIDMismatch`` compare the subject
+directories of a dataset with the ``participant_id`` column of
+``participants.tsv``, as arrays. The functions of this module make the same
+comparisons with the sets of :class:`~bids_validator.context.Subjects` and
+:class:`~bids_validator.context.Sessions`, in time linear in the number of
+subjects and sessions, and report every inconsistent value at once.
+"""
+
+from __future__ import annotations
+
+from .context import load_tsv_column_set
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .context import Dataset, Sessions
+
+__all__ = ('check_participants', 'check_phenotype', 'check_sessions')
+
+
+def check_participants(dataset: Dataset) -> list[str]:
+    """Find subject directories that are not listed in ``participants.tsv``.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        Dataset to check.
+
+    Returns
+    -------
+    list of str
+        Sorted names of ``sub-*`` directories that are absent from the
+        ``participant_id`` column. Empty if there is no ``participants.tsv``
+        file, or it has no ``participant_id`` column.
+
+    """
+    subjects = dataset.subjects
+    with dataset.cache.activate():
+        participants = subjects.participant_id_set
+    if participants is None:
+        return []
+    return sorted(subjects.sub_dirs_set - participants)
+
+
+def check_phenotype(dataset: Dataset) -> dict[str, list[str]]:
+    """Find subjects of phenotype files that are not listed in ``participants.tsv``.
+
+    Parameters
+    ----------
+    dataset : Dataset
+        Dataset to check.
+
+    Returns
+    -------
+    dict
+        Sorted ``participant_id`` values that are absent from
+        ``participants.tsv``, indexed by the dataset-relative path of each
+        phenotype file that has any. Empty if there is no
+        ``participants.tsv`` file, or it has no ``participant_id`` column.
+
+    """
+    subjects = dataset.subjects
+    missing = {}
+    with dataset.cache.activate():
+        participants = subjects.participant_id_set
+        if participants is None:
+            return {}
+        for phenotype_file in subjects.phenotype_files:
+            values = load_tsv_column_set(phenotype_file, 'participant_id')
+            if values and (unknown := values - participants):
+                missing[phenotype_file.relative_path] = sorted(unknown)
+    return missing
+
+
+def check_sessions(sessions: Sessions) -> list[str]:
+    """Find session directories of a subject that are not listed in ``*_sessions.tsv``.
+
+    Parameters
+    ----------
+    sessions : Sessions
+        Sessions of a subject.
+
+    Returns
+    -------
+    list of str
+        Sorted names of ``ses-*`` directories that are absent from the
+        ``session_id`` column. Empty if the subject has no sessions file,
+        or it has no ``session_id`` column.
+
+    """
+    session_ids = sessions.session_id_set
+    if session_ids is None:
+        return []
+    return sorted(sessions.ses_dirs_set - session_ids)
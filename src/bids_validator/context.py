@@ -4,30 +4,46 @@ from __future__ import annotations
 
 import gzip
 import itertools
+import re
 import struct
-from functools import cache
+from contextlib import ExitStack, nullcontext, suppress
+from sys import getsizeof, intern
+from types import MappingProxyType
 
 import attrs
-import nibabel as nb
 import orjson
 from bidsschematools.types import context as ctx
 from bidsschematools.types.namespace import Namespace
 from upath import UPath
 
+from .cache import LoaderCache, cached_loader, prime, sizeof
+from .expressions import compile_conjunction
+from .probe import FileProbe, ProbeReader
 from .types import _typings as t
 from .types.files import FileTree
 
 TYPE_CHECKING = False
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator, Mapping
+    from concurrent.futures import ThreadPoolExecutor
+    from contextlib import AbstractContextManager
     from typing import TypeVar
 
+    import nibabel as nb
+    import numpy as np
     from bidsschematools.types import protocols as proto
 
+    from .gradients import GradientSummary
+    from .tsv import ColumnSummary, TableSummary
+
     # pyright does not treat cached_property like property
     cached_property = property
 
     ImgT = TypeVar('ImgT', bound=nb.filebasedimages.FileBasedImage)
+    DirectoryIndex = dict[
+        tuple[str, str],
+        dict[tuple[str, ...], dict[tuple[str | None, ...], list[tuple[int, FileTree]]]],
+    ]
 else:
     from functools import cached_property
 
@@ -42,7 +58,8 @@ else:
 # *  Hitting the filesystem should be minimized. FileTree already caches os.stat calls,
 #    but reading file contents should never happen more than once. Therefore, if file
 #    contents are accessed in the context.associations or context.dataset, they should
-#    use caching loaders.
+#    use caching loaders. Loader caches are owned by the Dataset, so they are bounded
+#    and released along with it.
 # *  If the full contents of an object will be known on its first instantiation,
 #    prefer to use the dataclasses in bidsschematools.types.context. Lazy fields
 #    need custom classes.
@@ -64,7 +81,7 @@ def datatype_to_modality(datatype: str, schema: Namespace) -> str:
     return _DATATYPE_MAP[datatype]
 
 
-@cache
+@cached_loader
 def load_tsv(file: FileTree, *, max_rows: int = 0) -> Namespace:
     """Load TSV contents into a Namespace."""
     fobj: t.Iterable[str]
@@ -76,8 +93,8 @@ def load_tsv(file: FileTree, *, max_rows: int = 0) -> Namespace:
         return Namespace(zip(next(contents), zip(*contents, strict=False), strict=False))
 
 
-@cache
-def load_tsv_gz(file: FileTree, headers: tuple[str], *, max_rows: int = 0) -> Namespace:
+@cached_loader
+def load_tsv_gz(file: FileTree, headers: tuple[str, ...], *, max_rows: int = 0) -> Namespace:
     """Load TSVGZ contents into a Namespace."""
     with file.path_obj.open('rb') as fobj:
         gzobj: t.Iterable[bytes] = gzip.GzipFile(fileobj=fobj, mode='r')
@@ -87,58 +104,190 @@ def load_tsv_gz(file: FileTree, headers: tuple[str], *, max_rows: int = 0) -> Na
         return Namespace(zip(headers, zip(*contents, strict=False), strict=False))
 
 
-@cache
+@cached_loader
+def load_tsv_columns(
+    file: FileTree, columns: tuple[str, ...] | None = None, *, max_rows: int = 0
+) -> Namespace:
+    """Load TSV contents into a Namespace of NumPy arrays, optionally only some columns."""
+    # NumPy is slow to import; defer until a TSV file is needed
+    from .tsv import read_columns
+
+    return Namespace(read_columns(file.path_obj.read_bytes(), columns, max_rows=max_rows))
+
+
+def _read_column(file: FileTree, column: str) -> np.ndarray | None:
+    """Read one column of a TSV file into an array, or None if the file has no such column.
+
+    The header is read first, and the rest of the file only if it has the
+    column. Other columns are never decoded, however many there are. Columns
+    that some rows are too short to reach are also treated as absent.
+    """
+    with file.path_obj.open('rb') as fobj:
+        header = fobj.readline()
+        if column not in header.decode().rstrip('\r\n').split('\t'):
+            return None
+        data = header + fobj.read()
+
+    from .tsv import read_columns
+
+    return read_columns(data, (column,)).get(column)
+
+
+@cached_loader
+def load_tsv_column(file: FileTree, column: str) -> tuple[str, ...] | None:
+    """Load one column of a TSV file, or None if the file has no such column."""
+    values = _read_column(file, column)
+    return None if values is None else tuple(values.tolist())
+
+
+@cached_loader
+def load_tsv_column_set(file: FileTree, column: str) -> frozenset[str] | None:
+    """Load the distinct values of one column of a TSV file, as :func:`load_tsv_column`."""
+    values = load_tsv_column(file, column)
+    return None if values is None else frozenset(values)
+
+
+@cached_loader
+def load_tsv_numbers(file: FileTree, column: str) -> np.ndarray | None:
+    """Load one column of a TSV file as floats, with NaN for values that are not numbers."""
+    from .tsv import parse_numbers
+
+    values = _read_column(file, column)
+    return None if values is None else parse_numbers(values)[0]
+
+
+@cached_loader
+def load_tsv_column_summary(file: FileTree, column: str) -> ColumnSummary | None:
+    """Summarize the numbers of one column of a TSV file, or None if it has no such column."""
+    from .tsv import summarize_values
+
+    values = _read_column(file, column)
+    return None if values is None else summarize_values(values)
+
+
+@cached_loader
+def load_tsv_gz_summary(file: FileTree, headers: tuple[str, ...]) -> TableSummary:
+    """Stream TSVGZ contents to count rows, check row widths and summarize columns."""
+    from .tsv import summarize_columns
+
+    with file.path_obj.open('rb') as fobj, gzip.GzipFile(fileobj=fobj, mode='r') as gzobj:
+        return summarize_columns(gzobj, headers)
+
+
+@cached_loader
 def load_json(file: FileTree) -> dict[str, t.Any]:
     """Load JSON file contents."""
     return orjson.loads(file.path_obj.read_bytes())  # type: ignore[no-any-return]
 
 
+@cached_loader
+def load_gradient_table(file: FileTree) -> np.ndarray:
+    """Load a .bval or .bvec file into a 2D array, with one row per line.
+
+    Rows of unequal length and values that are not numbers raise ValueError.
+    """
+    from .gradients import read_gradient_table
+
+    return read_gradient_table(file.path_obj.read_bytes())
+
+
+@cached_loader
+def load_gradient_summary(file: FileTree) -> GradientSummary:
+    """Summarize the shape and values of a .bval or .bvec file."""
+    from .gradients import summarize_gradient_table
+
+    return summarize_gradient_table(load_gradient_table(file))
+
+
 def load_image(path: UPath, api: type[ImgT]) -> ImgT:
     """Load neuroimaging file with a given nibabel API."""
+    import nibabel as nb
+
     img = nb.loadsave.load(path)  # type: ignore[arg-type]
     if not isinstance(img, api):
         raise ValueError(f'Expected image of type {api}, got {type(img)}')
     return img
 
 
+@cached_loader
+def load_probe(file: FileTree) -> FileProbe:
+    """Load a probe of the leading bytes of a file, shared by header loaders.
+
+    Probes are cached while empty. Loaders that read through a probe call
+    :func:`_measure_probe` afterwards, so that the cache accounts for its buffers.
+    """
+    return FileProbe.from_path(file.path_obj)
+
+
+def _measure_probe(file: FileTree, probe: FileProbe) -> None:
+    """Store a probe again, sizing it with the buffers it has filled."""
+    prime(load_probe, probe, file)
+
+
+@cached_loader
 def load_nifti_header(file: FileTree) -> ctx.NiftiHeader:
     """Load NIfTI header contents."""
-    img = load_image(file.path_obj, nb.nifti1.Nifti1Image)
+    # NumPy and nibabel are slow to import; defer until a header is needed
+    from .nifti import read_nifti_header
 
-    # Nibabel uses None,0,1,2, BIDS context uses 1,2,3 with 0 as absent
-    freq, phase, slc = (
-        dim + 1 if dim is not None else 0
-        for dim in img.header.get_dim_info()  # type: ignore[no-untyped-call]
-    )
-    dim_info = ctx.DimInfo(freq, phase, slc)
+    probe = load_probe(file)
+    try:
+        return read_nifti_header(probe.reader(decompress=file.name.endswith('.gz')))
+    finally:
+        _measure_probe(file, probe)
 
-    xyz, t = img.header.get_xyzt_units()  # type: ignore[no-untyped-call]
-    if t not in ('unknown', 'sec', 'msec', 'usec'):
-        # The NIfTI standard allows for 'Hz', 'ppm' and 'rads', but BIDS currently
-        # considers temporal units.
-        t = 'unknown'
-    xyzt_units = ctx.XyztUnits(xyz, t)
 
-    try:
-        mrs_header = next(ext for ext in img.header.extensions if ext.get_code() == 44)
-        mrs_meta = Namespace(mrs_header.json())
-    except StopIteration:
-        mrs_meta = None
-
-    nifti_header = ctx.NiftiHeader(
-        dim_info=dim_info,
-        dim=img.header['dim'],
-        pixdim=img.header['pixdim'],
-        shape=img.shape,
-        voxel_sizes=img.header.get_zooms(),  # type: ignore[no-untyped-call]
-        xyzt_units=xyzt_units,
-        qform_code=int(img.header['qform_code']),
-        sform_code=int(img.header['sform_code']),
-        axis_codes=nb.orientations.aff2axcodes(img.affine),  # type: ignore[no-untyped-call]
-        mrs=mrs_meta,
-    )
+def load_nifti_headers(
+    files: t.Iterable[FileTree], *, max_workers: int | None = None
+) -> dict[FileTree, ctx.NiftiHeader]:
+    """Load the NIfTI headers of many files at once.
 
-    return nifti_header
+    Header blocks are read through each file's probe in a thread pool, then
+    parsed in a single batch. Headers are stored in the active cache, where
+    :func:`load_nifti_header` finds them. Files that cannot be read or are not
+    valid NIfTI files are omitted, leaving :func:`load_nifti_header` to raise
+    the error.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .nifti import PREFIX_SIZE, read_nifti_headers
+
+    # Pool threads do not inherit the active cache
+    cache = LoaderCache.active()
+
+    probes = {}
+
+    def fetch(file: FileTree) -> ProbeReader | None:
+        compressed = file.name.endswith('.gz')
+        with cache.activate():
+            probe = probes[file] = load_probe(file)
+        try:
+            if compressed:
+                probe.decompressed(PREFIX_SIZE)
+            else:
+                probe.head(PREFIX_SIZE)
+        except OSError:
+            return None
+        return probe.reader(decompress=compressed)
+
+    files = list(files)
+    with ThreadPoolExecutor(max_workers) as pool:
+        readers = {
+            file: reader
+            for file, reader in zip(files, pool.map(fetch, files), strict=True)
+            if reader is not None
+        }
+    headers = read_nifti_headers(list(readers.values()))
+
+    loaded = {}
+    with cache.activate():
+        for file, probe in probes.items():
+            _measure_probe(file, probe)
+        for file, header in zip(readers, headers, strict=True):
+            if isinstance(header, ctx.NiftiHeader):
+                prime(load_nifti_header, header, file)
+                loaded[file] = header
+    return loaded
 
 
 def load_gzip_header(file: FileTree) -> ctx.Gzip | None:
@@ -146,24 +295,29 @@ def load_gzip_header(file: FileTree) -> ctx.Gzip | None:
 
     Reference: https://www.rfc-editor.org/info/rfc1952/
     """
+    # Fetch enough header to include filename and at least the start of comment.
+    # The probe buffer is much larger than this, so the file is read at most once.
+    # If extra fields were present and >512 bytes, the buffer is extended.
+    probe = load_probe(file)
     try:
-        with file.path_obj.open('rb') as fobj:
-            # Constant header fields: ID1, ID2, CM, FLG, MTIME, XFL, OS
-            magic, flags, timestamp = struct.unpack('<HxBIxx', fobj.read(10))
-            if magic != 0x8B1F:
-                return None
-
-            if flags & 0b0_0100:  # FEXTRA
-                size = int.from_bytes(fobj.read(2), 'little')
-                fobj.seek(size, 1)  # Skip extra field
-
-            # Fetch enough header to include filename and at least the start of comment.
-            # Buffer should be 1-4KiB. Use 512 bytes (-10 already read) to avoid potentially
-            # depleting the buffer and triggering another IO call, if possible.
-            # If extra fields were present and >512 bytes, so be it.
-            buffer = fobj.read(502)
+        header = probe.head(512)
+        if len(header) < 10:
+            return None
+        # Constant header fields: ID1, ID2, CM, FLG, MTIME, XFL, OS
+        magic, flags, timestamp = struct.unpack('<HxBIxx', header[:10])
+        if magic != 0x8B1F:
+            return None
+
+        offset = 10
+        if flags & 0b0_0100:  # FEXTRA
+            size = int.from_bytes(header[10:12], 'little')
+            offset = 12 + size  # Skip extra field
+            header = probe.head(offset + 502)
+        buffer = header[offset:]
     except OSError:
         return None
+    finally:
+        _measure_probe(file, probe)
 
     filename = ''
     if flags & 0b0_1000:  # FNAME
@@ -180,11 +334,35 @@ def load_gzip_header(file: FileTree) -> ctx.Gzip | None:
     return ctx.Gzip(timestamp=timestamp, filename=filename, comment=comment)
 
 
+def load_tiff_header(file: FileTree) -> ctx.Tiff | None:
+    """Load TIFF version from the byte-order mark and magic number.
+
+    Reference: TIFF Revision 6.0, Section 2: TIFF Structure
+    """
+    probe = load_probe(file)
+    try:
+        header = probe.head(4)
+    except OSError:
+        return None
+    finally:
+        _measure_probe(file, probe)
+    if len(header) < 4 or header[:2] not in (b'II', b'MM'):
+        return None
+    # 42 for TIFF, 43 for BigTIFF
+    return ctx.Tiff(
+        version=int.from_bytes(header[2:4], 'little' if header[:2] == b'II' else 'big')
+    )
+
+
 class Subjects:
     """Collections of subjects in the dataset."""
 
-    def __init__(self, tree: FileTree):
+    def __init__(self, tree: FileTree, cache: LoaderCache | None = None):
         self._tree = tree
+        self._cache = cache
+
+    def _activate(self) -> AbstractContextManager[object]:
+        return nullcontext() if self._cache is None else self._cache.activate()
 
     @cached_property
     def sub_dirs(self) -> list[str]:
@@ -195,46 +373,201 @@ class Subjects:
             if child.is_dir and child.name.startswith('sub-')
         ]
 
-    @property
+    @cached_property
     def participant_id(self) -> list[str] | None:
         """The participant_id column of participants.tsv."""
         if 'participants.tsv' not in self._tree.children:
             return None
 
-        return self._get_participant_id(self._tree.children['participants.tsv'])
+        with self._activate():
+            values = load_tsv_column(self._tree.children['participants.tsv'], 'participant_id')
+        return None if values is None else list(values)
 
     @cached_property
     def phenotype(self) -> list[str] | None:
         """The union of participant_id columns in phenotype files."""
+        subjects = self.phenotype_set
+        return None if subjects is None else sorted(subjects)
+
+    @cached_property
+    def sub_dirs_set(self) -> frozenset[str]:
+        """Subjects as determined by sub-* directories, as a set."""
+        return frozenset(self.sub_dirs)
+
+    @cached_property
+    def participant_id_set(self) -> frozenset[str] | None:
+        """The distinct values of the participant_id column of participants.tsv."""
+        if 'participants.tsv' not in self._tree.children:
+            return None
+
+        with self._activate():
+            return load_tsv_column_set(self._tree.children['participants.tsv'], 'participant_id')
+
+    @cached_property
+    def phenotype_set(self) -> frozenset[str] | None:
+        """The union of participant_id columns in phenotype files, as a set."""
         if 'phenotype' not in self._tree.children:
             return None
 
         subjects: set[str] = set()
-        for phenotype_file in self._tree.children['phenotype'].children.values():
-            if phenotype_file.name.endswith('.tsv'):
-                subjects.update(self._get_participant_id(phenotype_file) or [])
+        with self._activate():
+            for phenotype_file in self.phenotype_files:
+                subjects.update(load_tsv_column_set(phenotype_file, 'participant_id') or ())
+        return frozenset(subjects)
 
-        return sorted(subjects)
+    @property
+    def phenotype_files(self) -> list[FileTree]:
+        """TSV files of the phenotype directory."""
+        phenotype = self._tree.children.get('phenotype')
+        if phenotype is None:
+            return []
+        return [child for child in phenotype.children.values() if child.name.endswith('.tsv')]
+
+
+# Columns that subjects, sessions and associations load with load_tsv_column, by file suffix
+_TSV_COLUMNS = {
+    'participants': ('participant_id',),
+    'sessions': ('session_id',),
+    'events': ('onset',),
+    'aslcontext': ('volume_type',),
+    'channels': ('type', 'short_channel', 'sampling_frequency'),
+}
 
-    @staticmethod
-    def _get_participant_id(phenotype_file: FileTree) -> list[str] | None:
-        columns = load_tsv(phenotype_file)
-        if 'participant_id' not in columns:
-            return None
-        return list(columns['participant_id'])
+
+def prefetch_tsv_columns(file: FileTree) -> None:
+    """Load the columns of a TSV file that are read with :func:`load_tsv_column`.
+
+    The file is read once, and each column is stored in the active cache.
+    Files without such columns are not read.
+    """
+    if file.parent is not None and file.parent.relative_path == 'phenotype/':
+        columns: tuple[str, ...] = ('participant_id',)
+    else:
+        columns = _TSV_COLUMNS.get(file.name.rpartition('_')[2].removesuffix('.tsv'), ())
+    if not columns:
+        return
+
+    from .tsv import read_columns
+
+    arrays = read_columns(file.path_obj.read_bytes(), columns)
+    for column in columns:
+        values = arrays.get(column)
+        prime(load_tsv_column, None if values is None else tuple(values.tolist()), file, column)
+
+
+#: Loaders called by :meth:`Dataset.prefetch`, by file extension. Each is
+#: called with the file only, and stores what contexts load on first access.
+PREFETCH_LOADERS: dict[str, Callable[[FileTree], object]] = {
+    '.json': load_json,
+    '.tsv': prefetch_tsv_columns,
+    '.bval': load_gradient_table,
+    '.bvec': load_gradient_table,
+}
+
+
+def _files_by_directory(tree: FileTree, extensions: frozenset[str]) -> Generator[FileTree]:
+    """Find files with the given extensions, grouped by directory, skipping hidden directories."""
+    subdirs = []
+    for child in tree.children.values():
+        if child.is_dir:
+            if not child.name.startswith('.'):
+                subdirs.append(child)
+        elif f'.{child.name.partition(".")[2]}' in extensions:
+            yield child
+    for subdir in subdirs:
+        yield from _files_by_directory(subdir, extensions)
 
 
 @attrs.define
 class Dataset:
-    """A dataset object that loads properties on first access."""
+    """A dataset object that loads properties on first access.
+
+    File contents are cached in :attr:`cache`. Using the dataset as a context
+    manager makes its cache active for the duration, and releases the cache
+    on exit.
+    """
 
     tree: FileTree
     schema: Namespace
     ignored: list[str] = attrs.field(factory=list)
+    cache: LoaderCache = attrs.field(factory=LoaderCache, repr=False)
     subjects: Subjects = attrs.field(init=False)
+    _exit_stack: ExitStack = attrs.field(init=False, factory=ExitStack, repr=False)
+    _prefetch_pool: ThreadPoolExecutor | None = attrs.field(init=False, default=None, repr=False)
 
     def __attrs_post_init__(self) -> None:
-        self.subjects = Subjects(self.tree)
+        self.subjects = Subjects(self.tree, self.cache)
+
+    def __enter__(self) -> t.Self:
+        self._exit_stack.enter_context(self.cache.activate())
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self._exit_stack.close()
+        self.close()
+
+    def close(self) -> None:
+        """Release cached file contents, cancelling pending prefetches."""
+        if self._prefetch_pool is not None:
+            self._prefetch_pool.shutdown(wait=True, cancel_futures=True)
+            self._prefetch_pool = None
+        self.cache.clear()
+
+    def prefetch(
+        self,
+        extensions: t.Iterable[str] | None = None,
+        *,
+        max_workers: int | None = None,
+        wait: bool = True,
+    ) -> int:
+        """Load small metadata files into :attr:`cache` with a pool of threads.
+
+        Contexts read sidecars, TSV files and gradient tables on first access,
+        one at a time. On storage where each read is a round trip, reading them
+        ahead of validation overlaps the round trips. Files are submitted in
+        directory order, so that files read together are stored together.
+
+        Files that fail to load are skipped; their loaders raise again when
+        they are accessed.
+
+        Parameters
+        ----------
+        extensions : iterable of str, optional
+            Extensions of files to load, among the keys of
+            :data:`PREFETCH_LOADERS`. By default, all of them.
+        max_workers : int, optional
+            Number of threads, by default that of
+            :class:`~concurrent.futures.ThreadPoolExecutor`.
+        wait : bool, optional
+            If false, return immediately and load files alongside validation.
+            Pending loads are cancelled when the dataset is closed.
+
+        Returns
+        -------
+        int
+            Number of files submitted for loading.
+
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        extensions = frozenset(PREFETCH_LOADERS if extensions is None else extensions)
+        if unknown := extensions - PREFETCH_LOADERS.keys():
+            raise ValueError(f'No prefetch loader for extensions: {sorted(unknown)}')
+        files = list(_files_by_directory(self.tree, extensions))
+
+        def load(file: FileTree) -> None:
+            loader = PREFETCH_LOADERS[f'.{file.name.partition(".")[2]}']
+            # Pool threads do not inherit the active cache
+            with self.cache.activate(), suppress(Exception):
+                loader(file)
+
+        if self._prefetch_pool is None:
+            self._prefetch_pool = ThreadPoolExecutor(max_workers, 'prefetch')
+        futures = [self._prefetch_pool.submit(load, file) for file in files]
+        if wait:
+            for future in futures:
+                future.result()
+        return len(files)
 
     @cached_property
     def dataset_description(self) -> Namespace:
@@ -278,45 +611,364 @@ def find_datatypes(
 
 @attrs.define
 class Association:
-    """Generic association, exposing the associated file's path."""
+    """Generic association, exposing the associated file's path.
+
+    Contents of associated files are loaded on first access, with the loader
+    cache that was active when the association was created.
+    """
 
     _file: FileTree
+    _cache: LoaderCache = attrs.field(factory=LoaderCache.active, repr=False, eq=False)
 
     @property
     def path(self) -> str:
         """Dataset-relative path of the associated file."""
         return self._file.relative_path
 
+    def _activate(self) -> AbstractContextManager[LoaderCache]:
+        return self._cache.activate()
+
+
+class Events(Association):
+    """Events file associated with a data file."""
+
+    @cached_property
+    def onset(self) -> tuple[str, ...] | None:
+        """Values of the onset column."""
+        with self._activate():
+            return load_tsv_column(self._file, 'onset')
+
+    @property
+    def onset_values(self) -> np.ndarray | None:
+        """Onsets as floats, with NaN for ``n/a`` and values that are not numbers."""
+        with self._activate():
+            return load_tsv_numbers(self._file, 'onset')
+
+    @property
+    def onset_summary(self) -> ColumnSummary | None:
+        """Counts and range of the onsets."""
+        with self._activate():
+            return load_tsv_column_summary(self._file, 'onset')
+
+    @cached_property
+    def sidecar(self) -> Mapping[str, t.Any]:
+        """Sidecar metadata of the events file, via the inheritance principle."""
+        with self._activate():
+            return load_sidecar(self._file)
+
+
+class Aslcontext(Association):
+    """Volume types of an arterial spin labeling series."""
+
+    @cached_property
+    def volume_type(self) -> tuple[str, ...] | None:
+        """Values of the volume_type column."""
+        with self._activate():
+            return load_tsv_column(self._file, 'volume_type')
+
+    @cached_property
+    def n_rows(self) -> int:
+        """Number of rows, excluding the header."""
+        with self._activate():
+            columns = load_tsv(self._file)
+        return len(next(iter(columns.values()), ()))
+
+
+class GradientTable(Association):
+    """Diffusion gradient values (.bval) or directions (.bvec)."""
+
+    @property
+    def n_rows(self) -> int:
+        """Number of lines of the file."""
+        return self.summary.n_rows
+
+    @property
+    def n_cols(self) -> int:
+        """Number of values per line."""
+        return self.summary.n_cols
+
+    @property
+    def values(self) -> list[float]:
+        """All values of the file, line by line."""
+        return self.array.ravel().tolist()
+
+    @property
+    def array(self) -> np.ndarray:
+        """Values of the file, with one row per line."""
+        with self._activate():
+            return load_gradient_table(self._file)
+
+    @property
+    def summary(self) -> GradientSummary:
+        """Shape and range of the values of the file."""
+        with self._activate():
+            return load_gradient_summary(self._file)
+
+
+class Channels(Association):
+    """Channels file associated with a recording."""
+
+    def _column(self, column: str) -> tuple[str, ...] | None:
+        with self._activate():
+            return load_tsv_column(self._file, column)
+
+    @property
+    def type(self) -> tuple[str, ...] | None:
+        """Values of the type column."""
+        return self._column('type')
+
+    @property
+    def short_channel(self) -> tuple[str, ...] | None:
+        """Values of the short_channel column."""
+        return self._column('short_channel')
+
+    @property
+    def sampling_frequency(self) -> tuple[str, ...] | None:
+        """Values of the sampling_frequency column."""
+        return self._column('sampling_frequency')
+
+
+class Physio(Association):
+    """Physiological recording associated with a data file."""
+
+    @cached_property
+    def sidecar(self) -> Mapping[str, t.Any]:
+        """Sidecar metadata of the recording, via the inheritance principle."""
+        with self._activate():
+            return load_sidecar(self._file)
+
+
+@attrs.define
+class Coordsystems:
+    """Coordinate system files of every space that applies to a data file."""
+
+    _files: tuple[FileTree, ...]
+    _cache: LoaderCache = attrs.field(factory=LoaderCache.active, repr=False, eq=False)
+
+    @property
+    def paths(self) -> list[str]:
+        """Dataset-relative paths of the coordinate system files."""
+        return [file.relative_path for file in self._files]
+
+    @property
+    def spaces(self) -> list[str | None]:
+        """Values of the space entity of the coordinate system files."""
+        return [_parse_name(file.name)[0].get('space') for file in self._files]
+
+    @cached_property
+    def ParentCoordinateSystems(self) -> list[t.Any]:
+        """Parent coordinate systems declared by the coordinate system files."""
+        with self._cache.activate():
+            contents = [load_json(file) for file in self._files]
+        return [
+            json['ParentCoordinateSystem'] for json in contents if 'ParentCoordinateSystem' in json
+        ]
+
+
+# Classes of associations with contents; others only expose their path
+_ASSOCIATION_CLASSES: dict[str, type[Association]] = {
+    'events': Events,
+    'aslcontext': Aslcontext,
+    'bval': GradientTable,
+    'bvec': GradientTable,
+    'channels': Channels,
+    'physio': Physio,
+}
+
+
+@attrs.frozen
+class _AssociationTarget:
+    """Files that an association of ``schema.meta.associations`` applies to and selects."""
+
+    name: str
+    applies: Callable[[t.Any], bool]
+    suffix: str | None
+    extensions: tuple[str, ...]
+    entities: tuple[str, ...]
+    inherit: bool
+
+
+# Entities whose values selectors read, as in ``entities.atlas``
+_ENTITY_VALUE = re.compile(r'\bentities\.(\w+)')
+
+_ASSOCIATION_TARGETS: tuple[Namespace | None, tuple[_AssociationTarget, ...], tuple[str, ...]] = (
+    None,
+    (),
+    (),
+)
+
+
+def _association_targets(
+    schema: Namespace,
+) -> tuple[tuple[_AssociationTarget, ...], tuple[str, ...]]:
+    """Compile the associations of a schema, once for as long as the same schema is passed.
+
+    Returns the associations, and the entities whose values their selectors read.
+    """
+    global _ASSOCIATION_TARGETS
+    cached_schema, targets, read_entities = _ASSOCIATION_TARGETS
+    if cached_schema is not schema:
+        compiled = []
+        entities: set[str] = set()
+        for name, association in schema.meta.associations.items():
+            target = association.target
+            extensions = target.get('extension', ())
+            compiled.append(
+                _AssociationTarget(
+                    name=name,
+                    applies=compile_conjunction(association.selectors, schema.schema_version),
+                    suffix=target.get('suffix'),
+                    extensions=(extensions,) if isinstance(extensions, str) else tuple(extensions),
+                    entities=tuple(target.get('entities', ())),
+                    inherit=association.inherit,
+                )
+            )
+            for selector in association.selectors:
+                entities.update(_ENTITY_VALUE.findall(selector))
+        targets, read_entities = tuple(compiled), tuple(sorted(entities))
+        _ASSOCIATION_TARGETS = (schema, targets, read_entities)
+    return targets, read_entities
+
+
+def load_directory_associations(
+    tree: FileTree, schema: Namespace
+) -> dict[str, dict[str, tuple[FileTree, ...]]]:
+    """Find the files associated with every file of a directory.
+
+    Associations are those of ``schema.meta.associations``. Their selectors
+    are evaluated once for each combination of name parts in the directory.
+    Each association is resolved by walking back from the directory with
+    :func:`load_directory_index`, once for each group of files with the same
+    entities (and suffix, for associations that target files with the suffix
+    of the source), so that the data files, recordings and sidecars of an
+    acquisition share one lookup.
+
+    Results are indexed by file name, then by association name, and only
+    include associations that were found. They are stored in the active
+    :class:`~bids_validator.cache.LoaderCache`, for the same node, as
+    :func:`load_directory_index` is.
+    """
+    cache = LoaderCache.active()
+    key = (load_directory_associations, tree)
+    entry = cache.get(key)
+    if entry is not None and entry[0] is tree and entry[1] is schema:
+        return entry[2]  # type: ignore[no-any-return]
+
+    targets, read_entities = _association_targets(schema)
+    datatype = tree.name if tree.name in datatype_names(schema) else None
+    selected: dict[tuple[t.Any, ...], list[_AssociationTarget]] = {}
+    resolved: dict[tuple[t.Any, ...], tuple[FileTree, ...]] = {}
+    associations: dict[str, dict[str, tuple[FileTree, ...]]] = {}
+    for name, child in tree.children.items():
+        if child.is_dir:
+            continue
+        entities, suffix, extension = _parse_name(name)
+        parts = (suffix, extension, tuple(entities), tuple(map(entities.get, read_entities)))
+        applicable = selected.get(parts)
+        if applicable is None:
+            fields = {
+                'datatype': datatype,
+                'suffix': suffix,
+                'extension': extension,
+                'entities': entities,
+            }
+            applicable = selected[parts] = [target for target in targets if target.applies(fields)]
+
+        found = {}
+        values = tuple(entities.values())
+        for target in applicable:
+            group = (target, parts[2], values, suffix if target.suffix is None else None)
+            files = resolved.get(group)
+            if files is None:
+                files = resolved[group] = next(
+                    (
+                        tuple(matches)
+                        for matches in _walk_back(
+                            child,
+                            target.inherit,
+                            target.extensions,
+                            target.suffix,
+                            target.entities,
+                        )
+                        if matches
+                    ),
+                    (),
+                )
+            if files:
+                found[target.name] = files
+        associations[name] = found
+    # Nodes and schema are owned elsewhere; only count the associations
+    cache.put(key, (tree, schema, associations), sizeof(associations))
+    return associations
+
 
 def load_file(file: FileTree, dataset: proto.Dataset) -> None:  # -> ctx.Context:
     """Load a full context for a given file."""
     # associations = load_associations(file, dataset)
 
 
-def load_associations(file: FileTree, dataset: proto.Dataset) -> None:  # -> ctx.Associations:
-    """Load all associations for a given file."""
-    # If something fails, return None.
-    # Uses walk back algorithm
-    # https://bids-validator.readthedocs.io/en/latest/validation-model/inheritance-principle.html
-    # Stops on first success
+def load_associations(file: FileTree, dataset: Dataset) -> ctx.Associations:
+    """Load all associations for a given file.
 
+    Associated files are found with :func:`load_directory_associations`,
+    and their contents are only loaded when accessed.
 
-def load_events(file: FileTree) -> None:  # -> ctx.Events:
-    """Load events.tsv file."""
+    Raises
+    ------
+    ValidationError
+        If an association matches several files in the same directory.
 
+    """
+    if file.parent is None:
+        return ctx.Associations()
+    found = load_directory_associations(file.parent, dataset.schema).get(file.name, {})
+    associations: dict[str, t.Any] = {}
+    for name, files in found.items():
+        if name == 'coordsystems':
+            associations[name] = Coordsystems(files, dataset.cache)
+            continue
+        if len(files) > 1 and name != 'electrodes':
+            raise ValidationError(f'Multiple matching files: {list(files)}')
+        # Electrodes may be defined for several spaces; the first is exposed
+        associations[name] = _ASSOCIATION_CLASSES.get(name, Association)(files[0], dataset.cache)
+    return ctx.Associations(**associations)
+
+
+def load_events(file: FileTree) -> Events:
+    """Load events.tsv file.
+
+    Columns and sidecar are loaded on first access, with the loader cache
+    that is active when this function is called.
+    """
+    return Events(file)
 
-def load_sidecar(file: FileTree) -> dict[str, t.Any]:
+
+def load_sidecar(file: FileTree) -> Mapping[str, t.Any]:
     """Load sidecar metadata, using the inheritance principle."""
     # Uses walk back algorithm
     # https://bids-validator.readthedocs.io/en/latest/validation-model/inheritance-principle.html
-    # Accumulates all sidecars
-    metadata: dict[str, t.Any] = {}
+    return merge_sidecars(tuple(walk_back(file, inherit=True)))  # type: ignore[arg-type]
+
 
-    for json in walk_back(file, inherit=True):
-        # May need to overload walk_back
-        metadata = load_json(json) | metadata  # type: ignore[arg-type]
+def merge_sidecars(chain: tuple[FileTree, ...]) -> Mapping[str, t.Any]:
+    """Merge a chain of sidecars, nearest first, into a read-only mapping.
 
-    return metadata
+    Results are cached by chain, so files that inherit from the same sidecars,
+    such as every run of a task described by a single top-level sidecar, share
+    one mapping.
+    """
+    cache = LoaderCache.active()
+    key = (merge_sidecars, chain)
+    merged = cache.get(key)
+    if merged is None:
+        # Accumulates all sidecars, letting nearer sidecars override
+        metadata: dict[str, t.Any] = {}
+        for json in reversed(chain):
+            metadata |= load_json(json)
+        merged = MappingProxyType(metadata)
+        # Keys and values are shared with the sidecars; only count the new mapping
+        cache.put(key, merged, getsizeof(metadata) + getsizeof(merged))
+    return merged  # type: ignore[no-any-return]
 
 
 def walk_back(
@@ -345,74 +997,162 @@ def _walk_back(
     target_suffix: str | None,
     target_entities: tuple[str, ...],
 ) -> Generator[list[FileTree]]:
-    file_parts = FileParts.from_file(source)
+    source_entities, suffix, _ = _parse_name(source.name)
 
     if target_suffix is None:
-        target_suffix = file_parts.suffix
+        target_suffix = suffix
 
     tree = source.parent
     while tree:
-        matches = []
-        for child in tree.children.values():
-            if child.is_dir:
-                continue
-            parts = FileParts.from_file(child)
-            if parts.extension not in target_extensions:
-                continue
-            if parts.suffix != target_suffix:
-                continue
-            if all(
-                key in target_entities or file_parts.entities.get(key) == value
-                for key, value in parts.entities.items()
-            ):
-                matches.append(child)
-
-        yield matches
+        index = load_directory_index(tree)
+        matches: list[tuple[int, FileTree]] = []
+        for extension in target_extensions:
+            for keys, by_values in index.get((target_suffix, extension), {}).items():
+                if not target_entities:
+                    matches.extend(by_values.get(tuple(map(source_entities.get, keys)), ()))
+                    continue
+                # Target entities may take any value, so compare the remaining ones
+                fixed = [i for i, key in enumerate(keys) if key not in target_entities]
+                for values, files in by_values.items():
+                    if all(source_entities.get(keys[i]) == values[i] for i in fixed):
+                        matches.extend(files)
+        if len(matches) > 1:
+            # Restore directory order across extensions and entity sets
+            matches.sort(key=lambda match: match[0])
+        yield [child for _, child in matches]
         if not inherit:
             break
         tree = tree.parent
 
 
-@attrs.define
+def load_directory_index(tree: FileTree) -> DirectoryIndex:
+    """Index the files of a directory by suffix, extension and entities.
+
+    Files are grouped by suffix and extension, then by the names of their
+    entities, then by the values of those entities. Finding the files that
+    apply to a source file takes one lookup per group of entity names,
+    without parsing every name in the directory again. Each file is stored
+    with its position in the directory, to preserve directory order.
+
+    Indexes are stored in the active :class:`~bids_validator.cache.LoaderCache`.
+    Unlike file contents, they depend on the children of the node, which are
+    not part of its identity as a cache key, so an entry is only reused for
+    the same node.
+    """
+    cache = LoaderCache.active()
+    key = (load_directory_index, tree)
+    entry = cache.get(key)
+    if entry is None or entry[0] is not tree:
+        index: DirectoryIndex = {}
+        for position, child in enumerate(tree.children.values()):
+            if child.is_dir:
+                continue
+            entities, suffix, extension = _parse_name(child.name)
+            (
+                index.setdefault((suffix, extension), {})
+                .setdefault(tuple(entities), {})
+                .setdefault(tuple(entities.values()), [])
+                .append((position, child))
+            )
+        entry = (tree, index)
+        cache.put(key, entry)
+    return entry[1]  # type: ignore[no-any-return]
+
+
+def _parse_name(name: str) -> tuple[dict[str, str | None], str, str]:
+    """Split a file name into entities, suffix and extension (with initial dot).
+
+    Strings are interned, so that the parts of many files share their vocabulary.
+    """
+    stem, _, extension = name.partition('.')
+    if extension:
+        extension = intern(f'.{extension}')
+    *entity_strings, suffix = stem.split('_')
+    entities: dict[str, str | None] = {}
+    for string in entity_strings:
+        key, sep, value = string.partition('-')
+        entities[intern(key)] = intern(value) if sep else None
+    return entities, intern(suffix), extension
+
+
+_DATATYPE_NAMES: tuple[Namespace | None, frozenset[str]] = (None, frozenset())
+
+
+def datatype_names(schema: Namespace) -> frozenset[str]:
+    """Names of the datatype directories defined by the schema.
+
+    The set is computed once and reused for as long as the same schema is passed.
+    """
+    global _DATATYPE_NAMES
+    cached_schema, names = _DATATYPE_NAMES
+    if cached_schema is not schema:
+        names = frozenset(intern(dtype.value) for dtype in schema.objects.datatypes.values())
+        _DATATYPE_NAMES = (schema, names)
+    return names
+
+
+def _read_only(entities: Mapping[str, str | None]) -> Mapping[str, str | None]:
+    return MappingProxyType(entities)
+
+
+@attrs.frozen
 class FileParts:
     """BIDS-relevant components of a file path."""
 
     path: str
     stem: str
-    entities: dict[str, str | None]
+    #: Entities, read-only as parts are shared by every context of a file
+    entities: Mapping[str, str | None] = attrs.field(converter=_read_only)
     datatype: str | None
     suffix: str | None
     extension: str | None
 
     @classmethod
     def from_file(cls, file: FileTree, schema: Namespace | None = None) -> t.Self:
-        """Parse file parts from FileTree object."""
-        stem, _, extension = file.name.partition('.')
-
-        if extension:
-            extension = f'.{extension}'
+        """Parse file parts from FileTree object.
+
+        Results are memoized per node in the active
+        :class:`~bids_validator.cache.LoaderCache`, and shared by every
+        context of the file.
+        """
+        datatypes = datatype_names(schema) if schema else None
+        cache = LoaderCache.active()
+        key = (cls, file)
+        entry = cache.get(key)
+        if entry is not None and entry[0] is file and entry[1] is datatypes:
+            return entry[2]  # type: ignore[no-any-return]
+
+        entities, suffix, extension = _parse_name(file.name)
         if file.is_dir:
-            extension = f'{extension}/'
+            extension = intern(f'{extension}/')
 
         datatype = None
-        if file.parent and schema:
-            if any(file.parent.name == dtype.value for dtype in schema.objects.datatypes.values()):
-                datatype = file.parent.name
-
-        *entity_strings, suffix = stem.split('_')
-        entities = {
-            key: vals[0] if vals else None
-            for key, *vals in (string.split('-', 1) for string in entity_strings)
-        }
+        if file.parent and datatypes and file.parent.name in datatypes:
+            datatype = intern(file.parent.name)
 
-        return cls(
+        parts = cls(
             path=f'/{file.relative_path}',
-            stem=stem,
+            stem=file.name.partition('.')[0],
             entities=entities,
             datatype=datatype,
             suffix=suffix,
             extension=extension,
         )
+        # Nodes and schema are owned elsewhere; only count the parts
+        cache.put(key, (file, datatypes, parts), sizeof((parts, parts.path, entities)))
+        return parts
+
+
+#: Extensions of the files that content fields are read from. For files with
+#: other extensions, these fields are ``None`` and reading them does no I/O.
+FIELD_EXTENSIONS: Mapping[str, frozenset[str]] = MappingProxyType(
+    {
+        'columns': frozenset({'.tsv', '.tsv.gz'}),
+        'json': frozenset({'.json'}),
+        'nifti_header': frozenset({'.nii', '.nii.gz'}),
+        'tiff': frozenset({'.tif', '.ome.tif', '.ome.btf'}),
+    }
+)
 
 
 @attrs.define
@@ -425,7 +1165,8 @@ class Context:
     file_parts: FileParts = attrs.field(init=False)
 
     def __attrs_post_init__(self) -> None:
-        self.file_parts = FileParts.from_file(self.file, self.schema)
+        with self.dataset.cache.activate():
+            self.file_parts = FileParts.from_file(self.file, self.schema)
 
     @property
     def schema(self) -> Namespace:
@@ -438,7 +1179,7 @@ class Context:
         return self.file_parts.path
 
     @property
-    def entities(self) -> dict[str, str | None]:
+    def entities(self) -> Mapping[str, str | None]:
         """Entities parsed from the current filename."""
         return self.file_parts.entities
 
@@ -469,26 +1210,47 @@ class Context:
         """Length of the current file in bytes."""
         return self.file.path_obj.stat().st_size
 
-    @property
+    @cached_property
     def associations(self) -> ctx.Associations:
         """Associated files, indexed by suffix, selected according to the inheritance principle."""
-        return ctx.Associations()
+        with self.dataset.cache.activate():
+            return load_associations(self.file, self.dataset)
 
     @property
     def columns(self) -> Namespace | None:
-        """TSV columns, indexed by column header, values are arrays with column contents."""
+        """TSV columns, indexed by column header, values are arrays with column contents.
+
+        Values are checked against their definitions, whole columns at a time, by
+        :func:`~bids_validator.columns.check_columns`.
+        """
         if self.extension == '.tsv':
-            return load_tsv(self.file)
+            with self.dataset.cache.activate():
+                return load_tsv_columns(self.file)
         elif self.extension == '.tsv.gz':
             columns = tuple(self.sidecar.Columns) if self.sidecar else ()
-            return load_tsv_gz(self.file, columns)
+            with self.dataset.cache.activate():
+                return load_tsv_gz(self.file, columns)
         return None
 
+    @property
+    def column_summary(self) -> TableSummary | None:
+        """Row count, row width errors and per-column statistics of a .tsv.gz file.
+
+        Unlike :attr:`columns`, contents are streamed, so memory use does not grow
+        with the size of the file.
+        """
+        if self.extension != '.tsv.gz':
+            return None
+        columns = tuple(self.sidecar.Columns) if self.sidecar else ()
+        with self.dataset.cache.activate():
+            return load_tsv_gz_summary(self.file, columns)
+
     @property
     def json(self) -> Namespace | None:
         """Contents of the current JSON file."""
-        if self.file_parts.extension == '.json':
-            return Namespace(load_json(self.file))
+        if self.file_parts.extension in FIELD_EXTENSIONS['json']:
+            with self.dataset.cache.activate():
+                return Namespace(load_json(self.file))
 
         return None
 
@@ -496,14 +1258,16 @@ class Context:
     def gzip(self) -> ctx.Gzip | None:
         """Parsed contents of gzip header."""
         if self.path.endswith('.gz'):
-            return load_gzip_header(self.file)
+            with self.dataset.cache.activate():
+                return load_gzip_header(self.file)
         return None
 
     @cached_property
     def nifti_header(self) -> ctx.NiftiHeader | None:
         """Parsed contents of NIfTI header referenced elsewhere in schema."""
-        if self.extension in ('.nii', '.nii.gz'):
-            return load_nifti_header(self.file)
+        if self.extension in FIELD_EXTENSIONS['nifti_header']:
+            with self.dataset.cache.activate():
+                return load_nifti_header(self.file)
         return None
 
     @property
@@ -511,24 +1275,86 @@ class Context:
         """Parsed contents of OME-XML header, which may be found in OME-TIFF or OME-ZARR files."""
         pass
 
-    @property
-    def tiff(self) -> None:
+    @cached_property
+    def tiff(self) -> ctx.Tiff | None:
         """TIFF file format metadata."""
-        pass
+        if self.extension in FIELD_EXTENSIONS['tiff']:
+            with self.dataset.cache.activate():
+                return load_tiff_header(self.file)
+        return None
 
-    @property
+    @cached_property
     def sidecar(self) -> Namespace | None:
         """Sidecar metadata constructed via the inheritance principle."""
-        sidecar = load_sidecar(self.file) or {}
+        with self.dataset.cache.activate():
+            sidecar = load_sidecar(self.file) or {}
 
         return Namespace(sidecar)
 
 
+def preload(
+    requests: t.Iterable[tuple[Context, t.Iterable[str]]], *, max_workers: int | None = None
+) -> int:
+    """Load fields of many contexts ahead of evaluating rules on them.
+
+    Rules usually read a few fields of each context, such as the sidecar
+    or the NIfTI header, one file at a time. Loading them together instead
+    overlaps their reads, and parses NIfTI headers in one batch with
+    :func:`load_nifti_headers`. Values are stored in the caches of the
+    contexts and their datasets, where the properties of :class:`Context`
+    find them.
+
+    Fields that fail to load are skipped; their properties raise again
+    when they are accessed.
+
+    Parameters
+    ----------
+    requests : iterable of (Context, iterable of str)
+        Contexts with the names of the fields to load, such as those found
+        by :meth:`RuleIndex.fields <bids_validator.rules.RuleIndex.fields>`.
+    max_workers : int, optional
+        Number of threads, by default that of
+        :class:`~concurrent.futures.ThreadPoolExecutor`.
+
+    Returns
+    -------
+    int
+        Number of fields loaded.
+
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    loads = [(context, field) for context, fields in requests for field in fields]
+
+    headers: dict[LoaderCache, list[FileTree]] = {}
+    for context, field in loads:
+        if field == 'nifti_header' and context.extension in FIELD_EXTENSIONS[field]:
+            headers.setdefault(context.dataset.cache, []).append(context.file)
+    for cache, files in headers.items():
+        with cache.activate():
+            load_nifti_headers(files, max_workers=max_workers)
+
+    def load(context: Context, field: str) -> bool:
+        # Properties activate the cache of their dataset in pool threads
+        with suppress(Exception):
+            getattr(context, field)
+            return True
+        return False
+
+    with ThreadPoolExecutor(max_workers, 'preload') as pool:
+        futures = [pool.submit(load, context, field) for context, field in loads]
+    return sum(future.result() for future in futures)
+
+
 class Sessions:
     """Collections of sessions in subject."""
 
-    def __init__(self, tree: FileTree):
+    def __init__(self, tree: FileTree, cache: LoaderCache | None = None):
         self._tree = tree
+        self._cache = cache
+
+    def _activate(self) -> AbstractContextManager[object]:
+        return nullcontext() if self._cache is None else self._cache.activate()
 
     @cached_property
     def ses_dirs(self) -> list[str]:
@@ -548,9 +1374,21 @@ class Sessions:
         else:
             return None
 
-    @staticmethod
-    def _get_session_id(phenotype_file: FileTree) -> list[str] | None:
-        columns = load_tsv(phenotype_file)
-        if 'session_id' not in columns:
-            return None
-        return list(columns['session_id'])
+    @cached_property
+    def ses_dirs_set(self) -> frozenset[str]:
+        """Sessions as determined by ses-* directories, as a set."""
+        return frozenset(self.ses_dirs)
+
+    @property
+    def session_id_set(self) -> frozenset[str] | None:
+        """The distinct values of the session_id column of *_sessions.tsv."""
+        for name, value in self._tree.children.items():
+            if name.endswith('_sessions.tsv'):
+                with self._activate():
+                    return load_tsv_column_set(value, 'session_id')
+        return None
+
+    def _get_session_id(self, sessions_file: FileTree) -> list[str] | None:
+        with self._activate():
+            values = load_tsv_column(sessions_file, 'session_id')
+        return None if values is None else list(values)
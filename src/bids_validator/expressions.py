@@ -0,0 +1,604 @@
+r"""Compilation of schema expressions into Python functions.
+
+Schema rules select files and check their contents with expressions such as
+``suffix == "bold" && "RepetitionTime" in sidecar``. Interpreting the text of
+each expression for every file would repeat the parsing work millions of times
+in a large dataset. :func:`compile_expression` instead translates each
+expression once into a Python function of a context, which is cached by the
+expression text and schema version.
+
+The translation maps the expression language onto Python syntax, so that
+:mod:`ast` can parse it, then replaces each operation with one that follows
+the schema's rules for ``null``: missing values are ``None``, most
+operations on ``None`` return ``None``, and truthiness follows JavaScript,
+in which empty arrays and objects are true.
+
+>>> evaluate = compile_expression('suffix == "bold" && "RepetitionTime" in sidecar')
+>>> evaluate({'suffix': 'bold', 'sidecar': {'RepetitionTime': 2.0}})
+True
+>>> evaluate({'suffix': 'bold', 'sidecar': None}) is None
+True
+>>> compile_expression('length(sidecar.SliceTiming)')({'sidecar': {}}) is None
+True
+"""
+
+from __future__ import annotations
+
+import ast
+import keyword
+import math
+import re
+from collections.abc import Mapping
+from contextlib import suppress
+from functools import cache
+
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Container, Iterable, Sequence
+
+__all__ = ('ExpressionError', 'compile_conjunction', 'compile_expression', 'parse_expression')
+
+
+class ExpressionError(ValueError):
+    """An expression could not be parsed or uses unsupported syntax."""
+
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][-+]?\d+)?|\.\d+(?:[eE][-+]?\d+)?)
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<op>&&|\|\||!=|==|<=|>=|\*\*|[!<>+\-*/%()\[\].,{}])
+    """,
+    re.VERBOSE,
+)
+
+_LITERALS = {'null': None, 'true': True, 'false': False}
+
+# Prefix for identifiers that are Python keywords, such as a sidecar field named "from"
+_KEYWORD_PREFIX = '_kw_'
+
+
+def _to_python(expression: str) -> str:
+    """Rewrite the operators of an expression in Python syntax."""
+    pieces = []
+    pos = 0
+    while pos < len(expression):
+        match = _TOKEN.match(expression, pos)
+        if match is None:
+            raise ExpressionError(f'Unexpected character at {pos} in {expression!r}')
+        pos = match.end()
+        kind, text = match.lastgroup, match.group()
+        if kind == 'space':
+            pieces.append(' ')
+        elif kind == 'op' and text in ('&&', '||', '!'):
+            pieces.append({'&&': ' and ', '||': ' or ', '!': ' not '}[text])
+        elif kind == 'string':
+            # Backslashes only escape quotes, so patterns such as '\S' keep their meaning
+            quote = text[0]
+            pieces.append(repr(text[1:-1].replace(f'\\{quote}', quote)))
+        elif kind == 'name' and text != 'in' and keyword.iskeyword(text):
+            pieces.append(f'{_KEYWORD_PREFIX}{text}')
+        else:
+            pieces.append(text)
+    return ''.join(pieces)
+
+
+def _name(identifier: str) -> str:
+    return identifier.removeprefix(_KEYWORD_PREFIX)
+
+
+# Runtime support. Each operation of the expression language is one function,
+# called by compiled expressions with already evaluated operands.
+
+
+def _truthy(value: t.Any) -> bool:
+    """Truthiness, as in JavaScript: empty arrays and objects are true."""
+    if getattr(value, 'ndim', None) == 0:
+        # NumPy scalars, such as elements of columns
+        value = value.tolist()
+    if value is None or value is False:
+        return False
+    if isinstance(value, float):
+        return value != 0 and not math.isnan(value)
+    if isinstance(value, (int, str)):
+        return bool(value)
+    return True
+
+
+def _is_array(value: t.Any) -> bool:
+    return isinstance(value, (list, tuple)) or hasattr(value, 'tolist')
+
+
+def _plain(value: t.Any) -> t.Any:
+    """Convert arrays and NumPy scalars to lists and Python scalars."""
+    return value.tolist() if hasattr(value, 'tolist') else value
+
+
+def _attr(value: t.Any, name: str) -> t.Any:
+    if value is None:
+        return None
+    if isinstance(value, Mapping):
+        return value.get(name)
+    return getattr(value, name, None)
+
+
+def _index(value: t.Any, index: t.Any) -> t.Any:
+    if value is None or index is None:
+        return None
+    try:
+        return _plain(value[index])
+    except (IndexError, KeyError, TypeError):
+        return None
+
+
+def _eq(left: t.Any, right: t.Any) -> bool:
+    left_array, right_array = _is_array(left), _is_array(right)
+    if left_array or right_array:
+        return left_array and right_array and list(_plain(left)) == list(_plain(right))
+    return bool(left == right)
+
+
+def _ne(left: t.Any, right: t.Any) -> bool:
+    return not _eq(left, right)
+
+
+def _ordering(compare: Callable[[t.Any, t.Any], bool]) -> Callable[[t.Any, t.Any], bool | None]:
+    def ordering(left: t.Any, right: t.Any) -> bool | None:
+        if left is None or right is None:
+            return None
+        try:
+            return compare(left, right)
+        except TypeError:
+            return False
+
+    return ordering
+
+
+_lt = _ordering(lambda a, b: a < b)
+_le = _ordering(lambda a, b: a <= b)
+_gt = _ordering(lambda a, b: a > b)
+_ge = _ordering(lambda a, b: a >= b)
+
+
+def _in(item: t.Any, container: t.Any) -> bool | None:
+    if container is None:
+        return None
+    if isinstance(container, (Mapping, str)) or _is_array(container):
+        try:
+            return item in container
+        except TypeError:
+            return False
+    # Context objects contain the fields that are set
+    return isinstance(item, str) and getattr(container, item, None) is not None
+
+
+def _arithmetic(
+    operate: Callable[[t.Any, t.Any], t.Any],
+) -> Callable[[t.Any, t.Any], t.Any]:
+    def arithmetic(left: t.Any, right: t.Any) -> t.Any:
+        if left is None or right is None:
+            return None
+        try:
+            return operate(left, right)
+        except (TypeError, ZeroDivisionError, OverflowError):
+            return None
+
+    return arithmetic
+
+
+_add = _arithmetic(lambda a, b: a + b)
+_sub = _arithmetic(lambda a, b: a - b)
+_mul = _arithmetic(lambda a, b: a * b)
+_div = _arithmetic(lambda a, b: a / b)
+_mod = _arithmetic(lambda a, b: a % b)
+_pow = _arithmetic(lambda a, b: a**b)
+
+
+def _neg(value: t.Any) -> t.Any:
+    return None if value is None else -value
+
+
+def _number(value: t.Any) -> float:
+    """Parse numbers as JavaScript would, with NaN for non-numeric values."""
+    if isinstance(value, bool):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+# Functions of the expression language
+
+
+def _sequence(value: t.Any) -> list[t.Any] | None:
+    """Return the items of an array, or None for other values."""
+    value = _plain(value)
+    return list(value) if isinstance(value, (list, tuple)) else None
+
+
+def _count(values: t.Any, value: t.Any) -> int | None:
+    if (items := _sequence(values)) is None:
+        return None
+    return sum(_eq(item, value) for item in items)
+
+
+def _exists(context: t.Any, paths: t.Any, rule: t.Any) -> int:
+    if paths is None or rule is None:
+        return 0
+    if isinstance(paths, str):
+        paths = [paths]
+    dataset = _attr(_attr(context, 'dataset'), 'tree')
+    file = _attr(context, 'file')
+    roots: dict[str, t.Any] = {
+        'dataset': dataset,
+        'stimuli': dataset and dataset.children.get('stimuli'),
+        'file': file and file.parent,
+    }
+    if rule == 'subject':
+        subject = _attr(_attr(context, 'entities'), 'sub')
+        roots['subject'] = dataset and subject and dataset.children.get(f'sub-{subject}')
+    elif rule == 'bids-uri':
+        # Only URIs within the current dataset can be resolved
+        paths = [path[6:] for path in paths if path.startswith('bids::')]
+        rule = 'dataset'
+    root = roots.get(rule)
+    if root is None:
+        return 0
+    return sum(path in root for path in paths)
+
+
+def _index_of(values: t.Any, value: t.Any) -> int | None:
+    if (items := _sequence(values)) is None:
+        return None
+    for i, item in enumerate(items):
+        if _eq(item, value):
+            return i
+    return None
+
+
+def _intersects(left: t.Any, right: t.Any) -> list[t.Any] | bool:
+    left, right = _sequence(left), _sequence(right)
+    if left is None or right is None:
+        return False
+    lookup: Container[t.Any] = right
+    with suppress(TypeError):
+        # Look up hashable items in a set, so that large arrays are compared in linear time
+        lookup = set(right)
+
+    def contains(item: t.Any) -> bool:
+        try:
+            return item in lookup
+        except TypeError:
+            # Unhashable items cannot be looked up in a set; compare them with each item
+            return item in right
+
+    common = [item for item in left if contains(item)]
+    return common or False
+
+
+def _allequal(left: t.Any, right: t.Any) -> bool:
+    left, right = _sequence(left), _sequence(right)
+    if left is None or right is None:
+        return False
+    return len(left) == len(right) and all(map(_eq, left, right))
+
+
+def _length(value: t.Any) -> int | None:
+    if value is None or not (_is_array(value) or isinstance(value, str)):
+        return None
+    return len(value)
+
+
+def _match(value: t.Any, pattern: t.Any) -> bool | None:
+    if value is None:
+        return None
+    if pattern is None:
+        return False
+    return re.search(pattern, str(value)) is not None
+
+
+def _extremum(
+    choose: Callable[[Iterable[float]], float],
+) -> Callable[[t.Any], float | None]:
+    def extremum(values: t.Any) -> t.Any:
+        if values is None:
+            return None
+        values = _plain(values)
+        if not isinstance(values, (list, tuple)):
+            return values
+        numbers = [
+            item if isinstance(item, (int, float)) else _number(item)
+            for item in values
+            if not isinstance(item, bool)
+        ]
+        numbers = [number for number in numbers if not math.isnan(number)]
+        return choose(numbers) if numbers else None
+
+    return extremum
+
+
+_min = _extremum(min)
+_max = _extremum(max)
+
+
+def _type(value: t.Any) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    if _is_array(value):
+        return 'array'
+    return 'object'
+
+
+def _substr(value: t.Any, start: t.Any, end: t.Any) -> str | None:
+    if value is None or start is None or end is None:
+        return None
+    return str(value)[start:end]
+
+
+def _sorted(values: t.Any, method: t.Any = 'auto') -> list[t.Any] | None:
+    if (values := _sequence(values)) is None:
+        return None
+    if method == 'auto':
+        numeric = all(isinstance(item, (int, float)) for item in values)
+        method = 'numeric' if numeric else 'lexical'
+    if method == 'numeric':
+        return sorted(values, key=_number)
+    return sorted(values, key=str)
+
+
+def _unique(values: t.Any) -> list[t.Any] | None:
+    if (values := _sequence(values)) is None:
+        return None
+    try:
+        return list(dict.fromkeys(values))
+    except TypeError:
+        return [item for i, item in enumerate(values) if _index_of(values[:i], item) is None]
+
+
+#: Functions of the expression language, by name. Functions that need the
+#: context, rather than values computed from it, are called with it first.
+FUNCTIONS: dict[str, Callable[..., t.Any]] = {
+    'count': _count,
+    'exists': _exists,
+    'index': _index_of,
+    'intersects': _intersects,
+    'allequal': _allequal,
+    'length': _length,
+    'match': _match,
+    'max': _max,
+    'min': _min,
+    'type': _type,
+    'substr': _substr,
+    'sorted': _sorted,
+    'unique': _unique,
+}
+_CONTEXT_FUNCTIONS = frozenset({'exists'})
+
+_COMPARISONS: dict[type[ast.cmpop], str] = {
+    ast.Eq: '_eq',
+    ast.NotEq: '_ne',
+    ast.Lt: '_lt',
+    ast.LtE: '_le',
+    ast.Gt: '_gt',
+    ast.GtE: '_ge',
+    ast.In: '_in',
+}
+_OPERATORS: dict[type[ast.operator], str] = {
+    ast.Add: '_add',
+    ast.Sub: '_sub',
+    ast.Mult: '_mul',
+    ast.Div: '_div',
+    ast.Mod: '_mod',
+    ast.Pow: '_pow',
+}
+
+_RUNTIME: dict[str, t.Any] = {
+    '__builtins__': {},
+    '_truthy': _truthy,
+    '_attr': _attr,
+    '_index': _index,
+    '_neg': _neg,
+    **{name: globals()[name] for name in _COMPARISONS.values()},
+    **{name: globals()[name] for name in _OPERATORS.values()},
+    **{f'_f_{name}': function for name, function in FUNCTIONS.items()},
+}
+
+_CONTEXT = '_context'
+
+
+class _Translator:
+    """Translate a Python AST of an expression into calls of the runtime functions."""
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.n_temporaries = 0
+
+    def error(self, node: ast.AST) -> ExpressionError:
+        return ExpressionError(
+            f'Unsupported syntax {type(node).__name__} in expression {self.expression!r}'
+        )
+
+    def temporary(self) -> str:
+        self.n_temporaries += 1
+        return f'_v{self.n_temporaries}'
+
+    def call(self, function: str, *args: ast.expr) -> ast.Call:
+        return ast.Call(ast.Name(function, ast.Load()), list(args), [])
+
+    def visit(self, node: ast.expr) -> ast.expr:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+            return node
+        if isinstance(node, ast.Name):
+            name = _name(node.id)
+            if name in _LITERALS:
+                return ast.Constant(_LITERALS[name])
+            return self.call('_attr', ast.Name(_CONTEXT, ast.Load()), ast.Constant(name))
+        if isinstance(node, ast.Attribute):
+            return self.call('_attr', self.visit(node.value), ast.Constant(_name(node.attr)))
+        if isinstance(node, ast.Subscript) and not isinstance(node.slice, ast.Slice):
+            return self.call('_index', self.visit(node.value), self.visit(node.slice))
+        if isinstance(node, ast.List):
+            return ast.List([self.visit(elt) for elt in node.elts], ast.Load())
+        if isinstance(node, ast.Dict) and not node.keys:
+            return ast.Dict([], [])
+        if isinstance(node, ast.BoolOp):
+            return self.visit_boolop(node)
+        if isinstance(node, ast.UnaryOp):
+            return self.visit_unaryop(node)
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            return self.call(
+                _OPERATORS[type(node.op)], self.visit(node.left), self.visit(node.right)
+            )
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARISONS for op in node.ops):
+            # Chained comparisons associate to the left
+            result = self.visit(node.left)
+            for op, comparator in zip(node.ops, node.comparators, strict=True):
+                result = self.call(_COMPARISONS[type(op)], result, self.visit(comparator))
+            return result
+        if isinstance(node, ast.Call) and not node.keywords:
+            return self.visit_call(node)
+        raise self.error(node)
+
+    def visit_boolop(self, node: ast.BoolOp) -> ast.expr:
+        # a && b is a if a is false, otherwise b; a || b is a if a is true, otherwise b
+        *values, result = (self.visit(value) for value in node.values)
+        for value in reversed(values):
+            name = self.temporary()
+            first = ast.NamedExpr(ast.Name(name, ast.Store()), value)
+            test = self.call('_truthy', first)
+            saved = ast.Name(name, ast.Load())
+            if isinstance(node.op, ast.And):
+                result = ast.IfExp(test, result, saved)
+            else:
+                result = ast.IfExp(test, saved, result)
+        return result
+
+    def visit_unaryop(self, node: ast.UnaryOp) -> ast.expr:
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(ast.Not(), self.call('_truthy', self.visit(node.operand)))
+        if isinstance(node.op, ast.USub):
+            operand = self.visit(node.operand)
+            if isinstance(operand, ast.Constant) and isinstance(operand.value, (int, float)):
+                return ast.Constant(-operand.value)
+            return self.call('_neg', operand)
+        if isinstance(node.op, ast.UAdd):
+            return self.visit(node.operand)
+        raise self.error(node)
+
+    def visit_call(self, node: ast.Call) -> ast.expr:
+        if not isinstance(node.func, ast.Name) or _name(node.func.id) not in FUNCTIONS:
+            raise ExpressionError(
+                f'Unknown function {ast.unparse(node.func)!r} in expression {self.expression!r}'
+            )
+        name = _name(node.func.id)
+        args = [self.visit(arg) for arg in node.args]
+        if name in _CONTEXT_FUNCTIONS:
+            args.insert(0, ast.Name(_CONTEXT, ast.Load()))
+        return self.call(f'_f_{name}', *args)
+
+
+def parse_expression(expression: str) -> ast.expr:
+    """Parse a schema expression into a Python syntax tree.
+
+    Operators are those of Python, such as ``and`` for ``&&``. Identifiers
+    that are Python keywords are prefixed with ``_kw_``. The tree is not
+    checked for unsupported syntax, which :func:`compile_expression` rejects.
+
+    >>> ast.unparse(parse_expression('!sidecar.from && "run" in entities'))
+    "not sidecar._kw_from and 'run' in entities"
+
+    Raises
+    ------
+    ExpressionError
+        If the expression cannot be parsed.
+
+    """
+    try:
+        tree = ast.parse(_to_python(expression).strip(), mode='eval')
+    except SyntaxError as e:
+        raise ExpressionError(f'Invalid expression {expression!r}: {e.msg}') from None
+    return tree.body
+
+
+@cache
+def compile_expression(expression: str, schema_version: str = '') -> Callable[[t.Any], t.Any]:
+    """Compile a schema expression into a function of a context.
+
+    Parameters
+    ----------
+    expression : str
+        Expression in the schema expression language.
+    schema_version : str, optional
+        Version of the schema that defines the expression. Compiled functions
+        are cached by expression and schema version, so that schemas with
+        different semantics do not share functions.
+
+    Returns
+    -------
+    callable
+        Function of a context, such as a :class:`~bids_validator.context.Context`
+        or a mapping, returning the value of the expression. Names are looked
+        up as attributes of the context, or keys of mappings.
+
+    Raises
+    ------
+    ExpressionError
+        If the expression cannot be parsed, or calls an unknown function.
+
+    """
+    body = _Translator(expression).visit(parse_expression(expression))
+    function = ast.Expression(
+        ast.Lambda(
+            ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(_CONTEXT)],
+                kwonlyargs=[],
+                kw_defaults=[],
+                defaults=[],
+            ),
+            body,
+        )
+    )
+    code = compile(ast.fix_missing_locations(function), f'<expression {expression!r}>', 'eval')
+    return eval(code, _RUNTIME)  # type: ignore[no-any-return]  # noqa: S307
+
+
+@cache
+def _compile_conjunction(
+    expressions: tuple[str, ...], schema_version: str
+) -> Callable[[t.Any], bool]:
+    functions = tuple(compile_expression(expression, schema_version) for expression in expressions)
+
+    def conjunction(context: t.Any) -> bool:
+        for function in functions:
+            if not _truthy(function(context)):
+                return False
+        return True
+
+    return conjunction
+
+
+def compile_conjunction(
+    expressions: Sequence[str], schema_version: str = ''
+) -> Callable[[t.Any], bool]:
+    """Compile a list of expressions, such as the selectors of a rule, into one test.
+
+    The test is true if every expression is true, evaluating them in order
+    and stopping at the first false one. An empty list is always true.
+
+    >>> applies = compile_conjunction(['datatype == "anat"', 'suffix == "T1w"'])
+    >>> applies({'datatype': 'anat', 'suffix': 'T1w'}), applies({'datatype': 'func'})
+    (True, False)
+    """
+    return _compile_conjunction(tuple(expressions), schema_version)
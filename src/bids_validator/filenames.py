@@ -0,0 +1,372 @@
+"""Token-based parsing of BIDS file paths.
+
+:meth:`BIDSValidator.parse <bids_validator.BIDSValidator.parse>` tries one
+regular expression per filename rule, each of which re-scans the full path.
+Most of those rules differ only in their allowed entities, suffixes and
+extensions, so :class:`FilenameParser` splits a path into directories, entities,
+suffix and extension once, and checks the tokens against tables built from
+``schema.rules.files``. Results are identical to ``BIDSValidator.parse``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from itertools import chain
+
+import attrs
+import bidsschematools as bst
+import bidsschematools.rules
+import bidsschematools.schema
+import bidsschematools.utils
+from bidsschematools.types.namespace import Namespace
+
+from .bids_validator import LoggingContext
+from .types import _typings as t
+
+__all__ = ('FilenameParser',)
+
+# Matches the extension of rules with the ".*" wildcard extension
+_ANY_EXTENSION = re.compile(r'\.[a-zA-Z0-9.]+')
+
+
+@attrs.define
+class _PatternRule:
+    """Rule matched with its regular expression, for path and stem rules."""
+
+    index: int
+    regex: re.Pattern[str]
+    # First path component that a path rule can match, None for stem rules
+    head: str | None
+
+    def match(self, path: str) -> dict[str, str] | None:
+        match = self.regex.match(path)
+        if match is None:
+            return None
+        return {k: v for k, v in match.groupdict().items() if v is not None}
+
+
+@attrs.define
+class _EntityRule:
+    """Rule matched against the tokens of a path, for entity-based rules."""
+
+    index: int
+    # (entity, prefix, value pattern, required) for sub-/ses- directory levels
+    directories: tuple[tuple[str, str, re.Pattern[str], bool], ...]
+    datatypes: frozenset[str]
+    datatype_optional: bool
+    # (entity, name, value pattern, required, is_directory_entity) in schema order
+    slots: tuple[tuple[str, str, re.Pattern[str], bool, bool], ...]
+    suffixes: frozenset[str]
+    extensions: frozenset[str]
+    any_extension: bool
+
+    def match(
+        self, dirs: list[str], tokens: list[tuple[str, str]], suffix: str, extension: str
+    ) -> dict[str, str] | None:
+        result: dict[str, str] = {}
+
+        level = 0
+        for entity, prefix, pattern, required in self.directories:
+            if (
+                level < len(dirs)
+                and dirs[level].startswith(prefix)
+                and pattern.fullmatch(dirs[level], len(prefix))
+            ):
+                result[entity] = dirs[level][len(prefix) :]
+                level += 1
+            elif required:
+                return None
+
+        if self.datatypes:
+            if level < len(dirs) and dirs[level] in self.datatypes:
+                result['datatype'] = dirs[level]
+                level += 1
+            elif not self.datatype_optional:
+                return None
+
+        if level != len(dirs):
+            return None
+
+        slots = iter(self.slots)
+        for name, value in tokens:
+            for entity, slot_name, pattern, required, is_dir in slots:
+                if slot_name == name:
+                    if is_dir:
+                        # Directory entities must repeat the directory value, if any
+                        if result.get(entity) != value:
+                            return None
+                    elif pattern.fullmatch(value):
+                        result[entity] = value
+                    else:
+                        return None
+                    break
+                # Skipping a slot is only allowed for optional entities
+                if (entity in result) if is_dir else required:
+                    return None
+            else:
+                return None
+
+        for entity, _, _, required, is_dir in slots:
+            if (entity in result) if is_dir else required:
+                return None
+
+        result['suffix'] = suffix
+        result['extension'] = extension
+        return result
+
+    def may_overlap(self, other: _EntityRule) -> bool:
+        """Check whether any path could match both this rule and another.
+
+        The suffix and extension of a path are found the same way by every
+        entity rule, so two rules can only match the same path if they share
+        a suffix and an extension.
+        """
+        if self.suffixes.isdisjoint(other.suffixes):
+            return False
+        if not self.extensions.isdisjoint(other.extensions):
+            return True
+        if self.any_extension and other.any_extension:
+            return True
+        return any(
+            rule.any_extension and any(_ANY_EXTENSION.fullmatch(ext) for ext in match.extensions)
+            for rule, match in ((self, other), (other, self))
+        )
+
+
+def _entity_rule(index: int, rule: t.Any, schema: Namespace) -> _EntityRule:
+    """Build an :class:`_EntityRule`, following :func:`bidsschematools.rules._entity_rule`."""
+    directories = []
+    slots = []
+    for ent in schema.rules.entities:
+        if ent not in rule['entities']:
+            continue
+        ent_obj = rule['entities'][ent]
+        if isinstance(ent_obj, str):
+            ent_obj = {'level': ent_obj}
+        entity = {**schema.objects.entities[ent], **ent_obj}
+
+        if 'enum' in entity:
+            pattern = '|'.join(
+                value if isinstance(value, str) else value['name'] for value in entity['enum']
+            )
+        else:
+            pattern = schema.objects.formats[entity['format']].pattern
+        regex = re.compile(f'(?:{pattern})')
+        required = entity['level'] == 'required'
+
+        is_dir = ent in bst.rules.DIR_ENTITIES
+        if is_dir:
+            directories.append((ent, f'{entity["name"]}-', regex, required))
+        slots.append((ent, entity['name'], regex, required, is_dir))
+
+    datatypes = set(rule.get('datatypes', ()))
+    datatype_optional = '' in datatypes
+    datatypes.discard('')
+
+    extensions = frozenset(rule['extensions'])
+    return _EntityRule(
+        index=index,
+        directories=tuple(directories),
+        datatypes=frozenset(datatypes),
+        datatype_optional=datatype_optional,
+        slots=tuple(slots),
+        suffixes=frozenset(rule['suffixes']),
+        extensions=extensions - {'.*'},
+        any_extension='.*' in extensions,
+    )
+
+
+class FilenameParser:
+    """Parser for BIDS file paths that tokenizes each path once.
+
+    Parameters
+    ----------
+    schema : Namespace, optional
+        BIDS schema to build rule tables from. If not provided, the
+        schema bundled with ``bidsschematools`` is loaded.
+
+    Examples
+    --------
+    >>> parser = FilenameParser()
+    >>> parser.parse('/sub-01/anat/sub-01_rec-CSD_T1w.nii.gz')
+    {'subject': '01', 'datatype': 'anat', 'reconstruction': 'CSD', 'suffix': 'T1w',
+     'extension': '.nii.gz'}
+    >>> parser.parse('/sub-01/anat/sub-01_acq-23_rec-CSD_T1w.exe')
+    {}
+    >>> parser.parse('/participants.tsv')
+    {'stem': 'participants', 'extension': '.tsv'}
+
+    """
+
+    def __init__(self, schema: Namespace | None = None) -> None:
+        if schema is None:
+            with LoggingContext(bst.utils.get_logger(), level=logging.WARNING):
+                schema = bst.schema.load_schema()
+
+        rule_templates = chain.from_iterable(
+            group.values(level=2) for group in (schema.rules.files.common, schema.rules.files.raw)
+        )
+
+        pattern_rules: list[_PatternRule] = []
+        entity_rules: list[_EntityRule] = []
+        index = 0
+        for rule_template in rule_templates:
+            if 'path' in rule_template:
+                regex = bst.rules._path_rule(rule_template)['regex']
+                head = rule_template.path.split('/', 1)[0]
+                pattern_rules.append(_PatternRule(index, re.compile(regex), head))
+                index += 1
+            elif 'stem' in rule_template:
+                regex = bst.rules._stem_rule(rule_template)['regex']
+                pattern_rules.append(_PatternRule(index, re.compile(regex), None))
+                index += 1
+            else:
+                for rule in bst.rules._split_inheritance_rules(rule_template):
+                    entity_rules.append(_entity_rule(index, rule, schema))
+                    index += 1
+
+        #: All rules, in schema order
+        self.rules: tuple[_PatternRule | _EntityRule, ...] = tuple(
+            sorted((*pattern_rules, *entity_rules), key=lambda r: r.index)
+        )
+
+        #: Stem rules are candidates for every path
+        self._stem_rules = tuple(rule for rule in pattern_rules if rule.head is None)
+        #: Path rules are looked up by the first component of the path
+        self._path_rules: dict[str, list[_PatternRule]] = {}
+        for pattern_rule in pattern_rules:
+            if pattern_rule.head is not None:
+                self._path_rules.setdefault(pattern_rule.head, []).append(pattern_rule)
+
+        #: Entity rules are looked up by suffix and extension
+        self._by_suffix_extension: dict[tuple[str, str], list[_EntityRule]] = {}
+        #: Rules with the ".*" extension are looked up by suffix alone
+        self._any_extension: dict[str, list[_EntityRule]] = {}
+        for entity_rule in entity_rules:
+            for suffix in entity_rule.suffixes:
+                for extension in entity_rule.extensions:
+                    self._by_suffix_extension.setdefault((suffix, extension), []).append(
+                        entity_rule
+                    )
+                if entity_rule.any_extension:
+                    self._any_extension.setdefault(suffix, []).append(entity_rule)
+
+        self._candidates: dict[tuple[str, str, str], tuple[_PatternRule | _EntityRule, ...]] = {}
+
+    def overlapping_rules(self) -> list[list[int]]:
+        """Find the preceding rules that each rule may share matching paths with.
+
+        Path and stem rules are conservatively assumed to overlap every rule.
+        Rules that do not overlap may be tried in any order without changing
+        which rule a path matches first.
+
+        Returns
+        -------
+        list of list of int
+            For each rule, the indices of preceding rules that may match
+            the same paths.
+
+        """
+        return [
+            [
+                prev.index
+                for prev in self.rules[: rule.index]
+                if not (
+                    isinstance(rule, _EntityRule)
+                    and isinstance(prev, _EntityRule)
+                    and not rule.may_overlap(prev)
+                )
+            ]
+            for rule in self.rules
+        ]
+
+    def _get_candidates(
+        self, head: str, suffix: str, extension: str
+    ) -> tuple[_PatternRule | _EntityRule, ...]:
+        """Find all rules that may match a path, in schema order."""
+        path_rules = self._path_rules.get(head, ())
+        entity_rules = self._by_suffix_extension.get((suffix, extension), ())
+        wildcard_rules = self._any_extension.get(suffix, ())
+        if wildcard_rules and not _ANY_EXTENSION.fullmatch(extension):
+            wildcard_rules = ()
+
+        if not (entity_rules or wildcard_rules):
+            # Do not grow the cache on arbitrary, invalid suffixes and extensions
+            return tuple(sorted((*path_rules, *self._stem_rules), key=lambda r: r.index))
+
+        key = (head if path_rules else '', suffix, extension)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            rules: tuple[_PatternRule | _EntityRule, ...] = (
+                *path_rules,
+                *self._stem_rules,
+                *entity_rules,
+                *wildcard_rules,
+            )
+            by_index = {rule.index: rule for rule in rules}
+            candidates = tuple(by_index[index] for index in sorted(by_index))
+            self._candidates[key] = candidates
+        return candidates
+
+    def parse(self, path: str) -> dict[str, str]:
+        """Parse a file path into a dictionary of BIDS entities.
+
+        Accepts and returns the same values as :meth:`BIDSValidator.parse
+        <bids_validator.BIDSValidator.parse>`.
+
+        Parameters
+        ----------
+        path : str
+            Path of a file to be parsed. Must be relative to root of a BIDS
+            dataset, and must include a leading forward slash `/`.
+
+        Returns
+        -------
+        dict
+            Dictionary of BIDS entities. Keys are entity names, values are
+            entity values. If the file path is not compatible with BIDS, an
+            empty dictionary is returned.
+
+        """
+        if path.startswith(os.sep):
+            path = path.replace(os.sep, '/')
+
+        if not path.startswith('/'):
+            raise ValueError(
+                'Path must be relative to root of a BIDS dataset,'
+                ' and must include a leading forward slash `/`.'
+            )
+
+        relpath = path[1:]
+        *dirs, name = relpath.split('/')
+        # Directories, such as opaque .ds/ directories, end with a slash
+        is_dir = not name and bool(dirs)
+        if is_dir:
+            name = dirs.pop()
+
+        stem, dot, extension = name.partition('.')
+        extension = f'{dot}{extension}/' if is_dir else f'{dot}{extension}'
+        *entity_strings, suffix = stem.split('_')
+
+        head = dirs[0] if dirs else name
+        tokens: list[tuple[str, str]] | None = None
+        for rule in self._get_candidates(head, suffix, extension):
+            if isinstance(rule, _PatternRule):
+                result = rule.match(relpath)
+            else:
+                if tokens is None:
+                    tokens = []
+                    for entity_string in entity_strings:
+                        key, sep, value = entity_string.partition('-')
+                        if not sep:
+                            # No entity rule can match a malformed entity
+                            tokens = [('', '')]
+                            break
+                        tokens.append((key, value))
+                result = rule.match(dirs, tokens, suffix, extension)
+            if result is not None:
+                return result
+
+        return {}
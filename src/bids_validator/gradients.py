@@ -0,0 +1,78 @@
+r"""Parsing of diffusion gradient tables into NumPy arrays.
+
+``.bval`` files hold one line of b-values and ``.bvec`` files three lines of
+gradient directions, each with one value per volume, separated by whitespace.
+Diffusion datasets contain thousands of them, with hundreds of volumes each.
+:func:`read_gradient_table` parses them with the C parser of
+:func:`numpy.loadtxt`, without creating a Python object per value, and
+:func:`summarize_gradient_table` reduces them to the shapes and ranges that
+checks compare.
+
+>>> table = read_gradient_table(b'0 1000 1000\n')
+>>> table
+array([[   0., 1000., 1000.]])
+>>> summarize_gradient_table(table)
+GradientSummary(n_rows=1, n_cols=3, minimum=0.0, maximum=1000.0, n_zero_cols=1)
+"""
+
+from __future__ import annotations
+
+import io
+
+import attrs
+import numpy as np
+
+__all__ = ('GradientSummary', 'read_gradient_table', 'summarize_gradient_table')
+
+
+def read_gradient_table(data: bytes) -> np.ndarray:
+    """Parse the contents of a .bval or .bvec file into a 2D array.
+
+    Parameters
+    ----------
+    data : bytes
+        File contents, with values separated by whitespace.
+
+    Returns
+    -------
+    ndarray
+        Values as floats, with one row per line that is not blank.
+        A file without values has the shape ``(0, 0)``.
+
+    Raises
+    ------
+    ValueError
+        If lines have different numbers of values, or values are not numbers.
+
+    """
+    if not data or data.isspace():
+        return np.empty((0, 0))
+    # Comments are not part of the format, so "#" is an invalid value
+    return np.loadtxt(io.BytesIO(data), dtype=np.float64, comments=None, ndmin=2)
+
+
+@attrs.frozen
+class GradientSummary:
+    """Shape and range of the values of a gradient table."""
+
+    #: Number of lines with values
+    n_rows: int
+    #: Number of values per line, usually one per volume
+    n_cols: int
+    #: Smallest and largest values, ignoring NaN, if any
+    minimum: float | None
+    maximum: float | None
+    #: Number of volumes whose values are all zero, such as b=0 volumes
+    n_zero_cols: int
+
+
+def summarize_gradient_table(table: np.ndarray) -> GradientSummary:
+    """Summarize a table parsed by :func:`read_gradient_table`."""
+    numbers = table[~np.isnan(table)]
+    return GradientSummary(
+        n_rows=table.shape[0],
+        n_cols=table.shape[1],
+        minimum=float(numbers.min()) if numbers.size else None,
+        maximum=float(numbers.max()) if numbers.size else None,
+        n_zero_cols=int((table == 0).all(axis=0).sum()),
+    )
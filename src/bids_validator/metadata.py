@@ -0,0 +1,329 @@
+"""Validation of sidecar metadata against schema definitions.
+
+Fields of sidecars are defined in ``schema.objects.metadata`` with a subset of
+JSON schema: types, allowed values, numeric bounds, formats of strings, and
+the items and properties of arrays and objects. Each definition is compiled
+once per schema into a function that checks a value, so that validating the
+sidecars of many files does not rebuild the same checks for every field of
+every file.
+
+>>> from bidsschematools.schema import load_schema
+>>> validators = MetadataValidators(load_schema())
+>>> validators['RepetitionTime'](2.0) is None
+True
+>>> validators['RepetitionTime'](0)
+'0 is not greater than 0'
+>>> validators['SliceTiming']([0.0, 'x'])
+"item 1: 'x' is not of type number"
+"""
+
+from __future__ import annotations
+
+import re
+import reprlib
+from collections.abc import Mapping
+
+from bidsschematools.types.namespace import Namespace
+
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .context import Context
+    from .rules import Rule
+
+    #: Function that describes the problem with a value, or returns None if it is valid
+    Validator = Callable[[t.Any], str | None]
+
+__all__ = ('MetadataValidators', 'check_sidecar', 'compile_definition')
+
+
+def _is_number(value: t.Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_integer(value: t.Any) -> bool:
+    # As in JSON schema, numbers with no fractional part are integers
+    return _is_number(value) and (isinstance(value, int) or value.is_integer())
+
+
+_TYPES: dict[str, Callable[[t.Any], bool]] = {
+    'array': lambda value: isinstance(value, (list, tuple)),
+    'boolean': lambda value: isinstance(value, bool),
+    'integer': _is_integer,
+    'null': lambda value: value is None,
+    'number': _is_number,
+    'object': lambda value: isinstance(value, Mapping),
+    'string': lambda value: isinstance(value, str),
+}
+
+# Comparisons of numeric bounds, which fail for invalid values, and their descriptions
+_BOUNDS: dict[str, tuple[Callable[[t.Any, t.Any], bool], str]] = {
+    'minimum': (lambda value, bound: value < bound, 'less than'),
+    'exclusiveMinimum': (lambda value, bound: value <= bound, 'not greater than'),
+    'maximum': (lambda value, bound: value > bound, 'greater than'),
+    'exclusiveMaximum': (lambda value, bound: value >= bound, 'not less than'),
+}
+
+
+def _valid(value: t.Any) -> None:
+    return None
+
+
+def _all(checks: list[Validator]) -> Validator:
+    """Combine checks, returning the problem found by the first that fails."""
+    if not checks:
+        return _valid
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(value: t.Any) -> str | None:
+        for test in checks:
+            if (problem := test(value)) is not None:
+                return problem
+        return None
+
+    return check
+
+
+def _type_check(types: list[str]) -> Validator:
+    tests = [_TYPES[name] for name in types]
+    names = ' or '.join(types)
+
+    def check(value: t.Any) -> str | None:
+        if any(test(value) for test in tests):
+            return None
+        return f'{reprlib.repr(value)} is not of type {names}'
+
+    return check
+
+
+def _bound_check(keyword: str, bound: float) -> Validator:
+    fails, description = _BOUNDS[keyword]
+
+    def check(value: t.Any) -> str | None:
+        if _is_number(value) and fails(value, bound):
+            return f'{value} is {description} {bound}'
+        return None
+
+    return check
+
+
+def _enum_check(values: list[t.Any]) -> Validator:
+    # Compare types as well as values, as True == 1 in Python but not in JSON
+    allowed = {(type(value), value) for value in values}
+
+    def check(value: t.Any) -> str | None:
+        try:
+            if (type(value), value) in allowed:
+                return None
+        except TypeError:  # Unhashable values are not allowed
+            pass
+        return f'{reprlib.repr(value)} is not one of {values}'
+
+    return check
+
+
+def _format_check(name: str, pattern: str) -> Validator:
+    match = re.compile(pattern).fullmatch
+
+    def check(value: t.Any) -> str | None:
+        if isinstance(value, str) and match(value) is None:
+            return f'{value!r} is not a valid {name}'
+        return None
+
+    return check
+
+
+def _array_check(definition: Mapping[str, t.Any], formats: Namespace) -> Validator:
+    item = compile_definition(definition['items'], formats) if 'items' in definition else None
+    min_items = definition.get('minItems')
+    max_items = definition.get('maxItems')
+
+    def check(value: t.Any) -> str | None:
+        if not isinstance(value, (list, tuple)):
+            return None
+        if min_items is not None and len(value) < min_items:
+            return f'expected at least {min_items} items, found {len(value)}'
+        if max_items is not None and len(value) > max_items:
+            return f'expected at most {max_items} items, found {len(value)}'
+        if item is not None:
+            for index, element in enumerate(value):
+                if (problem := item(element)) is not None:
+                    return f'item {index}: {problem}'
+        return None
+
+    return check
+
+
+def _object_check(definition: Mapping[str, t.Any], formats: Namespace) -> Validator:
+    properties = {
+        key: compile_definition(value, formats)
+        for key, value in definition.get('properties', {}).items()
+    }
+    additional = definition.get('additionalProperties', True)
+    if isinstance(additional, Mapping):
+        additional = compile_definition(additional, formats)
+    required = tuple(definition.get('required', ()))
+
+    def check(value: t.Any) -> str | None:
+        if not isinstance(value, Mapping):
+            return None
+        for key in required:
+            if key not in value:
+                return f'missing required property {key!r}'
+        for key, element in value.items():
+            prop = properties.get(key, additional)
+            if prop is True:
+                continue
+            if prop is False:
+                return f'unexpected property {key!r}'
+            if (problem := prop(element)) is not None:
+                return f'property {key!r}: {problem}'
+        return None
+
+    return check
+
+
+def compile_definition(definition: Mapping[str, t.Any], formats: Namespace) -> Validator:
+    """Compile a metadata definition into a function that checks values.
+
+    Parameters
+    ----------
+    definition : Mapping
+        Definition of ``schema.objects.metadata``, or of part of one, such as
+        the items of an array.
+    formats : Namespace
+        Formats of strings, ``schema.objects.formats``.
+
+    Returns
+    -------
+    callable
+        Function that returns a description of the first problem with a value,
+        or ``None`` if the value is valid.
+
+    """
+    checks: list[Validator] = []
+    if 'anyOf' in definition:
+        alternatives = [compile_definition(item, formats) for item in definition['anyOf']]
+
+        def any_of(value: t.Any) -> str | None:
+            if any(alternative(value) is None for alternative in alternatives):
+                return None
+            return f'{reprlib.repr(value)} does not match any allowed definition'
+
+        checks.append(any_of)
+    if 'type' in definition:
+        types = definition['type']
+        checks.append(_type_check([types] if isinstance(types, str) else list(types)))
+    if 'enum' in definition:
+        checks.append(_enum_check(list(definition['enum'])))
+    checks.extend(
+        _bound_check(keyword, definition[keyword]) for keyword in _BOUNDS if keyword in definition
+    )
+    if 'format' in definition:
+        name = definition['format']
+        checks.append(_format_check(name, formats[name].pattern))
+    if {'items', 'minItems', 'maxItems'} & definition.keys():
+        checks.append(_array_check(definition, formats))
+    if {'properties', 'additionalProperties', 'required'} & definition.keys():
+        checks.append(_object_check(definition, formats))
+    return _all(checks)
+
+
+class MetadataValidators:
+    """Validators of the fields of ``schema.objects.metadata``, compiled on first use.
+
+    Validators are indexed by the keys of ``schema.objects.metadata``, which
+    are the names of the fields, except for fields with several definitions,
+    such as ``EchoTime__fmap`` for ``EchoTime``.
+
+    Parameters
+    ----------
+    schema : Namespace
+        BIDS schema, as loaded by :func:`bidsschematools.schema.load_schema`.
+
+    """
+
+    def __init__(self, schema: Namespace) -> None:
+        self.schema = schema
+        self._validators: dict[str, Validator] = {}
+        self._rule_fields: dict[str, tuple[tuple[str, Validator], ...]] = {}
+
+    def __getitem__(self, key: str) -> Validator:
+        validator = self._validators.get(key)
+        if validator is None:
+            # Plain dictionaries are faster to read than namespaces
+            validator = self._validators[key] = compile_definition(
+                self.schema.objects.metadata[key].to_dict(), self.schema.objects.formats
+            )
+        return validator
+
+    def name(self, key: str) -> str:
+        """Find the name of the field with a key of ``schema.objects.metadata``."""
+        return self.schema.objects.metadata[key].name  # type: ignore[no-any-return]
+
+    def rule_fields(self, rule: Rule) -> tuple[tuple[str, Validator], ...]:
+        """List the names and validators of the fields of a sidecar rule."""
+        fields = self._rule_fields.get(rule.name)
+        if fields is None:
+            fields = self._rule_fields[rule.name] = tuple(
+                (self.name(key), self[key]) for key in rule.definition.get('fields', ())
+            )
+        return fields
+
+
+# Validators of the last schema used by check_sidecar
+_VALIDATORS: tuple[Namespace | None, MetadataValidators | None] = (None, None)
+
+
+def _validators(schema: Namespace) -> MetadataValidators:
+    global _VALIDATORS
+    cached_schema, validators = _VALIDATORS
+    if cached_schema is not schema or validators is None:
+        validators = MetadataValidators(schema)
+        _VALIDATORS = (schema, validators)
+    return validators
+
+
+def check_sidecar(context: Context, rules: Iterable[Rule]) -> dict[str, str]:
+    """Check the sidecar fields of a file against their definitions.
+
+    Fields are defined by the ``fields`` of the sidecar rules that apply to
+    the file. Fields that are absent are not reported; whether they are
+    required is up to the rules.
+
+    Parameters
+    ----------
+    context : Context
+        Context of a file.
+    rules : iterable of Rule
+        Rules that apply to the file, such as those selected by
+        :meth:`RuleIndex.select <bids_validator.rules.RuleIndex.select>`.
+
+    Returns
+    -------
+    dict
+        Descriptions of invalid values, indexed by field name.
+
+    """
+    sidecar = context.sidecar
+    if not sidecar:
+        return {}
+    validators = _validators(context.schema)
+    present = set(sidecar)
+
+    errors: dict[str, str] = {}
+    checked = set()
+    for rule in rules:
+        if not rule.name.startswith('sidecars.'):
+            continue
+        for name, validator in validators.rule_fields(rule):
+            if name not in present or name in errors or (name, validator) in checked:
+                continue
+            checked.add((name, validator))
+            if (problem := validator(sidecar[name])) is not None:
+                errors[name] = problem
+    return errors
@@ -0,0 +1,606 @@
+"""Header-only reading of NIfTI files.
+
+Loading an image with nibabel to inspect its header sets up a data proxy and,
+for compressed files, a seekable gzip stream. :func:`read_nifti_header` instead
+decodes the header block with a NumPy structured dtype, and reads no further
+than the header extensions, which are only decompressed if present.
+
+The resulting :class:`~bidsschematools.types.context.NiftiHeader` is identical
+to one derived from a :class:`nibabel.nifti1.Nifti1Image`, including the fixes
+nibabel applies to invalid header fields when loading.
+"""
+
+from __future__ import annotations
+
+import sys
+
+import numpy as np
+import orjson
+from bidsschematools.types import context as ctx
+from bidsschematools.types.namespace import Namespace
+
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from _typeshed import SupportsRead
+
+__all__ = (
+    'NIFTI1_DTYPE',
+    'NIFTI2_DTYPE',
+    'decode_header',
+    'read_nifti_header',
+    'read_nifti_headers',
+)
+
+#: Layout of NIfTI-1 headers
+NIFTI1_DTYPE = np.dtype(
+    [
+        ('sizeof_hdr', 'i4'),
+        ('data_type', 'S10'),
+        ('db_name', 'S18'),
+        ('extents', 'i4'),
+        ('session_error', 'i2'),
+        ('regular', 'S1'),
+        ('dim_info', 'u1'),
+        ('dim', 'i2', (8,)),
+        ('intent_p1', 'f4'),
+        ('intent_p2', 'f4'),
+        ('intent_p3', 'f4'),
+        ('intent_code', 'i2'),
+        ('datatype', 'i2'),
+        ('bitpix', 'i2'),
+        ('slice_start', 'i2'),
+        ('pixdim', 'f4', (8,)),
+        ('vox_offset', 'f4'),
+        ('scl_slope', 'f4'),
+        ('scl_inter', 'f4'),
+        ('slice_end', 'i2'),
+        ('slice_code', 'u1'),
+        ('xyzt_units', 'u1'),
+        ('cal_max', 'f4'),
+        ('cal_min', 'f4'),
+        ('slice_duration', 'f4'),
+        ('toffset', 'f4'),
+        ('glmax', 'i4'),
+        ('glmin', 'i4'),
+        ('descrip', 'S80'),
+        ('aux_file', 'S24'),
+        ('qform_code', 'i2'),
+        ('sform_code', 'i2'),
+        ('quatern_b', 'f4'),
+        ('quatern_c', 'f4'),
+        ('quatern_d', 'f4'),
+        ('qoffset_x', 'f4'),
+        ('qoffset_y', 'f4'),
+        ('qoffset_z', 'f4'),
+        ('srow_x', 'f4', (4,)),
+        ('srow_y', 'f4', (4,)),
+        ('srow_z', 'f4', (4,)),
+        ('intent_name', 'S16'),
+        ('magic', 'S4'),
+    ]
+)
+
+#: Layout of NIfTI-2 headers
+NIFTI2_DTYPE = np.dtype(
+    [
+        ('sizeof_hdr', 'i4'),
+        ('magic', 'S4'),
+        ('eol_check', 'i1', (4,)),
+        ('datatype', 'i2'),
+        ('bitpix', 'i2'),
+        ('dim', 'i8', (8,)),
+        ('intent_p1', 'f8'),
+        ('intent_p2', 'f8'),
+        ('intent_p3', 'f8'),
+        ('pixdim', 'f8', (8,)),
+        ('vox_offset', 'i8'),
+        ('scl_slope', 'f8'),
+        ('scl_inter', 'f8'),
+        ('cal_max', 'f8'),
+        ('cal_min', 'f8'),
+        ('slice_duration', 'f8'),
+        ('toffset', 'f8'),
+        ('slice_start', 'i8'),
+        ('slice_end', 'i8'),
+        ('descrip', 'S80'),
+        ('aux_file', 'S24'),
+        ('qform_code', 'i4'),
+        ('sform_code', 'i4'),
+        ('quatern_b', 'f8'),
+        ('quatern_c', 'f8'),
+        ('quatern_d', 'f8'),
+        ('qoffset_x', 'f8'),
+        ('qoffset_y', 'f8'),
+        ('qoffset_z', 'f8'),
+        ('srow_x', 'f8', (4,)),
+        ('srow_y', 'f8', (4,)),
+        ('srow_z', 'f8', (4,)),
+        ('slice_code', 'i4'),
+        ('xyzt_units', 'i4'),
+        ('intent_code', 'i4'),
+        ('intent_name', 'S16'),
+        ('dim_info', 'u1'),
+        ('unused_str', 'S15'),
+    ]
+)
+
+#: Bytes needed to identify the header version and find its extension flag
+PREFIX_SIZE = NIFTI2_DTYPE.itemsize + 4
+
+_DTYPES = {NIFTI1_DTYPE.itemsize: NIFTI1_DTYPE, NIFTI2_DTYPE.itemsize: NIFTI2_DTYPE}
+_MAGIC = {NIFTI1_DTYPE.itemsize: (b'n+1', b'ni1'), NIFTI2_DTYPE.itemsize: (b'n+2', b'ni2')}
+# Data types with a NumPy equivalent
+_DATATYPES = frozenset((2, 4, 8, 16, 32, 64, 128, 256, 512, 768, 1024, 1280, 1792, 2304))
+_XFORM_CODES = frozenset(range(6))
+_KNOWN_DATATYPES = np.zeros(max(_DATATYPES) + 1, dtype=bool)
+_KNOWN_DATATYPES[list(_DATATYPES)] = True
+_UNITS = {
+    0: 'unknown',
+    1: 'meter',
+    2: 'mm',
+    3: 'micron',
+    8: 'sec',
+    16: 'msec',
+    24: 'usec',
+    32: 'hz',
+    40: 'ppm',
+    48: 'rads',
+}
+_MRS_ECODE = 44
+# Tolerance for the quaternion norm, following nibabel
+_QUATERNION_THRESHOLD = {
+    NIFTI1_DTYPE.itemsize: float(np.finfo(np.float32).eps * 3),
+    NIFTI2_DTYPE.itemsize: float(np.finfo(np.float64).eps * 3),
+}
+# Native fields of either header version that derived fields are computed from,
+# and 3x3 linear parts of best affines
+_TABLE_DTYPE = np.dtype(
+    [
+        ('dim', 'i8', (8,)),
+        ('dim_info', 'u1'),
+        ('xyzt_units', 'i4'),
+        ('linear', 'f8', (3, 3)),
+    ]
+)
+# Below this many files, affines are computed one at a time, which is faster
+_MIN_BATCH = 4
+_FLOAT_EPS = np.finfo(np.float64).eps
+_AXIS_LABELS = (('L', 'R'), ('P', 'A'), ('I', 'S'))
+# Little- and big-endian sizeof_hdr fields of NIfTI-2 headers
+_NIFTI2_SIZEOF = tuple(NIFTI2_DTYPE.itemsize.to_bytes(4, order) for order in ('little', 'big'))
+
+
+def _guess_dtype(block: bytes) -> np.dtype | None:
+    """Detect the header version and byte order from ``sizeof_hdr`` and ``dim``."""
+    for dtype in _DTYPES.values():
+        if len(block) < dtype.itemsize:
+            continue
+        sizeof_hdr = int.from_bytes(block[:4], sys.byteorder, signed=True)
+        swapped = int.from_bytes(block[3::-1], sys.byteorder, signed=True)
+        if dtype.itemsize not in (sizeof_hdr, swapped):
+            continue
+        # Guess byte order as nibabel.analyze.AnalyzeHeader.guessed_endian does
+        dim_type, offset = dtype.fields['dim'][:2]  # type: ignore[index]
+        width = dim_type.base.itemsize
+        dim0 = int.from_bytes(block[offset : offset + width], sys.byteorder, signed=True)
+        if (dim0 == 0 and sizeof_hdr != dtype.itemsize) or not 0 <= dim0 <= 7:
+            return dtype.newbyteorder('S')
+        return dtype
+    return None
+
+
+def _check_fix(hdrs: np.ndarray) -> list[str | None]:
+    """Apply the checks and fixes of :meth:`nibabel.nifti1.Nifti1Header.check_fix`.
+
+    Headers of one version and byte order are fixed in place. A description of
+    the first problem nibabel would raise an error for is returned for each
+    header, or None if it is valid.
+    """
+    size = hdrs.dtype.itemsize
+    magic = hdrs['magic']
+    datatype = hdrs['datatype']
+    vox_offset = hdrs['vox_offset']
+    bad_magic = (magic != _MAGIC[size][0]) & (magic != _MAGIC[size][1])
+    known = (datatype >= 0) & (datatype < len(_KNOWN_DATATYPES))
+    bad_datatype = ~_KNOWN_DATATYPES[np.where(known, datatype, 0)] | ~known
+    bad_offset = (magic == _MAGIC[size][0]) & (0 < vox_offset) & (vox_offset < size + 4)
+    bad_eol = np.zeros(len(hdrs), dtype=bool)
+    if size == NIFTI2_DTYPE.itemsize:
+        eol_check = hdrs['eol_check']
+        bad_eol = ~((eol_check == (13, 10, 26, 10)).all(axis=1) | (eol_check == 0).all(axis=1))
+
+    errors: list[str | None] = [None] * len(hdrs)
+    for index in np.flatnonzero(bad_magic | bad_datatype | bad_offset | bad_eol).tolist():
+        if bad_magic[index]:
+            errors[index] = f'Invalid NIfTI magic string {magic[index]!r}'
+        elif bad_datatype[index]:
+            errors[index] = f'Unsupported NIfTI data type {int(datatype[index])}'
+        elif bad_offset[index]:
+            errors[index] = f'Voxel offset {vox_offset[index]} is inside the header'
+        else:
+            errors[index] = 'NIfTI-2 header may be corrupted by newline conversion'
+
+    pixdim = hdrs['pixdim']
+    pixdim[(pixdim[:, 0] != -1) & (pixdim[:, 0] != 1), 0] = 1
+    spatial = pixdim[:, 1:4]
+    spatial[spatial == 0] = 1
+    np.abs(spatial, out=spatial)
+    for field in ('qform_code', 'sform_code'):
+        codes = hdrs[field]
+        codes[(codes < min(_XFORM_CODES)) | (codes > max(_XFORM_CODES))] = 0
+    return errors
+
+
+def decode_header(block: bytes) -> np.ndarray:
+    """Decode a NIfTI-1 or NIfTI-2 header block into a structured array scalar.
+
+    The version and byte order are detected from the ``sizeof_hdr`` and
+    ``dim`` fields. Header fields that nibabel would fix when loading an
+    image are fixed in the same way.
+
+    Parameters
+    ----------
+    block : bytes
+        The start of a NIfTI file, at least as long as the header.
+
+    Returns
+    -------
+    numpy.ndarray
+        Zero-dimensional array with :data:`NIFTI1_DTYPE` or
+        :data:`NIFTI2_DTYPE` fields, in the byte order of the file.
+
+    Raises
+    ------
+    ValueError
+        If the block does not contain a valid NIfTI header.
+
+    """
+    dtype = _guess_dtype(block)
+    if dtype is None:
+        raise ValueError('Not a NIfTI-1 or NIfTI-2 header')
+    hdrs = np.frombuffer(block, dtype=dtype, count=1).copy()
+    (error,) = _check_fix(hdrs)
+    if error is not None:
+        raise ValueError(error)
+    return hdrs.reshape(())
+
+
+def _data_shape(hdr: np.ndarray | np.void, dims: list[int]) -> tuple[int, ...]:
+    """Compute the data shape as :meth:`nibabel.nifti1.Nifti1Header.get_data_shape` does."""
+    ndim = dims[0]
+    if ndim == 0:
+        return (0,)
+    shape = tuple(dims[1 : ndim + 1])
+    if hdr.dtype.itemsize == NIFTI1_DTYPE.itemsize:
+        # Freesurfer conventions for long vectors and icosahedra
+        if shape[:3] == (-1, 1, 1):
+            return (int(hdr['glmin']), 1, 1, *shape[3:])
+        if shape[:3] == (27307, 1, 6):
+            return (163842, 1, 1, *shape[3:])
+    return shape
+
+
+def _best_affine(hdr: np.ndarray | np.void) -> np.ndarray:
+    """Compute the affine as :meth:`nibabel.nifti1.Nifti1Header.get_best_affine` does."""
+    from nibabel.quaternions import fillpositive, quat2mat
+    from nibabel.volumeutils import shape_zoom_affine
+
+    affine = np.eye(4)
+    if hdr['sform_code'] != 0:
+        affine[0] = hdr['srow_x']
+        affine[1] = hdr['srow_y']
+        affine[2] = hdr['srow_z']
+    elif hdr['qform_code'] != 0:
+        quat = fillpositive(  # type: ignore[no-untyped-call]
+            [hdr['quatern_b'], hdr['quatern_c'], hdr['quatern_d']],
+            _QUATERNION_THRESHOLD[hdr.dtype.itemsize],
+        )
+        vox = hdr['pixdim'][1:4].copy()
+        vox[-1] *= hdr['pixdim'][0]
+        affine[:3, :3] = quat2mat(quat) @ np.diag(vox)  # type: ignore[no-untyped-call]
+        affine[:3, 3] = [hdr['qoffset_x'], hdr['qoffset_y'], hdr['qoffset_z']]
+    else:
+        ndim = int(hdr['dim'][0])
+        affine = shape_zoom_affine(hdr['dim'][1 : ndim + 1], hdr['pixdim'][1 : ndim + 1])
+    return affine
+
+
+def _linear_parts(hdrs: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Compute the 3x3 linear part of each best affine, as :func:`_best_affine` would.
+
+    Headers of one version and byte order are processed together, with
+    quaternions converted in extended precision, as nibabel does.
+    Returns the matrices and a mask of headers that need :func:`_best_affine`:
+    invalid quaternions and unusual dimensions.
+    """
+    n_hdrs = len(hdrs)
+    linear = np.zeros((n_hdrs, 3, 3))
+    ndim = hdrs['dim'][:, 0].astype(np.int64)
+    sform = hdrs['sform_code'] != 0
+    qform = ~sform & (hdrs['qform_code'] != 0)
+    fallback = ~sform & ~qform & ((ndim < 0) | (ndim > 7))
+
+    for row, field in enumerate(('srow_x', 'srow_y', 'srow_z')):
+        linear[sform, row] = hdrs[field][sform, :3]
+
+    if qform.any():
+        # Quaternion to rotation matrix, as nibabel.quaternions.fillpositive and quat2mat
+        xyz = np.stack(
+            [hdrs[field][qform] for field in ('quatern_b', 'quatern_c', 'quatern_d')], axis=1
+        ).astype(np.longdouble)
+        w2 = 1.0 - (xyz * xyz).sum(axis=1)
+        zero_w = np.abs(w2) < abs(_QUATERNION_THRESHOLD[hdrs.dtype.itemsize])
+        invalid = ~zero_w & (w2 < 0)
+        w = np.where(zero_w | invalid, 0, np.sqrt(np.where(invalid, 0, w2)))
+        x, y, z = xyz.T
+        norm = w * w + x * x + y * y + z * z
+        scale = np.where(norm < _FLOAT_EPS, 0, 2.0 / np.where(norm == 0, 1, norm))
+        X, Y, Z = x * scale, y * scale, z * scale
+        wX, wY, wZ = w * X, w * Y, w * Z
+        xX, xY, xZ = x * X, x * Y, x * Z
+        yY, yZ, zZ = y * Y, y * Z, z * Z
+        rotation = np.stack(
+            [
+                np.stack([1.0 - (yY + zZ), xY - wZ, xZ + wY], axis=-1),
+                np.stack([xY + wZ, 1.0 - (xX + zZ), yZ - wX], axis=-1),
+                np.stack([xZ - wY, yZ + wX, 1.0 - (xX + yY)], axis=-1),
+            ],
+            axis=1,
+        )
+        # Degenerate quaternions give an identity rotation
+        rotation[norm < _FLOAT_EPS] = np.eye(3)
+        vox = hdrs['pixdim'][qform, 1:4].copy()
+        vox[:, -1] *= hdrs['pixdim'][qform, 0]
+        linear[qform] = rotation * vox[:, np.newaxis, :]
+        fallback[np.flatnonzero(qform)[invalid]] = True
+
+    # As nibabel.volumeutils.shape_zoom_affine, with x_flip
+    zooms = hdrs['pixdim'][:, 1:4].copy()
+    zooms[np.arange(3) >= ndim[:, np.newaxis]] = 1
+    zooms[:, 0] *= -1
+    shaped = ~sform & ~qform & ~fallback
+    linear[shaped] = zooms[shaped, np.newaxis, :] * np.eye(3)
+    return linear, fallback
+
+
+def _axis_codes(linear: np.ndarray) -> tuple[list[tuple[str | None, ...]], np.ndarray]:
+    """Compute axis codes of many affines, as :func:`nibabel.orientations.aff2axcodes` does.
+
+    Returns the codes and a mask of matrices that are not finite or are rank
+    deficient, whose codes must be computed one at a time.
+    """
+    n_mats = len(linear)
+    codes: list[tuple[str | None, ...]] = [()] * n_mats
+    finite = np.isfinite(linear).all(axis=(1, 2))
+    zooms = np.sqrt(np.sum(linear * linear, axis=1))
+    zooms[zooms == 0] = 1
+    scaled = linear / zooms[:, np.newaxis, :]
+    scaled[~finite] = np.eye(3)
+
+    # Polar decomposition, as in nibabel.orientations.io_orientation
+    left, singular, right = np.linalg.svd(scaled, full_matrices=False)
+    tol = singular.max(axis=1) * 3 * _FLOAT_EPS
+    full_rank = (singular > tol[:, np.newaxis]).all(axis=1)
+    skip = ~finite | ~full_rank
+    rot = left @ right
+
+    rows = np.arange(n_mats)
+    out_axes = np.full((n_mats, 3), -1)
+    flipped = np.zeros((n_mats, 3), dtype=bool)
+    in_order = np.argsort(np.min(-(rot**2), axis=1), axis=1, kind='stable')
+    for step in range(3):
+        in_ax = in_order[:, step]
+        col = rot[rows, :, in_ax]
+        nonzero = ~(np.abs(col) <= 1e-8).all(axis=1)
+        out_ax = np.argmax(np.abs(col), axis=1)
+        out_axes[nonzero, in_ax[nonzero]] = out_ax[nonzero]
+        flipped[nonzero, in_ax[nonzero]] = col[rows, out_ax][nonzero] < 0
+        rot[rows[nonzero], out_ax[nonzero], :] = 0
+
+    for index in np.flatnonzero(~skip).tolist():
+        codes[index] = tuple(
+            None if axis < 0 else _AXIS_LABELS[axis][0 if flip else 1]
+            for axis, flip in zip(out_axes[index].tolist(), flipped[index].tolist(), strict=True)
+        )
+    return codes, skip
+
+
+def _read_mrs_extension(
+    fobj: SupportsRead[bytes], ext_dtype: np.dtype, vox_offset: int, offset: int
+) -> t.Any:
+    """Find the first MRS extension and decode its JSON, skipping other extensions."""
+    # Extensions fill the space before the data, or the rest of the file if no offset is set
+    remaining = vox_offset - offset
+    while remaining >= 16 or remaining < 0:
+        ext_def = fobj.read(8)
+        if not ext_def and remaining < 0:
+            break
+        if len(ext_def) != 8:
+            raise ValueError('Failed to read NIfTI extension header')
+        esize, ecode = (int(value) for value in np.frombuffer(ext_def, dtype=ext_dtype))
+        if esize < 8:
+            raise ValueError(f'Invalid NIfTI extension size {esize}')
+        content = fobj.read(esize - 8)
+        if len(content) != esize - 8:
+            raise ValueError('Failed to read NIfTI extension content')
+        if ecode == _MRS_ECODE:
+            return orjson.loads(content.rstrip(b'\x00'))
+        remaining -= esize
+    return None
+
+
+def _read_block(fobj: SupportsRead[bytes]) -> bytes:
+    """Read the header and extension flag, reading further only for NIfTI-2."""
+    block = fobj.read(NIFTI1_DTYPE.itemsize + 4)
+    if block[:4] in _NIFTI2_SIZEOF:
+        block += fobj.read(PREFIX_SIZE - len(block))
+    return block
+
+
+def _read_extensions(
+    fobj: SupportsRead[bytes], hdr: np.ndarray | np.void, block: bytes
+) -> Namespace | None:
+    """Read MRS metadata from the extensions following a header block, if any."""
+    size = hdr.dtype.itemsize
+    # The first byte of the four following the header flags the presence of extensions
+    if len(block) < size + 4 or block[size] == 0:
+        return None
+    # Extension sizes and codes have the byte order of sizeof_hdr
+    ext_dtype = hdr.dtype['sizeof_hdr']
+    mrs_meta = _read_mrs_extension(fobj, ext_dtype, int(hdr['vox_offset']), size + 4)
+    return Namespace(mrs_meta) if mrs_meta is not None else None
+
+
+def _make_header(
+    hdr: np.ndarray | np.void,
+    dims: list[int],
+    dim_info: list[int],
+    units: list[int],
+    axis_codes: tuple[str | None, ...],
+    mrs: Namespace | None,
+) -> ctx.NiftiHeader:
+    """Assemble a NiftiHeader from a fixed header and its derived fields."""
+    space_units, time_units = (_UNITS.get(code, 'unknown') for code in units)
+    if time_units not in ('unknown', 'sec', 'msec', 'usec'):
+        # The NIfTI standard allows for 'Hz', 'ppm' and 'rads', but BIDS currently
+        # considers temporal units.
+        time_units = 'unknown'
+    ndim = dims[0]
+    return ctx.NiftiHeader(
+        # BIDS context uses 1,2,3 with 0 as absent, the same as the NIfTI bit fields
+        dim_info=ctx.DimInfo(*dim_info),
+        dim=hdr['dim'],  # type: ignore[arg-type]
+        pixdim=hdr['pixdim'],  # type: ignore[arg-type]
+        shape=_data_shape(hdr, dims),
+        voxel_sizes=tuple(hdr['pixdim'][1 : ndim + 1]) if ndim else (1.0,),
+        xyzt_units=ctx.XyztUnits(space_units, time_units),  # type: ignore[arg-type]
+        qform_code=int(hdr['qform_code']),
+        sform_code=int(hdr['sform_code']),
+        axis_codes=axis_codes,  # type: ignore[arg-type]
+        mrs=mrs,
+    )
+
+
+def read_nifti_headers(fobjs: Sequence[SupportsRead[bytes]]) -> list[ctx.NiftiHeader | ValueError]:
+    """Read the NIfTI headers of many files at once.
+
+    Header blocks are decoded into one structured array per version and byte
+    order, and derived fields, including affines and axis codes, are computed
+    over the whole batch. Extensions are read only from files that have them.
+
+    Parameters
+    ----------
+    fobjs : sequence of file objects
+        Binary streams of (decompressed) NIfTI file contents, positioned
+        at the start of each file. Only the header and extensions are read.
+
+    Returns
+    -------
+    list
+        A :class:`~bidsschematools.types.context.NiftiHeader` for each
+        stream, or the :class:`ValueError` :func:`read_nifti_header` would
+        raise if it does not contain a valid NIfTI header.
+
+    """
+    from nibabel.orientations import aff2axcodes
+
+    n_files = len(fobjs)
+    results: list[ctx.NiftiHeader | ValueError | None] = [None] * n_files
+    blocks = [_read_block(fobj) for fobj in fobjs]
+
+    groups: dict[np.dtype, list[int]] = {}
+    for index, block in enumerate(blocks):
+        dtype = _guess_dtype(block)
+        if dtype is None:
+            results[index] = ValueError('Not a NIfTI-1 or NIfTI-2 header')
+        else:
+            groups.setdefault(dtype, []).append(index)
+
+    # One native-endian table of the fields that derived values are computed from
+    table = np.zeros(n_files, dtype=_TABLE_DTYPE)
+    records: list[np.void | None] = [None] * n_files
+    fallback = np.zeros(n_files, dtype=bool)
+    for dtype, indices in groups.items():
+        hdrs = np.frombuffer(
+            b''.join(blocks[index][: dtype.itemsize] for index in indices), dtype=dtype
+        ).copy()
+        errors = _check_fix(hdrs)
+        for name in _TABLE_DTYPE.names:  # type: ignore[union-attr]
+            if name == 'linear':
+                if n_files >= _MIN_BATCH:
+                    table[name][indices], fallback[indices] = _linear_parts(hdrs)
+            else:
+                table[name][indices] = hdrs[name]
+        for index, record, error in zip(indices, hdrs, errors, strict=True):
+            if error is None:
+                records[index] = record
+            else:
+                results[index] = ValueError(error)
+
+    codes: list[tuple[str | None, ...]] = [()] * n_files
+    if n_files >= _MIN_BATCH:
+        codes, skip = _axis_codes(table['linear'])
+        fallback |= skip
+    else:
+        fallback[:] = True
+
+    info = table['dim_info'].astype(np.int64)
+    dim_info = np.stack([info & 3, (info >> 2) & 3, (info >> 4) & 3], axis=1).tolist()
+    xyzt = table['xyzt_units'].astype(np.int64)
+    units = np.stack([xyzt % 8, xyzt - xyzt % 8], axis=1).tolist()
+    dims = table['dim'].tolist()
+
+    for index, record in enumerate(records):
+        if record is None:
+            continue
+        try:
+            if fallback[index]:
+                codes[index] = aff2axcodes(_best_affine(record))  # type: ignore[no-untyped-call]
+            mrs = _read_extensions(fobjs[index], record, blocks[index])
+        except ValueError as err:
+            results[index] = err
+            continue
+        results[index] = _make_header(
+            record, dims[index], dim_info[index], units[index], codes[index], mrs
+        )
+    return results  # type: ignore[return-value]
+
+
+def read_nifti_header(fobj: SupportsRead[bytes]) -> ctx.NiftiHeader:
+    """Read a NIfTI header from the start of a file.
+
+    Parameters
+    ----------
+    fobj : file object
+        Binary stream of (decompressed) NIfTI file contents, positioned
+        at the start of the file. Only the header and extensions are read.
+
+    Returns
+    -------
+    NiftiHeader
+
+    Raises
+    ------
+    ValueError
+        If the stream does not contain a valid NIfTI header.
+
+    """
+    from nibabel.orientations import aff2axcodes
+
+    block = _read_block(fobj)
+    hdr = decode_header(block)
+    mrs = _read_extensions(fobj, hdr, block)
+    info = int(hdr['dim_info'])
+    units = int(hdr['xyzt_units'])
+    return _make_header(
+        hdr,
+        hdr['dim'].tolist(),
+        [info & 3, (info >> 2) & 3, (info >> 4) & 3],
+        [units % 8, units - units % 8],
+        aff2axcodes(_best_affine(hdr)),  # type: ignore[no-untyped-call]
+        mrs,
+    )
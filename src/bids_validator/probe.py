@@ -0,0 +1,185 @@
+r"""Shared access to the leading bytes of files.
+
+Several context fields are derived from the first few hundred bytes of a file:
+the gzip header, the NIfTI header inside a compressed stream, or the magic
+number and version of a TIFF file. Opening the file once per field costs a
+round trip each on network filesystems. A :class:`FileProbe` reads a leading
+block once, decompresses only as much of it as is requested, and serves every
+header parser from the same buffers. Remote files are read with bounded
+byte-range requests, so object stores transfer little more than the headers.
+
+>>> import gzip
+>>> data = gzip.compress(b'n+1' * 1000)
+>>> probe = FileProbe(lambda offset, size: data[offset : offset + size])
+>>> probe.head(2)
+b'\x1f\x8b'
+>>> probe.decompressed(6)
+b'n+1n+1'
+"""
+
+from __future__ import annotations
+
+import threading
+import zlib
+from functools import partial
+
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from fsspec import AbstractFileSystem
+    from upath import UPath
+
+__all__ = ('BLOCK_SIZE', 'REMOTE_BLOCK_SIZE', 'FileProbe', 'ProbeReader')
+
+#: Number of bytes read on first access. Large enough to hold the gzip header,
+#: a NIfTI header and typical extensions, small enough to be a single read.
+BLOCK_SIZE = 8192
+#: Number of bytes requested on first access of remote files, where each read
+#: is a round trip and latency dominates transfer time for small ranges.
+REMOTE_BLOCK_SIZE = 64 * 2**10
+
+# Accept gzip streams only; zlib's +32 auto-detection would also accept zlib streams
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+# Memory zlib allocates for a decompressor once it is fed: its window and state
+_INFLATER_SIZE = 2**zlib.MAX_WBITS + 8 * 2**10
+
+
+def _read_local(path: UPath, offset: int, size: int) -> bytes:
+    with path.open('rb') as fobj:
+        if offset:
+            fobj.seek(offset)
+        return fobj.read(size)
+
+
+def _read_remote(fs: AbstractFileSystem, path: str, offset: int, size: int) -> bytes:
+    try:
+        data = fs.cat_file(path, start=offset, end=offset + size)
+    except Exception:
+        # Some servers reject ranges that start at the end of the object
+        if offset and offset >= fs.size(path):
+            return b''
+        raise
+    # Servers that do not support ranges return the whole object
+    if len(data) > size:
+        data = data[offset : offset + size]
+    return data  # type: ignore[no-any-return]
+
+
+class FileProbe:
+    """Buffered leading bytes of a file, raw and decompressed.
+
+    Buffers are filled on demand and grow geometrically when a parser needs
+    more than was read so far, so a header that fits in the first block costs
+    one read of the file.
+
+    Parameters
+    ----------
+    read_range : callable
+        Function of an offset and a size, returning up to ``size`` bytes of
+        the file starting at ``offset``. An empty result marks the end of file.
+    block_size : int, optional
+        Size of the first read.
+
+    """
+
+    def __init__(
+        self, read_range: Callable[[int, int], bytes], block_size: int = BLOCK_SIZE
+    ) -> None:
+        self._read_range = read_range
+        self.block_size = block_size
+        self._raw = b''
+        self._at_eof = False
+        self._plain = bytearray()
+        self._inflater = zlib.decompressobj(_GZIP_WBITS)
+        self._fed = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_path(cls, path: UPath, block_size: int | None = None) -> t.Self:
+        """Create a probe that reads ranges of a local or remote file.
+
+        Local files are read with seek and read. Remote files are read with
+        byte-range requests through their fsspec filesystem, rather than a
+        buffered file object that may fetch much more than the header.
+        """
+        if path.protocol in ('', 'file', 'local'):
+            return cls(partial(_read_local, path), block_size or BLOCK_SIZE)
+        return cls(partial(_read_remote, path.fs, path.path), block_size or REMOTE_BLOCK_SIZE)
+
+    def __sizeof__(self) -> int:
+        # Buffers are found through the instance dictionary; decompressor state is not
+        return super().__sizeof__() + (_INFLATER_SIZE if self._fed else 0)
+
+    def _grow(self, size: int) -> bool:
+        """Extend the raw buffer to at least ``size`` bytes, if the file is that long."""
+        while len(self._raw) < size and not self._at_eof:
+            want = max(size - len(self._raw), len(self._raw), self.block_size)
+            chunk = self._read_range(len(self._raw), want)
+            self._raw += chunk
+            self._at_eof = len(chunk) < want
+        return len(self._raw) >= size
+
+    def head(self, size: int) -> bytes:
+        """Return the first ``size`` bytes of the file, or all of a shorter file."""
+        with self._lock:
+            self._grow(size)
+            return self._raw[:size]
+
+    def decompressed(self, size: int) -> bytes:
+        """Return the first ``size`` bytes of the decompressed contents of a gzip file.
+
+        Decompression stops once enough bytes are available. Files with multiple
+        gzip members are decompressed across member boundaries, as by
+        :mod:`gzip`. Corrupt or truncated streams yield the bytes decoded so far.
+        """
+        with self._lock:
+            inflater = self._inflater
+            while len(self._plain) < size:
+                if inflater.eof:
+                    # Continue with the next member, if there is one
+                    data = inflater.unused_data
+                    inflater = self._inflater = zlib.decompressobj(_GZIP_WBITS)
+                else:
+                    data = inflater.unconsumed_tail
+                if not data:
+                    if self._fed == len(self._raw) and not self._grow(self._fed + 1):
+                        break
+                    data = self._raw[self._fed :]
+                    self._fed = len(self._raw)
+                try:
+                    self._plain += inflater.decompress(data, size - len(self._plain))
+                except zlib.error:
+                    break
+            return bytes(self._plain[:size])
+
+    def reader(self, *, decompress: bool = False) -> ProbeReader:
+        """Return a file-like reader of the raw or decompressed contents."""
+        return ProbeReader(self.decompressed if decompress else self.head)
+
+
+class ProbeReader:
+    """Minimal binary file interface over a :class:`FileProbe` buffer."""
+
+    def __init__(self, head: Callable[[int], bytes]) -> None:
+        self._head = head
+        self._pos = 0
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes, or to the end of file if ``size`` is negative."""
+        if size < 0:
+            # Grow geometrically until the buffer stops growing
+            want = max(2 * self._pos, BLOCK_SIZE)
+            while len(data := self._head(want)) == want:
+                want *= 2
+        else:
+            data = self._head(self._pos + size)
+        chunk = data[self._pos :]
+        self._pos += len(chunk)
+        return chunk
+
+    def tell(self) -> int:
+        """Return the current position."""
+        return self._pos
@@ -0,0 +1,303 @@
+"""Selection of the schema rules that apply to a file.
+
+A rule of ``schema.rules`` applies to a file if all of its selectors are true
+in the context of the file. Evaluating the selectors of every rule for every
+file repeats the same work many times, as most selectors only compare the
+datatype, suffix, extension or modality of a file, or test whether an entity
+is present, such as ``suffix == "bold"`` or ``"run" in entities``. The result of
+such selectors is the same for all files with the same name parts.
+
+:class:`RuleIndex` evaluates these selectors once for each combination of
+name parts, and only evaluates the other selectors of the rules that remain.
+It also finds which fields of a context the remaining rules can read, so that
+fields such as NIfTI headers are only loaded for files whose rules use them.
+"""
+
+from __future__ import annotations
+
+import ast
+from collections.abc import Mapping
+
+import attrs
+from bidsschematools.types.namespace import Namespace
+
+from .context import FIELD_EXTENSIONS
+from .expressions import _CONTEXT_FUNCTIONS, _LITERALS, compile_conjunction, parse_expression
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+__all__ = (
+    'CONTENT_FIELDS',
+    'NAME_FIELDS',
+    'Rule',
+    'RuleIndex',
+    'find_rules',
+    'is_name_selector',
+    'referenced_fields',
+    'rule_fields',
+)
+
+#: Context fields that only depend on the name of a file
+NAME_FIELDS = frozenset({'datatype', 'suffix', 'extension', 'modality'})
+
+#: Context fields that are loaded from the contents of files
+CONTENT_FIELDS = frozenset(
+    {'associations', 'columns', 'gzip', 'json', 'nifti_header', 'sidecar', 'tiff'}
+)
+
+# Fields read by each group of rules, besides those in their expressions
+_GROUP_FIELDS = {
+    'sidecars': frozenset({'sidecar'}),
+    'json': frozenset({'json'}),
+    'tabular_data': frozenset({'columns'}),
+}
+
+
+@attrs.frozen
+class Rule:
+    """A rule of the schema that selects files with expressions."""
+
+    #: Path of the rule in ``schema.rules``, such as ``checks.func.RepetitionTimeMismatch``
+    name: str
+    selectors: tuple[str, ...]
+    definition: Namespace = attrs.field(eq=False, repr=False)
+
+
+def find_rules(schema: Namespace) -> Iterator[Rule]:
+    """Find the rules with selectors in ``schema.rules``, in schema order."""
+
+    def walk(namespace: Mapping[str, t.Any], prefix: str) -> Iterator[Rule]:
+        for key, value in namespace.items():
+            if not isinstance(value, Mapping):
+                continue
+            if 'selectors' in value:
+                yield Rule(f'{prefix}{key}', tuple(value['selectors']), Namespace(value))
+            else:
+                yield from walk(value, f'{prefix}{key}.')
+
+    yield from walk(schema.rules, '')
+
+
+def _is_entity_test(node: ast.AST) -> bool:
+    """Whether a node tests the presence of an entity, as in ``"run" in entities``."""
+    return (
+        isinstance(node, ast.Compare)
+        and len(node.ops) == 1
+        and isinstance(node.ops[0], (ast.In, ast.NotIn))
+        and isinstance(node.left, ast.Constant)
+        and isinstance(node.comparators[0], ast.Name)
+        and node.comparators[0].id == 'entities'
+    )
+
+
+def _reads_name_only(node: ast.AST) -> bool:
+    if _is_entity_test(node):
+        return True
+    if isinstance(node, ast.Name):
+        return node.id in NAME_FIELDS or node.id in _LITERALS
+    if isinstance(node, ast.Attribute):
+        return False
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id in _CONTEXT_FUNCTIONS:
+            return False
+        return all(map(_reads_name_only, [*node.args, *node.keywords]))
+    return all(map(_reads_name_only, ast.iter_child_nodes(node)))
+
+
+def is_name_selector(expression: str) -> bool:
+    """Check whether an expression only depends on the name of a file.
+
+    Such expressions read the fields of :data:`NAME_FIELDS`, and may test
+    whether entities are present, but not their values.
+
+    >>> is_name_selector('intersects([suffix], ["bold", "sbref"])')
+    True
+    >>> is_name_selector('"run" in entities && !match(extension, "json$")')
+    True
+    >>> is_name_selector('entities.run == "01"')
+    False
+    >>> is_name_selector('exists(suffix, "file")')
+    False
+
+    """
+    return _reads_name_only(parse_expression(expression))
+
+
+def _path_constant(expression: str) -> str | None:
+    """Find the path that an expression compares the path of a file to, if any."""
+    node = parse_expression(expression)
+    if not (
+        isinstance(node, ast.Compare) and len(node.ops) == 1 and isinstance(node.ops[0], ast.Eq)
+    ):
+        return None
+    for left, right in ((node.left, node.comparators[0]), (node.comparators[0], node.left)):
+        if (
+            isinstance(left, ast.Name)
+            and left.id == 'path'
+            and isinstance(right, ast.Constant)
+            and isinstance(right.value, str)
+        ):
+            return right.value
+    return None
+
+
+def referenced_fields(expression: str) -> frozenset[str]:
+    """Find the fields of a context that an expression can read.
+
+    >>> sorted(referenced_fields('sidecar.RepetitionTime == nifti_header.pixdim[4]'))
+    ['nifti_header', 'sidecar']
+    >>> sorted(referenced_fields('length(columns.onset) > 0 && suffix == "events"'))
+    ['columns', 'suffix']
+
+    """
+    tree = parse_expression(expression)
+    functions = {id(node.func) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    return frozenset(
+        node.id
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and node.id not in _LITERALS and id(node) not in functions
+    )
+
+
+def rule_fields(rule: Rule) -> frozenset[str]:
+    """Find the fields of a context that a rule can read when it is applied.
+
+    Fields are those read by the selectors and checks of the rule, and the
+    sidecar, JSON contents or columns that sidecar, JSON and tabular data
+    rules validate.
+    """
+    expressions = [*rule.selectors, *rule.definition.get('checks', ())]
+    return frozenset().union(
+        _GROUP_FIELDS.get(rule.name.partition('.')[0], ()),
+        *map(referenced_fields, expressions),
+    )
+
+
+@attrs.frozen
+class _Candidates:
+    """Rules whose name selectors are true, with the tests of their other selectors."""
+
+    rules: tuple[tuple[Rule, Callable[[t.Any], bool]], ...]
+    #: Content fields that the rules can read
+    fields: frozenset[str]
+
+
+class RuleIndex:
+    """Index of schema rules by the name parts of the files they apply to.
+
+    Selectors are split into those that only depend on the name of a file,
+    as found by :func:`is_name_selector`, and the others. The first are
+    evaluated once for each combination of datatype, suffix, extension and
+    entities, and the others only for the rules that the first select.
+    Selectors that compare the path of a file to a constant, such as
+    ``path == "/participants.tsv"``, are likewise evaluated once for the files
+    with those paths, and once for all others.
+    Selection is equivalent to evaluating all selectors of all rules, except
+    that a selector that fails to evaluate is not reached if a name selector
+    of the same rule is false.
+
+    Parameters
+    ----------
+    schema : Namespace
+        BIDS schema, as loaded by :func:`bidsschematools.schema.load_schema`.
+
+    Raises
+    ------
+    ExpressionError
+        If a selector cannot be compiled.
+
+    """
+
+    def __init__(self, schema: Namespace) -> None:
+        version = schema.schema_version
+
+        #: All rules with selectors, in schema order
+        self.rules: tuple[Rule, ...] = tuple(find_rules(schema))
+
+        name_tests = []
+        content_tests = []
+        paths = set()
+        for rule in self.rules:
+            name_selectors: list[str] = []
+            content_selectors: list[str] = []
+            for selector in rule.selectors:
+                if (path := _path_constant(selector)) is not None:
+                    paths.add(path)
+                    name_selectors.append(selector)
+                elif is_name_selector(selector):
+                    name_selectors.append(selector)
+                else:
+                    content_selectors.append(selector)
+            name_tests.append(compile_conjunction(name_selectors, version))
+            content_tests.append(compile_conjunction(content_selectors, version))
+        self._name_tests: tuple[Callable[[t.Any], bool], ...] = tuple(name_tests)
+        self._content_tests: tuple[Callable[[t.Any], bool], ...] = tuple(content_tests)
+        self._fields = tuple(rule_fields(rule) & CONTENT_FIELDS for rule in self.rules)
+        #: Paths that selectors compare to
+        self._paths = frozenset(paths)
+
+        #: Candidate rules by name parts, and path if selectors compare to it
+        self._candidates: dict[
+            tuple[str | None, str | None, str | None, tuple[str, ...], str | None], _Candidates
+        ] = {}
+
+    def _lookup(self, context: t.Any) -> _Candidates:
+        # The modality is a function of the datatype
+        path = context.path
+        key = (
+            context.datatype,
+            context.suffix,
+            context.extension,
+            tuple(context.entities),
+            path if path in self._paths else None,
+        )
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            selected = [
+                index for index, name_test in enumerate(self._name_tests) if name_test(context)
+            ]
+            candidates = self._candidates[key] = _Candidates(
+                tuple((self.rules[index], self._content_tests[index]) for index in selected),
+                frozenset(
+                    field
+                    for field in frozenset().union(*(self._fields[index] for index in selected))
+                    if context.extension in FIELD_EXTENSIONS.get(field, (context.extension,))
+                ),
+            )
+        return candidates
+
+    def candidates(self, context: t.Any) -> list[Rule]:
+        """List the rules whose name selectors are true for the file of a context."""
+        return [rule for rule, _ in self._lookup(context).rules]
+
+    def fields(self, context: t.Any) -> frozenset[str]:
+        """Find the fields of :data:`CONTENT_FIELDS` that rules can read in a context.
+
+        Fields are those read by the candidate rules of the file, as found by
+        :func:`rule_fields`, whether or not their other selectors are true,
+        except fields that are ``None`` for files with the extension of the
+        context, as listed in :data:`~bids_validator.context.FIELD_EXTENSIONS`.
+        Other content fields do not need to be loaded to select and apply
+        rules, so contexts can be loaded ahead of rule evaluation with
+        :func:`~bids_validator.context.preload`. Fields are found once for
+        each combination of name parts.
+        """
+        return self._lookup(context).fields
+
+    def select(self, context: t.Any) -> list[Rule]:
+        """List the rules whose selectors are all true in a context, in schema order.
+
+        Parameters
+        ----------
+        context : Context
+            Context of a file, such as a :class:`~bids_validator.context.Context`.
+            Only the path, datatype, suffix, extension, modality and entities
+            are read to find candidate rules.
+
+        """
+        return [
+            rule for rule, content_test in self._lookup(context).rules if content_test(context)
+        ]
@@ -528,3 +528,57 @@ def test_is_cont_false(validator: BIDSValidator, fname: str) -> None:
 def test_is_field_map_false(validator: BIDSValidator, fname: str) -> None:
     """Test that is_bids returns False for invalid dwi files."""
     assert not validator.is_bids(fname)
+
+
+BATCH_FILES = [
+    '/README',
+    '/participants.tsv',
+    '/phenotype/measurements.tsv',
+    '/code/my_analysis/analysis.py',
+    '/sub-01/anat/sub-01_T1w.nii.gz',
+    '/sub-01/anat/sub-01_T1w.nii.gz',  # duplicate
+    '/sub-01/ses-test/func/sub-01_ses-test_task-task_run-01_bold.nii.gz',
+    '/sub-01/ses-test/func/sub-01_task-task_run-01_bold.nii.gz',  # missing session
+    '/sub-01/anat/sub-01_acq-23_rec-CSD_T1w.exe',  # wrong extension
+    '/phenotype/multi\nline.tsv',  # newline in path
+]
+
+
+def test_parse_many(validator: BIDSValidator) -> None:
+    """Test that parse_many returns the results of parse in input order."""
+    assert validator.parse_many(BATCH_FILES) == [validator.parse(fname) for fname in BATCH_FILES]
+    assert validator.parse_many([]) == []
+
+    with pytest.raises(ValueError, match='relative to root'):
+        validator.parse_many(['/README', 'README'])
+
+
+def test_parse_many_pool(validator: BIDSValidator, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that sharding across processes preserves input order."""
+    monkeypatch.setattr('bids_validator.bids_validator.POOL_THRESHOLD', 1)
+    assert validator.parse_many(BATCH_FILES, jobs=2) == [
+        validator.parse(fname) for fname in BATCH_FILES
+    ]
+
+
+def test_is_bids_many(validator: BIDSValidator) -> None:
+    """Test that is_bids_many returns the results of is_bids in input order."""
+    fnames = [*BATCH_FILES, 'home/username/my_dataset/participants.tsv']
+    assert validator.is_bids_many(fnames) == [validator.is_bids(fname) for fname in fnames]
+
+
+def test_adaptive_ordering(validator: BIDSValidator) -> None:
+    """Test that adaptive rule ordering does not change parse results."""
+    fnames = [*BATCH_FILES, *files] * 3
+    expected = [validator.parse(fname) for fname in fnames]
+
+    validator.enable_adaptive_ordering(interval=5)
+    try:
+        assert [validator.parse(fname) for fname in fnames] == expected
+        hits = validator.rule_hits()
+        assert sum(hits.values()) == sum(map(bool, expected))
+        assert list(hits.values()) == sorted(hits.values(), reverse=True)
+    finally:
+        validator.disable_adaptive_ordering()
+
+    assert validator.rule_hits() == {}
@@ -0,0 +1,383 @@
+r"""Columnar parsing of TSV files into NumPy arrays.
+
+:func:`~bids_validator.context.load_tsv` creates one Python string per cell,
+which for large participants or phenotype files amounts to millions of small
+objects when most checks need one or two columns. :func:`read_columns` locates
+field boundaries in the raw bytes with vectorized operations and only decodes
+the requested columns, each into a single array.
+
+>>> columns = read_columns(b'participant_id\tage\nsub-01\t34\nsub-02\t38\n')
+>>> columns['participant_id']
+array(['sub-01', 'sub-02'], dtype='<U6')
+>>> read_columns(b'participant_id\tage\nsub-01\t34\n', ['age'])
+{'age': array(['34'], dtype='<U2')}
+"""
+
+from __future__ import annotations
+
+from contextlib import suppress
+
+import attrs
+import numpy as np
+
+from .types import _typings as t
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from _typeshed import SupportsRead
+
+__all__ = (
+    'ColumnSummary',
+    'TableSummary',
+    'parse_numbers',
+    'read_columns',
+    'summarize_columns',
+    'summarize_values',
+)
+
+TAB = ord('\t')
+NEWLINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+
+#: Fixed-width string arrays are used unless padding would exceed this factor
+#: of the column's total length, or values are longer than MAX_WIDTH, in which
+#: case an object array is created
+MAX_PADDING_FACTOR = 4
+MAX_WIDTH = 256
+
+#: Byte sequences that numpy.fromstring would not split into one value per field:
+#: it skips empty fields and treats any whitespace as a separator
+_UNSPLITTABLE = (b'\t\t', b'\t\n', b'\n\t', b'\n\n', b' ', b'\r', b'\v', b'\f')
+
+
+def read_columns(
+    data: bytes, columns: t.Iterable[str] | None = None, *, max_rows: int = 0
+) -> dict[str, np.ndarray]:
+    """Parse the contents of a TSV file into one array per column.
+
+    Parameters
+    ----------
+    data : bytes
+        UTF-8 encoded file contents. The first line contains column headers.
+    columns : iterable of str, optional
+        Names of columns to load. Requested columns that are absent from the
+        header are omitted from the result. By default, all columns are loaded.
+    max_rows : int, optional
+        If positive, the maximum number of lines to read, including the header.
+
+    Returns
+    -------
+    dict
+        Arrays of strings, indexed by column header, in file order.
+        Rows are truncated to the shortest row, as :func:`zip` would.
+
+    """
+    header_end = data.find(b'\n')
+    if header_end < 0:
+        header_end = len(data)
+    headers = data[:header_end].decode().rstrip('\r').split('\t') if data else []
+    names = None if columns is None else set(columns)
+    wanted = {index: name for index, name in enumerate(headers) if names is None or name in names}
+    if not wanted:
+        return {}
+
+    buf = np.frombuffer(data, dtype=np.uint8)[header_end + 1 :]
+    if buf.size and buf[-1] != NEWLINE:
+        buf = np.append(buf, np.uint8(NEWLINE))
+
+    # Tab and newline are consecutive code points, so one unsigned comparison finds both
+    delimiters = np.flatnonzero(np.subtract(buf, TAB, dtype=np.uint8) <= NEWLINE - TAB)
+    kinds = buf[delimiters]
+    n_rows = int(np.count_nonzero(kinds == NEWLINE))
+    if max_rows > 0:
+        n_rows = min(n_rows, max_rows - 1)
+    n_cols = len(headers)
+
+    if n_cols and delimiters.size >= n_rows * n_cols:
+        # Rows are rectangular if every n_cols-th delimiter is the only newline
+        bounds = delimiters[: n_rows * n_cols].reshape(n_rows, n_cols)
+        kinds = kinds[: n_rows * n_cols].reshape(n_rows, n_cols)
+        rectangular = bool((kinds[:, -1] == NEWLINE).all() and (kinds[:, :-1] == TAB).all())
+    else:
+        rectangular = False
+
+    if not rectangular:
+        return _read_ragged(bytes(buf), headers, wanted, n_rows)
+
+    row_starts = np.empty(n_rows, dtype=np.intp)
+    row_starts[:1] = 0
+    row_starts[1:] = bounds[:-1, -1] + 1
+
+    result = {}
+    for index, name in wanted.items():
+        starts = row_starts if index == 0 else bounds[:, index - 1] + 1
+        ends = bounds[:, index]
+        if index == n_cols - 1 and n_rows:
+            # Strip carriage returns of Windows line endings
+            ends = ends - (buf[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN)
+        result[name] = _gather(buf, starts, ends)
+    return result
+
+
+def _gather(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Collect byte ranges of a buffer into an array of strings."""
+    lengths = ends - starts
+    width = int(lengths.max()) if lengths.size else 0
+    if width > MAX_WIDTH or width * lengths.size > MAX_PADDING_FACTOR * int(lengths.sum()):
+        # Long values would make a fixed-width array mostly padding and slow to fill
+        raw = buf.tobytes()
+        return np.array(
+            [raw[start:end].decode() for start, end in zip(starts, ends, strict=True)],
+            dtype=object,
+        )
+
+    chars = np.zeros((lengths.size, max(width, 1)), dtype=np.uint8)
+    for offset in range(width):
+        rows = np.flatnonzero(lengths > offset)
+        chars[rows, offset] = buf[starts[rows] + offset]
+    values = chars.view(f'S{max(width, 1)}').ravel()
+    try:
+        return values.astype(f'U{max(width, 1)}')
+    except UnicodeDecodeError:
+        return np.array([value.decode() for value in values.tolist()])
+
+
+def _read_ragged(
+    body: bytes, headers: list[str], wanted: dict[int, str], n_rows: int
+) -> dict[str, np.ndarray]:
+    """Parse rows of unequal width line by line."""
+    lines = body.decode().split('\n')[:n_rows]
+    rows = [line.rstrip('\r').split('\t') for line in lines]
+    n_fields = min((len(row) for row in rows), default=len(headers))
+    return {
+        name: np.array([row[index] for row in rows], dtype=str)
+        for index, name in wanted.items()
+        if index < n_fields
+    }
+
+
+@attrs.frozen
+class ColumnSummary:
+    """Summary statistics of a numeric column."""
+
+    #: Number of values that parse as numbers, including NaN
+    n_numeric: int
+    #: Number of NaN and ``n/a`` values
+    n_nan: int
+    #: Number of values that do not parse as numbers
+    n_non_numeric: int
+    #: Smallest and largest non-NaN values, if any
+    minimum: float | None
+    maximum: float | None
+
+
+def parse_numbers(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Convert an array of strings, such as a column of :func:`read_columns`, to numbers.
+
+    Returns
+    -------
+    numbers : ndarray
+        Values as floats, with NaN for ``n/a`` and values that are not numbers.
+    non_numeric : ndarray
+        Mask of the values that are not numbers, excluding ``n/a``.
+
+    """
+    strings = np.asarray(values).tolist()
+    with suppress(ValueError):
+        # Converting Python strings is faster than casting an array of strings
+        numbers = np.fromiter(map(float, strings), dtype=np.float64, count=len(strings))
+        return numbers, np.zeros(len(strings), dtype=bool)
+
+    numbers = np.empty(len(strings))
+    non_numeric = np.zeros(len(strings), dtype=bool)
+    for index, value in enumerate(strings):
+        try:
+            numbers[index] = np.nan if value == 'n/a' else float(value)
+        except ValueError:
+            numbers[index] = np.nan
+            non_numeric[index] = True
+    return numbers, non_numeric
+
+
+def summarize_values(values: np.ndarray) -> ColumnSummary:
+    r"""Summarize a column of strings, such as the onsets of events.
+
+    >>> summarize_values(read_columns(b'onset\n0.5\nn/a\n3\nx\n')['onset'])
+    ColumnSummary(n_numeric=3, n_nan=1, n_non_numeric=1, minimum=0.5, maximum=3.0)
+    """
+    numbers, non_numeric = parse_numbers(values)
+    nan = np.isnan(numbers)
+    valid = numbers[~nan]
+    n_non_numeric = int(non_numeric.sum())
+    return ColumnSummary(
+        n_numeric=numbers.size - n_non_numeric,
+        n_nan=int(nan.sum()) - n_non_numeric,
+        n_non_numeric=n_non_numeric,
+        minimum=float(valid.min()) if valid.size else None,
+        maximum=float(valid.max()) if valid.size else None,
+    )
+
+
+@attrs.frozen
+class TableSummary:
+    """Summary of a headerless TSV file, such as physiological recordings."""
+
+    #: Number of rows
+    n_rows: int
+    #: Expected number of fields per row
+    n_columns: int
+    #: Number of rows that do not have the expected number of fields
+    n_bad_rows: int
+    #: Line numbers (1-based) of the first rows with the wrong number of fields
+    bad_rows: tuple[int, ...]
+    #: Summaries of each column, indexed by column header
+    columns: dict[str, ColumnSummary]
+
+
+class _Accumulator:
+    """Running per-column statistics over chunks of rows."""
+
+    def __init__(self, n_columns: int, max_bad_rows: int) -> None:
+        self.n_columns = n_columns
+        self.max_bad_rows = max_bad_rows
+        self.n_rows = 0
+        self.n_bad_rows = 0
+        self.bad_rows: list[int] = []
+        self.n_numeric = np.zeros(n_columns, dtype=np.int64)
+        self.n_nan = np.zeros(n_columns, dtype=np.int64)
+        self.n_non_numeric = np.zeros(n_columns, dtype=np.int64)
+        # NaN until a column has a number; fmin and fmax keep numbers over NaN
+        self.minimum = np.full(n_columns, np.nan)
+        self.maximum = np.full(n_columns, np.nan)
+
+    def add_lines(self, block: bytes) -> None:
+        """Add complete lines, each terminated by a newline."""
+        if b'\r' in block:
+            block = block.replace(b'\r\n', b'\n')
+        buf = np.frombuffer(block, dtype=np.uint8)
+        delimiters = np.flatnonzero(np.subtract(buf, TAB, dtype=np.uint8) <= NEWLINE - TAB)
+        line_ends = np.flatnonzero(buf[delimiters] == NEWLINE)
+        widths = np.diff(line_ends, prepend=-1)
+        first_line = self.n_rows + 1
+        self.n_rows += line_ends.size
+
+        bad = np.flatnonzero(widths != self.n_columns)
+        if bad.size:
+            self.n_bad_rows += bad.size
+            room = self.max_bad_rows - len(self.bad_rows)
+            self.bad_rows.extend((bad[:room] + first_line).tolist())
+            self._add_rows_slowly(block, set(bad.tolist()))
+            return
+
+        # Every row has n_columns fields; parse them all at once if they are numeric
+        # and no field is empty or contains whitespace
+        values = None
+        if (
+            self.n_columns
+            and not block.startswith((b'\t', b'\n'))
+            and not any(sequence in block for sequence in _UNSPLITTABLE)
+        ):
+            try:
+                values = np.fromstring(block.replace(b'n/a', b'nan'), dtype=np.float64, sep='\t')
+            except ValueError:
+                pass
+        if values is None or values.size != line_ends.size * self.n_columns:
+            self._add_rows_slowly(block, set())
+            return
+        self._add_values(values.reshape(-1, self.n_columns))
+
+    def _add_values(self, values: np.ndarray) -> None:
+        self.n_numeric += values.shape[0]
+        self.n_nan += np.isnan(values).sum(axis=0)
+        if values.size:
+            self.minimum = np.fmin(self.minimum, np.fmin.reduce(values, axis=0))
+            self.maximum = np.fmax(self.maximum, np.fmax.reduce(values, axis=0))
+
+    def _add_rows_slowly(self, block: bytes, skip: set[int]) -> None:
+        """Parse rows one at a time, skipping rows of the wrong width."""
+        lines = [line for i, line in enumerate(block.split(b'\n')[:-1]) if i not in skip]
+        values = np.empty((len(lines), self.n_columns))
+        non_numeric = np.zeros(values.shape, dtype=bool)
+        for row, line in enumerate(lines):
+            for column, field in enumerate(line.split(b'\t')):
+                try:
+                    values[row, column] = np.nan if field == b'n/a' else float(field)
+                except ValueError:
+                    values[row, column] = np.nan
+                    non_numeric[row, column] = True
+        self._add_values(values)
+        # Non-numeric values were counted as NaN
+        counts = non_numeric.sum(axis=0)
+        self.n_numeric -= counts
+        self.n_nan -= counts
+        self.n_non_numeric += counts
+
+    def summary(self, headers: tuple[str, ...]) -> TableSummary:
+        columns = {
+            header: ColumnSummary(
+                n_numeric=int(self.n_numeric[index]),
+                n_nan=int(self.n_nan[index]),
+                n_non_numeric=int(self.n_non_numeric[index]),
+                minimum=None if np.isnan(self.minimum[index]) else float(self.minimum[index]),
+                maximum=None if np.isnan(self.maximum[index]) else float(self.maximum[index]),
+            )
+            for index, header in enumerate(headers)
+        }
+        return TableSummary(
+            n_rows=self.n_rows,
+            n_columns=self.n_columns,
+            n_bad_rows=self.n_bad_rows,
+            bad_rows=tuple(self.bad_rows),
+            columns=columns,
+        )
+
+
+def summarize_columns(
+    fobj: SupportsRead[bytes],
+    headers: tuple[str, ...],
+    *,
+    chunk_size: int = 2**20,
+    max_bad_rows: int = 10,
+) -> TableSummary:
+    r"""Summarize a headerless TSV stream in constant memory.
+
+    Rows are read in chunks of about ``chunk_size`` bytes and never held in
+    memory all at once, so arbitrarily large recordings may be checked.
+
+    Parameters
+    ----------
+    fobj : file object
+        Binary stream of decompressed TSV contents.
+    headers : tuple of str
+        Column names, usually the ``Columns`` field of the sidecar.
+        Each row is expected to have one field per header.
+    chunk_size : int, optional
+        Number of bytes to read at a time.
+    max_bad_rows : int, optional
+        Maximum number of line numbers of malformed rows to record.
+
+    Returns
+    -------
+    TableSummary
+
+    Examples
+    --------
+    >>> import io
+    >>> summary = summarize_columns(io.BytesIO(b'1\t2.5\nn/a\t3\n4\n'), ('a', 'b'))
+    >>> summary.n_rows, summary.bad_rows
+    (3, (3,))
+    >>> summary.columns['a']
+    ColumnSummary(n_numeric=2, n_nan=1, n_non_numeric=0, minimum=1.0, maximum=1.0)
+
+    """
+    accumulator = _Accumulator(len(headers), max_bad_rows)
+    remainder = b''
+    while chunk := fobj.read(chunk_size):
+        block = remainder + chunk
+        end = block.rfind(b'\n') + 1
+        remainder = block[end:]
+        if end:
+            accumulator.add_lines(block[:end])
+    if remainder:
+        accumulator.add_lines(remainder + b'\n')
+    return accumulator.summary(headers)
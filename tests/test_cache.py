@@ -0,0 +1,140 @@
+import gc
+import json
+import tracemalloc
+from pathlib import Path
+
+from bidsschematools.types.context import Subject
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.cache import LoaderCache, cached_loader, prime, sizeof
+from bids_validator.types.files import FileTree
+
+
+def test_lru_eviction() -> None:
+    cache = LoaderCache(max_bytes=100)
+    cache.put('a', 'A', nbytes=40)
+    cache.put('b', 'B', nbytes=40)
+    assert cache.get('a') == 'A'  # 'b' is now least recently used
+    cache.put('c', 'C', nbytes=40)
+
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.nbytes == 80
+
+    # Replacing an entry updates its size
+    cache.put('a', 'AA', nbytes=10)
+    assert cache.nbytes == 50
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+
+
+def test_oversize_entries() -> None:
+    cache = LoaderCache(max_bytes=100)
+    cache.put('a', 'A', nbytes=40)
+    cache.put('big', 'B' * 1000)
+    assert 'big' not in cache
+    assert 'a' in cache
+
+
+def test_sizeof() -> None:
+    shared = 'x' * 1000
+    assert sizeof([shared, shared]) < 2 * sizeof(shared)
+    assert sizeof({'key': [shared]}) > sizeof(shared)
+
+
+def test_cached_loader() -> None:
+    calls = []
+
+    @cached_loader
+    def load(value: int, *, scale: int = 1) -> list[int]:
+        calls.append((value, scale))
+        return [value * scale]
+
+    outer = LoaderCache()
+    inner = LoaderCache()
+    with outer.activate():
+        assert load(2) == [2]
+        assert load(2) == [2]
+        assert load(2, scale=3) == [6]
+        with inner.activate():
+            assert LoaderCache.active() is inner
+            assert load(2) == [2]
+        assert LoaderCache.active() is outer
+        assert load(2) == [2]
+
+    assert LoaderCache.active() is not outer
+    assert calls == [(2, 1), (2, 3), (2, 1)]
+    assert len(outer) == 2
+    assert len(inner) == 1
+
+
+def test_prime() -> None:
+    calls = []
+
+    @cached_loader
+    def load(value: int, *, scale: int = 1) -> list[int]:
+        calls.append(value)
+        return [value * scale]
+
+    with LoaderCache().activate():
+        prime(load, [10], 1)
+        prime(load, [30], 1, scale=3)
+        assert load(1) == [10]
+        assert load(1, scale=3) == [30]
+        assert load(2) == [2]
+    assert calls == [2]
+
+
+def _make_dataset(root: Path, n_rows: int) -> FileTree:
+    root.mkdir()
+    (root / 'dataset_description.json').write_text(
+        json.dumps({'Name': root.name, 'BIDSVersion': '1.10.0'})
+    )
+    rows = ''.join(f'sub-{i:04d}\t{i % 90}\n' for i in range(n_rows))
+    (root / 'participants.tsv').write_text(f'participant_id\tage\n{rows}')
+    (root / 'T1w.json').write_text(json.dumps({'RepetitionTime': 2.0, 'Notes': 'x' * 1000}))
+    anat = root / 'sub-0000' / 'anat'
+    anat.mkdir(parents=True)
+    (anat / 'sub-0000_T1w.json').write_text(json.dumps({'EchoTime': 0.01}))
+    (anat / 'sub-0000_T1w.nii.gz').write_bytes(b'')
+    return FileTree.read_from_filesystem(root)
+
+
+def test_dataset_releases_cache(tmp_path: Path, schema: Namespace) -> None:
+    """Validating many datasets in one process does not accumulate file contents."""
+
+    def validate(tree: FileTree) -> None:
+        with context.Dataset(tree, schema) as dataset:
+            assert len(dataset.subjects.participant_id or ()) == 1000
+            file = tree / 'sub-0000' / 'anat' / 'sub-0000_T1w.nii.gz'
+            subject = Subject(context.Sessions(tree / 'sub-0000', dataset.cache))
+            T1w_context = context.Context(file, dataset, subject)
+            assert T1w_context.sidecar is not None
+            assert T1w_context.sidecar.EchoTime == 0.01
+            assert T1w_context.sidecar.RepetitionTime == 2.0
+            participants = context.Context(tree / 'participants.tsv', dataset, None)
+            assert participants.columns is not None
+            assert len(dataset.cache) > 0
+        assert len(dataset.cache) == 0
+
+    trees = [_make_dataset(tmp_path / f'ds{i:03d}', 1000) for i in range(100)]
+
+    tracemalloc.start()
+    try:
+        for i, tree in enumerate(trees):
+            validate(tree)
+            if i == 9:
+                gc.collect()
+                baseline, _ = tracemalloc.get_traced_memory()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # Each dataset holds well over 100 kB of parsed contents while open
+    assert current - baseline < 200_000
@@ -0,0 +1,140 @@
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+import pytest
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.columns import ColumnErrors, ColumnValidator, ColumnValidators, check_columns
+from bids_validator.rules import RuleIndex
+from bids_validator.types import _typings as t
+from bids_validator.types.files import FileTree
+
+VALUES = [
+    'n/a', '', '0', '12', '-3', '+4', ' 5 ', '1.5', '.5', '5.', '1e3', '1E-3', '1_000', 'nan',
+    'inf', '0x10', '١', 'true', 'false', 'True', 'M', 'female', 'x', 'sub-01', 'sub-01_x',
+    'RRID:SCR_002823', 'RRID:x', '2020-01-01', '2020-01-01T12:00:00', '12:00:00', 'mm', 'µV',
+    'https://example.com/a', 'bids::sub-01/anat', 'sub-01/anat/x.nii', 'stim.png', '89', '90',
+    '-0.5', 'right', 'R', '2', '+', '-', '.', '1.2.3', '--1', '1-', '+.5', '0001', '1 2',
+]  # fmt: skip
+
+
+def reference(definition: Namespace, formats: Namespace, value: str) -> bool:
+    """Check one value the way the JavaScript validator does."""
+    if value == 'n/a':
+        return True
+    if 'anyOf' in definition:
+        return any(reference(alt, formats, value) for alt in definition['anyOf'])
+    definition = definition.get('definition', definition)
+    pattern = definition.get('pattern')
+    fmt = definition.get('format') or definition.get('Format')
+    if fmt is None:
+        fmt = {'number': 'number', 'integer': 'integer', 'boolean': 'boolean'}.get(
+            definition.get('type', '')
+        )
+    if pattern is None and fmt is not None:
+        pattern = formats[fmt].pattern
+    if pattern is not None and not re.fullmatch(pattern, value, re.ASCII):
+        return False
+    levels = definition.get('enum', definition.get('Levels'))
+    if levels is not None and value not in list(levels):
+        return False
+    minimum = definition.get('minimum', definition.get('Minimum'))
+    maximum = definition.get('maximum', definition.get('Maximum'))
+    if fmt in ('number', 'integer', 'index'):
+        if minimum is not None and float(value) < minimum:
+            return False
+        if maximum is not None and float(value) > maximum:
+            return False
+    return True
+
+
+def test_validators_match_reference(schema: Namespace) -> None:
+    """Whole-column checks agree with checking each value of every schema column."""
+    validators = ColumnValidators(schema)
+    formats = schema.objects.formats
+    values = np.array(VALUES * 3)
+    for key, definition in schema.objects.columns.items():
+        expected = [not reference(definition, formats, value) for value in values.tolist()]
+        assert validators[key].invalid(values).tolist() == expected, key
+    assert validators['age'] is validators['age']
+
+
+def test_check() -> None:
+    formats = Namespace({'number': {'pattern': '[0-9]+'}})
+    validator = ColumnValidator.from_definition({'Format': 'number', 'Minimum': 2}, formats)
+    column = np.array(['1', '2', 'n/a', 'a', '3', '1'] * 1000)
+    errors = validator.check(column, max_rows=4)
+    assert errors == ColumnErrors(3000, (0, 3, 5, 6), ('1', 'a', '1', '1'))
+    assert validator.check(column[1:3]) is None
+    assert validator.check(()) is None
+    # Tuples, as loaded from compressed tables
+    assert validator.check(('3', '1')) == ColumnErrors(1, (1,), ('1',))
+
+
+def test_match_across_lines() -> None:
+    """Patterns that could match across values are checked one value at a time."""
+    validator = ColumnValidator.from_definition({'pattern': 'a[^b]*c'}, Namespace({}))
+    assert validator.invalid(['a', 'c', 'ac', 'abc']).tolist() == [True, True, False, True]
+
+
+@pytest.mark.parametrize(
+    'definition',
+    [
+        {'Format': 'bogus'},
+        {'format': 'number.pattern'},
+        {'Format': ['number']},
+        {'Minimum': 'abc'},
+        {'Format': 'number', 'Maximum': [1]},
+        {'Levels': 5},
+        {'pattern': '('},
+    ],
+)
+def test_invalid_definition(definition: dict[str, t.Any], schema: Namespace) -> None:
+    with pytest.raises(ValueError, match='Unknown format|Invalid'):
+        ColumnValidator.from_definition(definition, schema.objects.formats)
+
+
+def test_check_columns(tmp_path: Path, schema: Namespace) -> None:
+    (tmp_path / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Columns', 'BIDSVersion': '1.10.1'})
+    )
+    (tmp_path / 'participants.tsv').write_text(
+        'participant_id\tage\tsex\tgroup\tnotes\tscore\n'
+        'sub-01\t30\tM\tcontrol\tfine\t1\n'
+        'sub_02\t95\tmale\tpatient\tn/a\tx\n'
+        'sub-03\tn/a\tX\tnone\t\t2\n'
+    )
+    (tmp_path / 'participants.json').write_text(
+        json.dumps(
+            {
+                'group': {'Levels': {'control': 'Control', 'patient': 'Patient'}},
+                # Invalid definitions are not used
+                'notes': {'Format': 'bogus'},
+                'score': {'Format': 'number', 'Minimum': 'abc'},
+            }
+        )
+    )
+    tree = FileTree.read_from_filesystem(tmp_path)
+    index = RuleIndex(schema)
+    with context.Dataset(tree, schema) as ds:
+        ctx = context.Context(tree / 'participants.tsv', ds, None)
+        errors = check_columns(ctx, index.select(ctx))
+    assert errors == {
+        'participant_id': ColumnErrors(1, (1,), ('sub_02',)),
+        'age': ColumnErrors(1, (1,), ('95',)),
+        'sex': ColumnErrors(1, (2,), ('X',)),
+        'group': ColumnErrors(1, (2,), ('none',)),
+    }
+
+
+@pytest.mark.parametrize('n_rows', [1, 100_000])
+def test_check_large(n_rows: int) -> None:
+    formats = Namespace({'integer': {'pattern': ' *[+-]?\\d+ *'}})
+    validator = ColumnValidator.from_definition({'type': 'integer'}, formats)
+    column = np.arange(n_rows).astype(str)
+    column[-1] = '1.5'
+    errors = validator.check(column)
+    assert errors == ColumnErrors(1, (n_rows - 1,), ('1.5',))
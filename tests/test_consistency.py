@@ -0,0 +1,106 @@
+import json
+from pathlib import Path
+
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.cache import LoaderCache
+from bids_validator.consistency import check_participants, check_phenotype, check_sessions
+from bids_validator.expressions import compile_expression
+from bids_validator.types.files import FileTree
+
+
+def make_dataset(root: Path) -> FileTree:
+    files = {
+        'dataset_description.json': json.dumps({'Name': 'Sets', 'BIDSVersion': '1.10.1'}),
+        'participants.tsv': 'participant_id\tage\nsub-01\t30\nsub-02\t40\nsub-04\t50\n',
+        'phenotype/survey.tsv': 'participant_id\tscore\nsub-01\t1\nsub-05\t2\nsub-03\t3\n',
+        'phenotype/survey.json': '{}',
+        'phenotype/other.tsv': 'participant_id\tscore\nsub-02\t1\n',
+        'sub-01/ses-01/anat/sub-01_ses-01_T1w.nii.gz': '',
+        'sub-01/ses-02/anat/sub-01_ses-02_T1w.nii.gz': '',
+        'sub-01/ses-03/anat/sub-01_ses-03_T1w.nii.gz': '',
+        'sub-01/sub-01_sessions.tsv': 'session_id\nses-01\nses-02\n',
+        'sub-02/anat/sub-02_T1w.nii.gz': '',
+        'sub-03/anat/sub-03_T1w.nii.gz': '',
+    }
+    for name, contents in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(contents)
+    return FileTree.read_from_filesystem(root)
+
+
+def test_sets(tmp_path: Path, schema: Namespace) -> None:
+    tree = make_dataset(tmp_path)
+    with context.Dataset(tree, schema) as ds:
+        subjects = ds.subjects
+        assert subjects.sub_dirs_set == frozenset(subjects.sub_dirs)
+        assert subjects.participant_id_set == frozenset(['sub-01', 'sub-02', 'sub-04'])
+        assert subjects.phenotype_set == frozenset(['sub-01', 'sub-02', 'sub-03', 'sub-05'])
+        assert subjects.phenotype == sorted(subjects.phenotype_set)
+        assert subjects.sub_dirs_set is subjects.sub_dirs_set
+        assert sorted(file.name for file in subjects.phenotype_files) == [
+            'other.tsv',
+            'survey.tsv',
+        ]
+
+    sessions = context.Sessions(tree / 'sub-01')
+    assert sessions.ses_dirs_set == frozenset(['ses-01', 'ses-02', 'ses-03'])
+    assert sessions.session_id_set == frozenset(['ses-01', 'ses-02'])
+    assert sorted(sessions.session_id or ()) == sorted(sessions.session_id_set)
+    assert context.Sessions(tree / 'sub-02').session_id_set is None
+    assert context.Subjects(tree / 'sub-02').participant_id_set is None
+
+    # Sessions files are loaded into the cache of the dataset, not the active cache
+    cache = LoaderCache()
+    sessions = context.Sessions(tree / 'sub-01', cache)
+    with LoaderCache().activate() as active:
+        assert sessions.session_id_set == frozenset(['ses-01', 'ses-02'])
+        assert sessions.session_id == ['ses-01', 'ses-02']
+    assert len(cache) == 2
+    assert len(active) == 0
+
+
+def test_checks(tmp_path: Path, schema: Namespace) -> None:
+    """Checks find the values that make the equivalent rules fail."""
+    tree = make_dataset(tmp_path)
+    version = schema.schema_version
+    with context.Dataset(tree, schema) as ds:
+        assert check_participants(ds) == ['sub-03']
+        assert check_phenotype(ds) == {'phenotype/survey.tsv': ['sub-03', 'sub-05']}
+
+        [mismatch] = schema.rules.checks.dataset.ParticipantIDMismatch.checks
+        assert compile_expression(mismatch, version)(Namespace({'dataset': ds})) is False
+        [missing] = schema.rules.checks.phenotype.PhenotypeSubjectsMissing.checks
+        for phenotype_file in ds.subjects.phenotype_files:
+            ctx = context.Context(phenotype_file, ds, None)
+            passed = compile_expression(missing, version)(ctx)
+            assert passed is (phenotype_file.relative_path not in check_phenotype(ds))
+
+    assert check_sessions(context.Sessions(tree / 'sub-01')) == ['ses-03']
+    assert check_sessions(context.Sessions(tree / 'sub-02')) == []
+
+
+def test_checks_without_tables(tmp_path: Path, schema: Namespace) -> None:
+    (tmp_path / 'sub-01').mkdir()
+    (tmp_path / 'phenotype').mkdir()
+    (tmp_path / 'phenotype' / 'survey.tsv').write_text('participant_id\nsub-01\n')
+    tree = FileTree.read_from_filesystem(tmp_path)
+    with context.Dataset(tree, schema) as ds:
+        assert check_participants(ds) == []
+        assert check_phenotype(ds) == {}
+
+
+def test_checks_many(tmp_path: Path, schema: Namespace) -> None:
+    n_subjects = 5000
+    ids = [f'sub-{i:04d}' for i in range(n_subjects)]
+    for sub in ids:
+        (tmp_path / sub).mkdir()
+    listed = '\n'.join(['participant_id', *ids[1:]]) + '\n'
+    (tmp_path / 'participants.tsv').write_text(listed)
+    (tmp_path / 'phenotype').mkdir()
+    (tmp_path / 'phenotype' / 'survey.tsv').write_text(listed + 'sub-x\n')
+    tree = FileTree.read_from_filesystem(tmp_path)
+    with context.Dataset(tree, schema) as ds:
+        assert check_participants(ds) == ['sub-0000']
+        assert check_phenotype(ds) == {'phenotype/survey.tsv': ['sub-x']}
@@ -1,3 +1,4 @@
+import gzip
 import json
 from collections.abc import Generator
 from pathlib import Path
@@ -6,8 +7,12 @@ import fsspec
 import pytest
 from bidsschematools.types.context import Subject
 from bidsschematools.types.namespace import Namespace
+from upath import UPath
 
 from bids_validator import context
+from bids_validator.cache import LoaderCache, sizeof
+from bids_validator.nifti import read_nifti_header
+from bids_validator.types import _typings as t
 from bids_validator.types.files import FileTree
 
 
@@ -61,6 +66,41 @@ def test_fileparts(synthetic_dataset: FileTree, schema: Namespace) -> None:
     )
 
 
+def test_fileparts_shared(synthetic_dataset: FileTree, schema: Namespace) -> None:
+    """Parts are memoized per node and share interned strings across files."""
+    anat = synthetic_dataset / 'sub-01' / 'ses-01' / 'anat'
+    T1w = anat / 'sub-01_ses-01_T1w.nii'
+    other = synthetic_dataset / 'sub-02' / 'ses-01' / 'anat' / 'sub-02_ses-01_T1w.nii'
+
+    with LoaderCache().activate():
+        parts = context.FileParts.from_file(T1w, schema)
+        assert context.FileParts.from_file(T1w, schema) is parts
+        # Parts without a schema have no datatype, so are not shared
+        assert context.FileParts.from_file(T1w).datatype is None
+        assert context.FileParts.from_file(T1w, schema).datatype == 'anat'
+
+        other_parts = context.FileParts.from_file(other, schema)
+        assert other_parts.suffix is parts.suffix
+        assert other_parts.extension is parts.extension
+        assert other_parts.datatype is parts.datatype
+        assert list(other_parts.entities) == list(parts.entities)
+        assert all(a is b for a, b in zip(other_parts.entities, parts.entities, strict=True))
+        assert other_parts.entities['ses'] is parts.entities['ses']
+        # Parts are shared, so their entities cannot be modified
+        with pytest.raises(TypeError):
+            parts.entities['run'] = '1'  # type: ignore[index]
+        assert context.FileParts.from_file(T1w, schema).entities == {'sub': '01', 'ses': '01'}
+
+        # Nodes with the same path in a new tree are parsed again
+        tree = FileTree.read_from_filesystem(synthetic_dataset.path_obj)
+        copy = context.FileParts.from_file(tree / T1w.relative_path, schema)
+        assert copy == parts
+        assert copy is not parts
+
+    assert context.datatype_names(schema) is context.datatype_names(schema)
+    assert {'anat', 'func', 'beh'} <= context.datatype_names(schema)
+
+
 def test_walkback(synthetic_dataset: FileTree) -> None:
     bold = (
         synthetic_dataset
@@ -132,6 +172,12 @@ def test_context(synthetic_dataset: FileTree, schema: Namespace) -> None:
     assert stim_context.gzip.comment == ''
     assert isinstance(stim_context.columns, Namespace)
     assert list(stim_context.columns.keys()) == stim_context.sidecar.Columns
+    summary = stim_context.column_summary
+    assert summary is not None
+    assert list(summary.columns) == stim_context.sidecar.Columns
+    assert summary.n_rows == len(stim_context.columns[stim_context.sidecar.Columns[0]])
+    assert summary.n_bad_rows == 0
+    assert events_context.column_summary is None
 
     ## Tests for:
     #  associations
@@ -189,6 +235,142 @@ def test_sidecar_order(memfs: fsspec.AbstractFileSystem) -> None:
     }
 
 
+def test_shared_sidecars(memfs: fsspec.AbstractFileSystem, schema: Namespace) -> None:
+    """Files with the same chain of sidecars share one read-only mapping."""
+    memfs.pipe(
+        {
+            '/dataset_description.json': b'{"Name": "Shared", "BIDSVersion": "1.10.1"}',
+            '/task-rest_bold.json': b'{"TaskName": "rest", "RepetitionTime": 2}',
+            '/sub-01/func/sub-01_task-rest_run-1_bold.nii.gz': b'',
+            '/sub-01/func/sub-01_task-rest_run-2_bold.nii.gz': b'',
+            '/sub-02/func/sub-02_task-rest_bold.nii.gz': b'',
+            '/sub-02/func/sub-02_task-rest_bold.json': b'{"RepetitionTime": 3}',
+        }
+    )
+    tree = FileTree.read_from_filesystem('memory://')
+    run1 = tree / 'sub-01' / 'func' / 'sub-01_task-rest_run-1_bold.nii.gz'
+    run2 = tree / 'sub-01' / 'func' / 'sub-01_task-rest_run-2_bold.nii.gz'
+    sub02 = tree / 'sub-02' / 'func' / 'sub-02_task-rest_bold.nii.gz'
+
+    with LoaderCache().activate():
+        sidecar = context.load_sidecar(run1)
+        assert context.load_sidecar(run2) is sidecar
+        assert sidecar == {'TaskName': 'rest', 'RepetitionTime': 2}
+        with pytest.raises(TypeError):
+            sidecar['TaskName'] = 'changed'  # type: ignore[index]
+
+        other = context.load_sidecar(sub02)
+        assert other == {'TaskName': 'rest', 'RepetitionTime': 3}
+        # Merging does not modify the shared contents of sidecars
+        assert context.load_json(tree / 'task-rest_bold.json')['RepetitionTime'] == 2
+
+    with context.Dataset(tree, schema) as ds:
+        ctx = context.Context(run1, ds, None)
+        assert ctx.sidecar is ctx.sidecar
+        assert ctx.sidecar is not None
+        ctx.sidecar['TaskName'] = 'changed'
+        shared = context.Context(run2, ds, None).sidecar
+        assert shared is not None
+        assert shared.to_dict() == {'TaskName': 'rest', 'RepetitionTime': 2}
+
+
+def test_merged_sidecar_size(memfs: fsspec.AbstractFileSystem) -> None:
+    """Merged sidecars count only their own mapping against the cache budget."""
+    metadata = {f'Key{i}': list(range(100)) for i in range(100)}
+    memfs.pipe(
+        {
+            '/task-rest_bold.json': json.dumps(metadata).encode(),
+            '/sub-01/func/sub-01_task-rest_bold.nii.gz': b'',
+        }
+    )
+    tree = FileTree.read_from_filesystem('memory://')
+    bold = tree / 'sub-01' / 'func' / 'sub-01_task-rest_bold.nii.gz'
+
+    cache = LoaderCache()
+    with cache.activate():
+        sidecar = context.load_json(tree / 'task-rest_bold.json')
+        loaded = cache.nbytes
+        assert context.load_sidecar(bold) == sidecar
+    assert loaded >= sizeof(sidecar)
+    assert cache.nbytes - loaded < sizeof(sidecar) / 10
+
+
+def test_walk_back_index(memfs: fsspec.AbstractFileSystem) -> None:
+    """Indexed lookups match a scan of every file in each directory."""
+    names = [
+        'task-rest_bold.json',
+        'task-rest_events.tsv',
+        'task-rest_events.json',
+        'sub-01/sub-01_task-rest_bold.json',
+        'sub-01/sub-01_task-rest_acq-a_bold.json',
+        'sub-01/func/sub-01_task-rest_events.tsv',
+        'sub-01/func/sub-01_task-rest_events.json',
+        'sub-01/func/sub-01_task-rest_run-1_events.tsv',
+        'sub-01/func/sub-01_task-rest_run-2_events.tsv',
+        'sub-01/func/sub-01_task-rest_run-1_bold.json',
+        'sub-01/func/sub-01_task-rest_run-2_bold.nii.gz',
+        'sub-01/func/sub-01_task-rest_run-1_bold.nii.gz',
+        'sub-01/func/sub-01_task-rest_acq-a_run-1_bold.nii.gz',
+    ]
+    memfs.pipe({f'/{name}': b'' for name in names})
+    dataset = FileTree.read_from_filesystem('memory://')
+
+    def scan(
+        source: FileTree,
+        extensions: tuple[str, ...],
+        suffix: str | None,
+        entities: tuple[str, ...],
+    ) -> list[list[FileTree]]:
+        source_parts = context.FileParts.from_file(source)
+        groups = []
+        tree = source.parent
+        while tree:
+            matches = []
+            for child in tree.children.values():
+                parts = context.FileParts.from_file(child)
+                if (
+                    not child.is_dir
+                    and parts.extension in extensions
+                    and parts.suffix == (suffix or source_parts.suffix)
+                    and all(
+                        key in entities or source_parts.entities.get(key) == value
+                        for key, value in parts.entities.items()
+                    )
+                ):
+                    matches.append(child)
+            groups.append(matches)
+            tree = tree.parent
+        return groups
+
+    func = dataset / 'sub-01' / 'func'
+    for bold in (child for child in func.children.values() if child.name.endswith('.nii.gz')):
+        for extensions, suffix, entities in [
+            (('.json',), None, ()),
+            (('.tsv', '.json'), 'events', ()),
+            (('.json', '.tsv'), 'events', ('run',)),
+        ]:
+            expected = scan(bold, extensions, suffix, entities)
+            assert (
+                list(
+                    context.walk_back(
+                        bold,
+                        inherit=True,
+                        target_extensions=extensions,
+                        target_suffix=suffix,
+                        target_entities=entities or ('',),
+                    )
+                )
+                == expected
+            )
+
+    run1 = func / 'sub-01_task-rest_run-1_bold.nii.gz'
+    assert list(context.walk_back(run1, inherit=True)) == [
+        func / 'sub-01_task-rest_run-1_bold.json',
+        dataset / 'sub-01' / 'sub-01_task-rest_bold.json',
+        dataset / 'task-rest_bold.json',
+    ]
+
+
 def test_sessions(synthetic_dataset: FileTree) -> None:
     sub01 = synthetic_dataset / 'sub-01'
 
@@ -213,6 +395,19 @@ def test_load_tsv(synthetic_dataset: FileTree) -> None:
     assert [tsv_file[key] == data_set[key] for key in tsv_file.keys()]
 
 
+def test_load_tsv_columns(synthetic_dataset: FileTree) -> None:
+    tsv_file_tree = synthetic_dataset / 'participants.tsv'
+
+    columns = context.load_tsv_columns(tsv_file_tree)
+    assert list(columns.keys()) == ['participant_id', 'age', 'sex']
+    assert columns['participant_id'].tolist() == [f'sub-{i:02d}' for i in range(1, 6)]
+    assert columns['age'].astype(int).tolist() == [34, 38, 22, 21, 42]
+
+    projected = context.load_tsv_columns(tsv_file_tree, ('sex', 'missing'))
+    assert list(projected.keys()) == ['sex']
+    assert projected['sex'].tolist() == ['F', 'M', 'M', 'F', 'M']
+
+
 def test_load_tsv_gz(synthetic_dataset: FileTree) -> None:
     headers = ('respiratory', 'cardiac')
     tsvgz_file_tree = (
@@ -272,3 +467,312 @@ def test_nifti_mrs_header(
     assert mrs_context.nifti_header is not None
     assert isinstance(mrs_context.nifti_header.mrs, Namespace)
     assert mrs_context.nifti_header.mrs.ResonantNucleus == ['1H']
+
+
+def test_load_nifti_headers(synthetic_dataset: FileTree, tmp_path: Path) -> None:
+    niftis = [
+        node
+        for sub in ('sub-01', 'sub-02')
+        for node in (synthetic_dataset / sub / 'ses-01' / 'anat').children.values()
+        if node.name.endswith('.nii')
+    ]
+    bad = tmp_path / 'bad.nii.gz'
+    bad.write_bytes(gzip.compress(bytes(400)))
+    bad_tree = FileTree.read_from_filesystem(bad)
+    missing = FileTree(tmp_path / 'missing.nii', is_dir=False)
+
+    with LoaderCache().activate():
+        headers = context.load_nifti_headers([*niftis, bad_tree, missing], max_workers=2)
+        assert list(headers) == niftis
+        for file, header in headers.items():
+            # Batched headers are found by the per-file loader
+            assert context.load_nifti_header(file) is header
+            with file.path_obj.open('rb') as fobj:
+                assert header.shape == read_nifti_header(fobj).shape
+        with pytest.raises(ValueError, match='Not a NIfTI'):
+            context.load_nifti_header(bad_tree)
+
+
+def test_prefetch(tmp_path: Path, schema: Namespace, monkeypatch: pytest.MonkeyPatch) -> None:
+    files = {
+        'dataset_description.json': '{"Name": "Prefetch", "BIDSVersion": "1.10.1"}',
+        'participants.tsv': 'participant_id\tage\nsub-01\t30\n',
+        'task-rest_bold.json': '{"TaskName": "rest"}',
+        'sub-01/dwi/sub-01_dwi.bval': '0 1000 1000\n',
+        'sub-01/dwi/sub-01_dwi.bvec': '1 0 0\n0 1 0\n0 0 1\n',
+        'sub-01/dwi/sub-01_dwi.json': '{invalid',
+        'sub-01/dwi/sub-01_dwi.nii.gz': '',
+        'sub-01/func/sub-01_task-rest_events.tsv': 'onset\tduration\n0\t1\n',
+        'sub-01/sub-01_scans.tsv': 'filename\ndwi/sub-01_dwi.nii.gz\n',
+        'phenotype/survey.tsv': 'participant_id\tscore\nsub-01\t1\n',
+        '.git/config.json': '{}',
+    }
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(content)
+    tree = FileTree.read_from_filesystem(tmp_path)
+    dwi = tree / 'sub-01' / 'dwi'
+
+    read: list[str] = []
+    path_type = type(tree.path_obj)
+    original_read_bytes = path_type.read_bytes
+
+    def read_bytes(self: UPath) -> bytes:
+        read.append(self.name)
+        return original_read_bytes(self)
+
+    original_read_text = path_type.read_text
+
+    def read_text(self: UPath, *args: t.Any, **kwargs: t.Any) -> str:
+        read.append(self.name)
+        return original_read_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(path_type, 'read_bytes', read_bytes)
+    monkeypatch.setattr(path_type, 'read_text', read_text)
+
+    with context.Dataset(tree, schema) as ds:
+        with pytest.raises(ValueError, match=r"\['\.nii\.gz'\]"):
+            ds.prefetch(['.json', '.nii.gz'])
+        assert ds.prefetch(max_workers=2) == 9
+        # Hidden directories are skipped, as are TSV files without columns loaded by name
+        assert sorted(read) == sorted(
+            name.rpartition('/')[2]
+            for name in files
+            if '.git' not in name and not name.endswith(('.nii.gz', '_scans.tsv'))
+        )
+        read.clear()
+
+        assert ds.subjects.participant_id_set == frozenset(['sub-01'])
+        assert ds.subjects.phenotype_set == frozenset(['sub-01'])
+        events = tree / 'sub-01' / 'func' / 'sub-01_task-rest_events.tsv'
+        assert context.load_tsv_column(events, 'onset') == ('0',)
+        sidecar = context.Context(tree / 'task-rest_bold.json', ds, None)
+        assert sidecar.json is not None
+        assert sidecar.json.to_dict() == {'TaskName': 'rest'}
+        assert context.load_gradient_table(dwi / 'sub-01_dwi.bval').shape == (1, 3)
+        assert context.load_gradient_table(dwi / 'sub-01_dwi.bvec').shape == (3, 3)
+        assert read == []
+
+        # Invalid files raise on access
+        with pytest.raises(ValueError, match='unexpected character'):
+            context.load_json(dwi / 'sub-01_dwi.json')
+        assert read == ['sub-01_dwi.json']
+
+    # Background prefetches are cancelled or finished when the dataset is closed
+    with context.Dataset(tree, schema) as ds:
+        assert ds.prefetch(wait=False) == 9
+    assert len(ds.cache) == 0
+
+
+def test_preload(
+    synthetic_dataset: FileTree, schema: Namespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    func = synthetic_dataset / 'sub-01' / 'ses-01' / 'func'
+    beh = synthetic_dataset / 'sub-01' / 'ses-01' / 'beh'
+
+    with context.Dataset(synthetic_dataset, schema) as ds:
+        bold = [
+            context.Context(func / f'sub-01_ses-01_task-nback_run-0{run}_bold.nii', ds, None)
+            for run in (1, 2)
+        ]
+        stim = context.Context(func / 'sub-01_ses-01_task-nback_run-01_stim.tsv.gz', ds, None)
+        events = context.Context(beh / 'sub-01_ses-01_task-nback_beh.tsv', ds, None)
+        requests = [
+            *((ctx, ['nifti_header', 'sidecar']) for ctx in bold),
+            (stim, ['gzip', 'sidecar', 'nifti_header']),
+            (events, ['columns']),
+        ]
+        assert context.preload(requests, max_workers=2) == 8
+
+        def fail(self: UPath, *args: t.Any, **kwargs: t.Any) -> t.Any:
+            raise AssertionError(f'{self.name} was read after preloading')
+
+        path_type = type(synthetic_dataset.path_obj)
+        for method in ('open', 'read_bytes', 'read_text'):
+            monkeypatch.setattr(path_type, method, fail)
+
+        for ctx in bold:
+            assert ctx.nifti_header is not None
+            assert ctx.sidecar is not None
+            assert ctx.sidecar.RepetitionTime == 2.5
+        assert stim.gzip is not None
+        assert stim.nifti_header is None
+        assert events.columns is not None
+
+        # Fields that fail to load are skipped, and raise on access
+        fresh = context.Context(func / 'sub-01_ses-01_task-nback_run-02_stim.tsv.gz', ds, None)
+        assert context.preload([(fresh, ['gzip'])]) == 0
+        with pytest.raises(AssertionError, match='was read after preloading'):
+            fresh.gzip  # noqa: B018
+
+
+def test_load_tsv_column(tmp_path: Path, schema: Namespace) -> None:
+    """Participant IDs are loaded from one column of wide tables."""
+    n_cols = 2000
+    header = '\t'.join([f'q{i}' for i in range(n_cols // 2)] + ['participant_id'])
+    header += '\t' + '\t'.join(f'r{i}' for i in range(n_cols // 2))
+    phenotype = tmp_path / 'phenotype'
+    phenotype.mkdir()
+    with (phenotype / 'survey.tsv').open('wb') as fobj:
+        fobj.write(f'{header}\n'.encode())
+        for sub in ('03', '01', '03'):
+            # Other columns are never decoded
+            fobj.write(b'\t'.join([b'\xff'] * (n_cols // 2) + [f'sub-{sub}'.encode()]) + b'\t')
+            fobj.write(b'\t'.join([b'1'] * (n_cols // 2)) + b'\n')
+    (phenotype / 'other.tsv').write_text('participant_id\tscore\nsub-02\t1\n')
+    (phenotype / 'no_ids.tsv').write_bytes(b'score\n\xff\n')
+    (tmp_path / 'participants.tsv').write_text('participant_id\nsub-02\nsub-01\n')
+    (tmp_path / 'ragged.tsv').write_text('age\tparticipant_id\n10\tsub-01\n11\n')
+
+    tree = FileTree.read_from_filesystem(tmp_path)
+    survey = tree / 'phenotype' / 'survey.tsv'
+    with LoaderCache().activate():
+        values = context.load_tsv_column(survey, 'participant_id')
+        assert values == ('sub-03', 'sub-01', 'sub-03')
+        assert context.load_tsv_column(survey, 'participant_id') is values
+        ids = context.load_tsv_column_set(survey, 'participant_id')
+        assert ids == frozenset({'sub-01', 'sub-03'})
+        assert context.load_tsv_column_set(survey, 'participant_id') is ids
+        # Only the header is read when the column is absent
+        assert context.load_tsv_column(tree / 'phenotype' / 'no_ids.tsv', 'participant_id') is None
+        # Columns that a short row does not reach are treated as absent
+        ragged = tree / 'ragged.tsv'
+        assert context.load_tsv_column(ragged, 'participant_id') is None
+        assert context.load_tsv_column_set(ragged, 'participant_id') is None
+        assert context.load_tsv_numbers(ragged, 'participant_id') is None
+        assert context.load_tsv_column_summary(ragged, 'participant_id') is None
+
+    with context.Dataset(tree, schema) as ds:
+        assert ds.subjects.participant_id == ['sub-02', 'sub-01']
+        assert ds.subjects.participant_id is ds.subjects.participant_id
+        assert ds.subjects.phenotype == ['sub-01', 'sub-02', 'sub-03']
+
+
+def test_associations(tmp_path: Path, schema: Namespace) -> None:
+    """Associations are resolved per directory, identically to walking back from each file."""
+    files = {
+        'dataset_description.json': json.dumps({'Name': 'Assoc', 'BIDSVersion': '1.10.1'}),
+        'task-rest_events.tsv': 'onset\tduration\n0\t1\n5\t1\n',
+        'task-rest_events.json': json.dumps({'StimulusPresentation': {'ScreenDistance': 0.6}}),
+        'dwi.bval': '0 1000 1000\n',
+        'sub-01/dwi/sub-01_dwi.nii.gz': '',
+        'sub-01/dwi/sub-01_dwi.bvec': '1 0 0\n0 1 0\n0 0 1\n',
+        'sub-01/func/sub-01_task-rest_run-1_bold.nii.gz': '',
+        'sub-01/func/sub-01_task-rest_run-1_bold.json': '{}',
+        'sub-01/func/sub-01_task-rest_run-1_physio.tsv.gz': '',
+        'sub-01/func/sub-01_task-rest_run-1_physio.json': json.dumps({'Columns': ['pulse']}),
+        'sub-01/func/sub-01_task-rest_run-2_bold.nii.gz': '',
+        'sub-01/perf/sub-01_asl.nii.gz': '',
+        'sub-01/perf/sub-01_aslcontext.tsv': 'volume_type\ncontrol\nlabel\n',
+        'sub-01/perf/sub-01_m0scan.nii.gz': '',
+        'sub-01/eeg/sub-01_task-rest_eeg.edf': '',
+        'sub-01/eeg/sub-01_task-rest_channels.tsv': 'name\ttype\nFz\tEEG\n',
+        'sub-01/eeg/sub-01_coordsystem.json': '{}',
+        'sub-01/eeg/sub-01_space-CapTrak_electrodes.tsv': 'name\tx\nFz\t0\n',
+        'sub-01/emg/sub-01_task-rest_emg.edf': '',
+        'sub-01/emg/sub-01_space-hand_coordsystem.json': json.dumps(
+            {'ParentCoordinateSystem': 'arm'}
+        ),
+        'sub-01/emg/sub-01_space-arm_coordsystem.json': '{}',
+    }
+    for name, contents in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(contents)
+    tree = FileTree.read_from_filesystem(tmp_path)
+    sub = tree / 'sub-01'
+
+    with context.Dataset(tree, schema) as ds:
+        bold = context.Context(sub / 'func' / 'sub-01_task-rest_run-1_bold.nii.gz', ds, None)
+        events = bold.associations.events
+        assert isinstance(events, context.Events)
+        assert events.path == 'task-rest_events.tsv'
+        assert events.onset == ('0', '5')
+        assert events.onset_values is not None
+        assert events.onset_values.tolist() == [0.0, 5.0]
+        assert events.onset_summary is not None
+        assert (events.onset_summary.minimum, events.onset_summary.maximum) == (0.0, 5.0)
+        assert events.sidecar is not None
+        assert events.sidecar['StimulusPresentation']['ScreenDistance'] == 0.6
+        physio = bold.associations.physio
+        assert physio is not None
+        assert physio.sidecar is not None
+        assert physio.sidecar['Columns'] == ['pulse']
+        assert bold.associations.bval is None
+
+        dwi = context.Context(sub / 'dwi' / 'sub-01_dwi.nii.gz', ds, None).associations
+        bval, bvec = dwi.bval, dwi.bvec
+        assert isinstance(bval, context.GradientTable)
+        assert bvec is not None
+        assert (bval.path, bval.n_rows, bval.n_cols) == ('dwi.bval', 1, 3)
+        assert bval.values == [0, 1000, 1000]
+        assert bval.array.shape == (1, 3)
+        assert (bval.summary.minimum, bval.summary.maximum) == (0.0, 1000.0)
+        assert bval.summary.n_zero_cols == 1
+        assert (bvec.n_rows, bvec.n_cols) == (3, 3)
+
+        asl = context.Context(sub / 'perf' / 'sub-01_asl.nii.gz', ds, None).associations
+        aslcontext, m0scan = asl.aslcontext, asl.m0scan
+        assert aslcontext is not None
+        assert m0scan is not None
+        assert aslcontext.volume_type == ('control', 'label')
+        assert aslcontext.n_rows == 2
+        assert m0scan.path == 'sub-01/perf/sub-01_m0scan.nii.gz'
+
+        eeg = context.Context(sub / 'eeg' / 'sub-01_task-rest_eeg.edf', ds, None).associations
+        channels, coordsystem, electrodes = eeg.channels, eeg.coordsystem, eeg.electrodes
+        assert channels is not None
+        assert coordsystem is not None
+        assert electrodes is not None
+        assert channels.type == ('EEG',)
+        assert channels.short_channel is None
+        assert coordsystem.path == 'sub-01/eeg/sub-01_coordsystem.json'
+        assert electrodes.path == 'sub-01/eeg/sub-01_space-CapTrak_electrodes.tsv'
+
+        emg = context.Context(sub / 'emg' / 'sub-01_task-rest_emg.edf', ds, None).associations
+        coordsystems = emg.coordsystems
+        assert coordsystems is not None
+        assert sorted(coordsystems.spaces) == ['arm', 'hand']
+        assert coordsystems.ParentCoordinateSystems == ['arm']
+
+        # Batched resolution matches walking back from every file
+        for directory in [tree, *(child for child in sub.children.values() if child.is_dir)]:
+            found = context.load_directory_associations(directory, schema)
+            assert context.load_directory_associations(directory, schema) is found
+            for child in directory.children.values():
+                if child.is_dir:
+                    continue
+                parts = context.FileParts.from_file(child, schema)
+                for target in context._association_targets(schema)[0]:
+                    if not target.applies(parts):
+                        continue
+                    walked = next(
+                        (
+                            tuple(group)
+                            for group in context._walk_back(
+                                child,
+                                target.inherit,
+                                target.extensions,
+                                target.suffix,
+                                target.entities,
+                            )
+                            if group
+                        ),
+                        (),
+                    )
+                    assert found[child.name].get(target.name, ()) == walked
+
+
+def test_associations_ambiguous(memfs: fsspec.AbstractFileSystem, schema: Namespace) -> None:
+    memfs.pipe(
+        {
+            '/dataset_description.json': b'{}',
+            '/sub-01/func/sub-01_task-rest_bold.nii.gz': b'',
+            '/sub-01/func/sub-01_task-rest_events.tsv': b'',
+            '/sub-01/func/sub-01_events.tsv': b'',
+        }
+    )
+    tree = FileTree.read_from_filesystem('memory://')
+    with context.Dataset(tree, schema) as ds:
+        bold = context.Context(tree / 'sub-01' / 'func' / 'sub-01_task-rest_bold.nii.gz', ds, None)
+        with pytest.raises(context.ValidationError, match='Multiple matching files'):
+            bold.associations  # noqa: B018
@@ -0,0 +1,148 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from bidsschematools.types import context as ctx
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.expressions import ExpressionError, compile_conjunction, compile_expression
+from bids_validator.types import _typings as t
+from bids_validator.types.files import FileTree
+
+
+def schema_expressions(node: t.Any) -> Iterator[str]:
+    """Find the selectors and checks of every rule in the schema."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ('selectors', 'checks') and isinstance(value, list):
+                yield from value
+            else:
+                yield from schema_expressions(value)
+    elif isinstance(node, list):
+        for value in node:
+            yield from schema_expressions(value)
+
+
+def test_expression_tests(schema: Namespace) -> None:
+    """Expressions evaluate as specified by the tests in the schema."""
+    empty = Namespace({'sidecar': Namespace()})
+    for test in schema.meta.expression_tests:
+        result = compile_expression(test['expression'], schema.schema_version)(empty)
+        assert (result, type(result)) == (test['result'], type(test['result'])), test
+
+
+def test_compile_schema(schema: Namespace) -> None:
+    expressions = set(schema_expressions(schema.rules.to_dict()))
+    assert len(expressions) > 100
+    for expression in expressions:
+        function = compile_expression(expression, schema.schema_version)
+        assert compile_expression(expression, schema.schema_version) is function
+
+
+def test_compile_cache() -> None:
+    function = compile_expression('suffix == "bold"', '1.0.0')
+    assert compile_expression('suffix == "bold"', '1.0.0') is function
+    assert compile_expression('suffix == "bold"', '2.0.0') is not function
+
+
+@pytest.mark.parametrize(
+    'expression',
+    [
+        'length(',
+        'unknown(suffix)',
+        'suffix[1:2]',
+        'suffix = "bold"',
+        'suffix if true else null',
+        'f"{suffix}"',
+        '{"a": 1}',
+        'sorted(values, method="numeric")',
+    ],
+)
+def test_invalid_expressions(expression: str) -> None:
+    with pytest.raises(ExpressionError):
+        compile_expression(expression)
+
+
+@pytest.mark.parametrize(
+    ('expression', 'result'),
+    [
+        ('!sidecar.Missing', True),
+        ('[] && 1', 1),
+        ('0 || "x"', 'x'),
+        ('sidecar.from', 'keyword'),
+        ('"Missing" in sidecar', False),
+        ('"bval" in associations', True),
+        ('"events" in associations', False),
+        ('columns.onset[1] - columns.onset[0]', 1.5),
+        ('columns.onset == [0.0, 1.5]', True),
+        ('type(columns.onset)', 'array'),
+        ('max(columns.onset) > -1', True),
+        ('associations.bval.n_rows * 2 ** 2', 4),
+        ('-associations.bval.n_rows', -1),
+        ('intersects(["a", "b", "c"], ["c", "a", "d"])', ['a', 'c']),
+        ('intersects([[1], 2], [[1]])', [[1]]),
+        ('intersects([1, 2], [2.0])', [2]),
+        ('intersects([[1], 2], [2])', [2]),
+        ('intersects(x, ["a"])', ['a']),
+        ('!columns.onset[0]', True),
+        ('zero || "x"', 'x'),
+        ('!no', True),
+        ('!nan', True),
+        ('columns.onset[1] && "x"', 'x'),
+    ],
+)
+def test_evaluate(expression: str, result: t.Any) -> None:
+    import numpy as np
+
+    values = Namespace(
+        {
+            'sidecar': {'from': 'keyword'},
+            'x': [{'a': 1}, 'a'],
+            # NumPy scalars
+            'zero': np.int64(0),
+            'no': np.bool_(False),
+            'nan': np.float64('nan'),
+            'columns': {'onset': np.array([0.0, 1.5])},
+            'associations': ctx.Associations(bval=ctx.Bval('', n_cols=1, n_rows=1, values=[0])),
+        }
+    )
+    assert compile_expression(expression)(values) == result
+
+
+def test_evaluate_context(examples: Path, schema: Namespace) -> None:
+    tree = FileTree.read_from_filesystem(examples / 'synthetic')
+    bold = tree / 'sub-01' / 'ses-01' / 'func' / 'sub-01_ses-01_task-nback_run-01_bold.nii'
+    with context.Dataset(tree, schema) as ds:
+        bold_context = context.Context(bold, ds, None)
+
+        def evaluate(expression: str) -> t.Any:
+            return compile_expression(expression, schema.schema_version)(bold_context)
+
+        assert evaluate('datatype == "func" && suffix == "bold"') is True
+        assert evaluate('sidecar.RepetitionTime') == 2.5
+        assert evaluate('"task" in entities && entities.run == "01"') is True
+        assert evaluate('exists("dataset_description.json", "dataset")') == 1
+        assert evaluate('exists(["missing.json", "bids::participants.tsv"], "bids-uri")') == 1
+        assert evaluate('exists("sub-01_ses-01_task-nback_run-01_bold.nii", "file")') == 1
+        assert evaluate('exists("ses-01", "subject")') == 1
+        assert evaluate('dataset.dataset_description.Name') == ds.dataset_description.Name
+        assert evaluate('length(dataset.subjects.participant_id)') == 5
+        assert evaluate('intersects(dataset.modalities, ["mri"])') == ['mri']
+
+
+def test_compile_conjunction() -> None:
+    applies = compile_conjunction(['datatype == "anat"', 'sidecar.EchoTime > 0'])
+    assert compile_conjunction(('datatype == "anat"', 'sidecar.EchoTime > 0')) is applies
+    assert applies({'datatype': 'anat', 'sidecar': {'EchoTime': 0.01}}) is True
+    assert applies({'datatype': 'anat', 'sidecar': {}}) is False
+    assert compile_conjunction([])({}) is True
+
+    class Context:
+        datatype = 'func'
+
+        @property
+        def sidecar(self) -> None:
+            raise AssertionError('Evaluation stops at the first false expression')
+
+    assert applies(Context()) is False
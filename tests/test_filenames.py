@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+
+from bids_validator import BIDSValidator
+from bids_validator.filenames import FilenameParser
+
+
+@pytest.fixture(scope='module')
+def parser() -> FilenameParser:
+    return FilenameParser()
+
+
+@pytest.mark.parametrize(
+    'path',
+    [
+        # Path, stem and top-level rules
+        '/dataset_description.json',
+        '/README',
+        '/README.md',
+        '/CHANGES',
+        '/participants.tsv',
+        '/code/analysis/run.py',
+        '/codex',
+        '/phenotype/measurements.tsv',
+        '/task-rest_bold.json',
+        '/T1w.json',
+        '/scans.json',
+        # Subject and session levels
+        '/sub-01/sub-01_sessions.tsv',
+        '/sub-01/ses-1/sub-01_ses-1_scans.tsv',
+        '/sub-01/sub-01_scans.tsv',
+        # Data files
+        '/sub-01/anat/sub-01_rec-CSD_T1w.nii.gz',
+        '/sub-01/anat/sub-01_acq-23_rec-CSD_T1w.exe',
+        '/sub-01/ses-1/func/sub-01_ses-1_task-rest_run-1_bold.nii.gz',
+        '/sub-01/ses-1/func/sub-01_ses-1_task-rest_run-1_physio.tsv.gz',
+        '/sub-01/dwi/sub-01_dwi.bval',
+        '/sub-01/fmap/sub-01_dir-AP_epi.json',
+        '/sub-01/anat/sub-01_part-mag_T1w.nii',
+        '/sub-01/meg/sub-01_task-rest_meg.ds/',
+        '/sub-01/micr/sub-01_sample-A_photo.jpg',
+        # Invalid names
+        '/sub-01/anat/sub-02_T1w.nii.gz',
+        '/sub-01/anat/sub-01_ses-1_T1w.nii.gz',
+        '/sub-01/ses-1/anat/sub-01_T1w.nii.gz',
+        '/sub-01/anat/sub-01_rec-CSD_acq-23_T1w.nii.gz',
+        '/sub-01/anat/sub-01_part-foo_T1w.nii',
+        '/sub-01/anat/sub-01_acq_T1w.nii',
+        '/sub-01/anat/sub-01_acq-a-b_T1w.nii',
+        '/sub-01/func/sub-01_bold.nii.gz',
+        '/sub-01/func/sub-01_task-rest_bold',
+        '/sub-01/xyz/sub-01_T1w.nii.gz',
+        '/anat/sub-01_T1w.nii.gz',
+        '/sub-01/sub-01_T1w.nii.gz',
+        '/sub-01//anat/sub-01_T1w.nii.gz',
+        '/',
+    ],
+)
+def test_parse_matches_regex(parser: FilenameParser, path: str) -> None:
+    expected = BIDSValidator.parse(path)
+    result = parser.parse(path)
+    assert result == expected
+    assert list(result) == list(expected)
+
+
+def test_parse_relative_path(parser: FilenameParser) -> None:
+    with pytest.raises(ValueError, match='relative to root'):
+        parser.parse('home/username/my_dataset/participants.tsv')
+
+
+def test_examples_equivalence(parser: FilenameParser, examples: Path) -> None:
+    mismatches = {}
+    for path in examples.rglob('*'):
+        dataset, *parts = path.relative_to(examples).parts
+        if path.is_dir() or any(part.startswith('.') for part in (dataset, *parts)):
+            continue
+        relpath = '/' + '/'.join(parts)
+        expected = BIDSValidator.parse(relpath)
+        if parser.parse(relpath) != expected:
+            mismatches[relpath] = expected
+
+    assert mismatches == {}
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from bids_validator.gradients import GradientSummary, read_gradient_table, summarize_gradient_table
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        b'0 1000 1000\n',
+        b'0 1000 1000',
+        b'0\t1000\t1000\r\n',
+        b'  0  1000 1000  \n\n',
+        b'1 0 0\n0 1 0\n0 0 1\n',
+        b'1.5e-1 -0.5 nan\n0 0 0\n',
+        b'5\n',
+    ],
+)
+def test_read_gradient_table(data: bytes) -> None:
+    """Tables are parsed as splitting lines would."""
+    rows = [line.split() for line in data.decode().splitlines() if line.strip()]
+    expected = np.array(rows, dtype=np.float64)
+    table = read_gradient_table(data)
+    np.testing.assert_array_equal(table, expected)
+    assert table.flags.owndata
+
+
+@pytest.mark.parametrize('data', [b'', b'\n \n'])
+def test_read_gradient_table_empty(data: bytes) -> None:
+    assert read_gradient_table(data).shape == (0, 0)
+    assert summarize_gradient_table(read_gradient_table(data)) == GradientSummary(
+        0, 0, None, None, 0
+    )
+
+
+@pytest.mark.parametrize(
+    ('data', 'message'),
+    [
+        (b'0 1000\n0\n', 'number of columns changed'),
+        (b'0 1000 x\n', 'could not convert'),
+        (b'0,1000\n', 'could not convert'),
+        (b'# 0\n', 'could not convert'),
+    ],
+)
+def test_read_gradient_table_invalid(data: bytes, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        read_gradient_table(data)
+
+
+def test_summarize_gradient_table() -> None:
+    table = read_gradient_table(b'1 0 0 -1\n0 0 1 0\n0 0 0 nan\n')
+    assert summarize_gradient_table(table) == GradientSummary(3, 4, -1.0, 1.0, 1)
+
+
+def test_read_gradient_table_large() -> None:
+    rng = np.random.default_rng(0)
+    expected = rng.normal(size=(3, 10_000)).round(6)
+    data = '\n'.join(' '.join(map(str, row)) for row in expected.tolist()).encode()
+    np.testing.assert_array_equal(read_gradient_table(data), expected)
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+# Modules that are slow to import and must only be loaded on use
+DEFERRED = (
+    'bids_validator._version',
+    'bids_validator.context',
+    'bidsschematools.schema',
+    'bidsschematools.rules',
+    'concurrent.futures.process',
+    'nibabel',
+    'numpy',
+)
+
+
+def loaded_modules(statement: str) -> set[str]:
+    """Run an import statement in a fresh interpreter and list deferred modules it loads."""
+    code = f'import sys; {statement}; print(*(m for m in {DEFERRED!r} if m in sys.modules))'
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', code], capture_output=True, text=True, check=True
+    )
+    return set(proc.stdout.split())
+
+
+def test_package_import() -> None:
+    assert loaded_modules('import bids_validator') == set()
+
+
+def test_cli_import() -> None:
+    pytest.importorskip('typer')
+    assert loaded_modules('import bids_validator.__main__') == set()
+
+
+def test_context_import() -> None:
+    assert loaded_modules('import bids_validator.context').isdisjoint({'nibabel', 'numpy'})
+
+
+def test_version() -> None:
+    import bids_validator
+
+    assert isinstance(bids_validator.__version__, str)
+    with pytest.raises(AttributeError):
+        bids_validator.nonexistent  # noqa: B018
@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+import pytest
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator.types.files import FileTree
+
+pytest.importorskip('typer')
+
+from bids_validator.__main__ import app, validate
+
+
+@pytest.fixture
+def dataset(tmp_path: Path) -> Path:
+    files = [
+        'README',
+        'participants.tsv',
+        'task-rest_bold.json',
+        'not_bids.txt',
+        'code/script.py',
+        'phenotype/survey.tsv',
+        'phenotype/survey.txt',
+    ]
+    for sub in range(1, 7):
+        prefix = f'sub-{sub:02d}/anat/sub-{sub:02d}'
+        files += [f'{prefix}_T1w.nii.gz', f'{prefix}_T1w.json', f'{prefix}_T1w.exe']
+        if sub % 2:
+            files += [f'sub-{sub:02d}/func/sub-{sub:02d}_task-rest_blod.nii.gz']
+    for name in files:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text('')
+    (tmp_path / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Jobs', 'BIDSVersion': '1.10.1'})
+    )
+    return tmp_path
+
+
+def test_validate_jobs(
+    dataset: Path, schema: Namespace, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Output of parallel validation is identical to that of a serial run."""
+    tree = FileTree.read_from_filesystem(dataset)
+    validate(tree, schema)
+    serial = capsys.readouterr().out
+    assert serial.count('sub-03_T1w.exe is not a valid bids filename') == 1
+    assert '/not_bids.txt is not a valid bids filename' in serial
+
+    for jobs in (2, 4):
+        validate(tree, schema, jobs=jobs)
+        assert capsys.readouterr().out == serial
+
+
+def test_cli_jobs(dataset: Path) -> None:
+    from typer.testing import CliRunner
+
+    runner = CliRunner()
+    serial = runner.invoke(app, [str(dataset)])
+    parallel = runner.invoke(app, [str(dataset), '--jobs', '3'])
+    assert serial.exit_code == parallel.exit_code == 0
+    assert parallel.output == serial.output
+    assert runner.invoke(app, [str(dataset), '--jobs', '0']).exit_code != 0
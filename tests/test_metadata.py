@@ -0,0 +1,126 @@
+import gzip
+import json
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+import pytest
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.metadata import MetadataValidators, check_sidecar, compile_definition
+from bids_validator.rules import RuleIndex
+from bids_validator.types import _typings as t
+from bids_validator.types.files import FileTree
+
+FORMATS = Namespace({'unit': {'pattern': '[a-zA-Z]+'}})
+
+
+@pytest.mark.parametrize(
+    ('definition', 'value', 'problem'),
+    [
+        ({'type': 'number'}, 1, None),
+        ({'type': 'number'}, 1.5, None),
+        ({'type': 'number'}, True, 'True is not of type number'),
+        ({'type': 'integer'}, 2.0, None),
+        ({'type': 'integer'}, 2.5, '2.5 is not of type integer'),
+        ({'type': 'string'}, None, 'None is not of type string'),
+        ({'type': ['string', 'null']}, None, None),
+        ({'type': 'number', 'exclusiveMinimum': 0}, 0, '0 is not greater than 0'),
+        ({'type': 'number', 'minimum': 0, 'maximum': 1}, 1, None),
+        ({'type': 'number', 'maximum': 1}, 1.5, '1.5 is greater than 1'),
+        ({'type': 'number', 'exclusiveMaximum': 1}, 1, '1 is not less than 1'),
+        # Bounds only apply to numbers
+        ({'minimum': 0}, 'a', None),
+        ({'enum': ['i', 'j']}, 'j', None),
+        ({'enum': [0, 1]}, False, 'False is not one of [0, 1]'),
+        ({'enum': ['i']}, ['i'], "['i'] is not one of ['i']"),
+        ({'type': 'string', 'format': 'unit'}, 'mm', None),
+        ({'type': 'string', 'format': 'unit'}, 'm m', "'m m' is not a valid unit"),
+        ({'type': 'array', 'items': {'type': 'number'}}, [1, 2], None),
+        (
+            {'type': 'array', 'items': {'type': 'number'}},
+            [1, 'a'],
+            "item 1: 'a' is not of type number",
+        ),
+        ({'type': 'array', 'minItems': 3}, [1, 2], 'expected at least 3 items, found 2'),
+        ({'type': 'array', 'maxItems': 1}, [1, 2], 'expected at most 1 items, found 2'),
+        ({'anyOf': [{'type': 'number'}, {'type': 'array'}]}, [], None),
+        (
+            {'anyOf': [{'type': 'number'}, {'type': 'array'}]},
+            'a',
+            "'a' does not match any allowed definition",
+        ),
+        ({'type': 'object', 'properties': {'a': {'type': 'string'}}}, {'a': 'x', 'b': 1}, None),
+        (
+            {'type': 'object', 'properties': {'a': {'type': 'string'}}},
+            {'a': 1},
+            "property 'a': 1 is not of type string",
+        ),
+        ({'type': 'object', 'additionalProperties': False}, {'a': 1}, "unexpected property 'a'"),
+        (
+            {'type': 'object', 'additionalProperties': {'type': 'string'}},
+            Namespace({'a': 'x'}),
+            None,
+        ),
+        ({'type': 'object', 'required': ['a']}, {}, "missing required property 'a'"),
+        ({}, object(), None),
+    ],
+)
+def test_compile_definition(
+    definition: dict[str, t.Any], value: t.Any, problem: str | None
+) -> None:
+    assert compile_definition(definition, FORMATS)(value) == problem
+
+
+def test_validators(schema: Namespace) -> None:
+    validators = MetadataValidators(schema)
+    for key in schema.objects.metadata:
+        validators[key]
+    assert validators['EchoTime'] is validators['EchoTime']
+    assert validators.name('EchoTime__fmap') == 'EchoTime'
+    assert validators['EchoTime']([0.01, 0.02]) is None
+    assert validators['EchoTime__fmap']([0.01, 0.02]) is not None
+    assert validators['IntendedFor'](['bids::sub-01/anat/sub-01_T1w.nii.gz']) is None
+
+
+def test_check_sidecar(tmp_path: Path, schema: Namespace) -> None:
+    (tmp_path / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Metadata', 'BIDSVersion': '1.10.1'})
+    )
+    (tmp_path / 'task-rest_bold.json').write_text(
+        json.dumps(
+            {
+                'TaskName': 'rest',
+                'RepetitionTime': 2,
+                'MRAcquisitionType': '2D',
+                'SliceTiming': [0, 0.5, 1, 1.5],
+            }
+        )
+    )
+    func = tmp_path / 'sub-01' / 'func'
+    func.mkdir(parents=True)
+    image = nb.Nifti1Image(np.zeros((2, 2, 2, 2), dtype=np.uint8), np.eye(4)).to_bytes()  # type: ignore[no-untyped-call]
+    for echo, sidecar in {
+        1: {'EchoTime': 0.012},
+        2: {'EchoTime': -0.03, 'SliceEncodingDirection': 'x'},
+    }.items():
+        prefix = func / f'sub-01_task-rest_echo-{echo}_bold'
+        (func / f'{prefix.name}.nii.gz').write_bytes(gzip.compress(image))
+        prefix.with_suffix('.json').write_text(json.dumps(sidecar))
+
+    tree = FileTree.read_from_filesystem(tmp_path)
+    index = RuleIndex(schema)
+    errors = {}
+    with context.Dataset(tree, schema) as ds:
+        for echo in (1, 2):
+            file = tree / 'sub-01' / 'func' / f'sub-01_task-rest_echo-{echo}_bold.nii.gz'
+            ctx = context.Context(file, ds, None)
+            errors[echo] = check_sidecar(ctx, index.select(ctx))
+    assert errors == {
+        1: {},
+        2: {
+            'EchoTime': '-0.03 does not match any allowed definition',
+            'SliceEncodingDirection': "'x' is not one of ['i', 'i-', 'j', 'j-', 'k', 'k-']",
+        },
+    }
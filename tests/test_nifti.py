@@ -0,0 +1,201 @@
+import gzip
+import io
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+import pytest
+from bidsschematools.types import context as ctx
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator.nifti import decode_header, read_nifti_header, read_nifti_headers
+from bids_validator.types import _typings as t
+
+
+def nibabel_header(path: Path) -> ctx.NiftiHeader:
+    """Derive a NiftiHeader from a full nibabel image."""
+    img: t.Any = nb.load(path)
+    freq, phase, slc = (dim + 1 if dim is not None else 0 for dim in img.header.get_dim_info())
+    xyz, t_units = img.header.get_xyzt_units()
+    if t_units not in ('unknown', 'sec', 'msec', 'usec'):
+        t_units = 'unknown'
+    mrs = next((ext for ext in img.header.extensions if ext.get_code() == 44), None)
+    return ctx.NiftiHeader(
+        dim_info=ctx.DimInfo(freq, phase, slc),
+        dim=img.header['dim'],
+        pixdim=img.header['pixdim'],
+        shape=img.shape,
+        voxel_sizes=img.header.get_zooms(),
+        xyzt_units=ctx.XyztUnits(xyz, t_units),
+        qform_code=int(img.header['qform_code']),
+        sform_code=int(img.header['sform_code']),
+        axis_codes=nb.orientations.aff2axcodes(img.affine),  # type: ignore[no-untyped-call]
+        mrs=Namespace(mrs.json()) if mrs is not None else None,
+    )
+
+
+def assert_headers_equal(actual: ctx.NiftiHeader, expected: ctx.NiftiHeader) -> None:
+    for field in ('dim', 'pixdim'):
+        assert getattr(actual, field).dtype == getattr(expected, field).dtype
+        assert np.array_equal(getattr(actual, field), getattr(expected, field))
+    for field in ('voxel_sizes', 'shape'):
+        assert getattr(actual, field) == getattr(expected, field)
+        assert [type(v) for v in getattr(actual, field)] == [
+            type(v) for v in getattr(expected, field)
+        ]
+    for field in ('dim_info', 'xyzt_units', 'qform_code', 'sform_code', 'axis_codes', 'mrs'):
+        assert getattr(actual, field) == getattr(expected, field)
+
+
+def write_image(path: Path, version: int = 1, endianness: str = '<', **fields: t.Any) -> Path:
+    """Write a small image, then overwrite raw header fields."""
+    img_class: t.Any = nb.Nifti1Image if version == 1 else nb.Nifti2Image
+    affine = np.array([[0, 0, -2, 10], [2.5, 0, 0, -5], [0, 3, 0, 1], [0, 0, 0, 1]])
+    img: t.Any = img_class(
+        np.zeros((2, 3, 4), dtype=np.int16),
+        affine,
+        img_class.header_class(endianness=endianness),
+    )
+    img.header.set_dim_info(2, 0, 1)
+    img.header.set_xyzt_units('mm', 'msec')
+    extensions = fields.pop('extensions', ())
+    for code, content in extensions:
+        img.header.extensions.append(nb.nifti1.Nifti1Extension(code, content))
+
+    data = bytearray(img.to_bytes())
+    dtype = img.header.structarr.dtype
+    raw = np.frombuffer(data[: dtype.itemsize], dtype=dtype).copy()
+    for name, value in fields.items():
+        raw[name] = value
+    data[: raw.dtype.itemsize] = raw.tobytes()
+
+    if path.name.endswith('.gz'):
+        data = bytearray(gzip.compress(bytes(data)))
+    path.write_bytes(data)
+    return path
+
+
+CASES: dict[str, dict[str, t.Any]] = {
+    'default': {},
+    'big-endian': {'endianness': '>'},
+    'nifti2': {'version': 2},
+    'nifti2-big-endian': {'version': 2, 'endianness': '>'},
+    '4d': {'dim': [4, 2, 3, 4, 5, 1, 1, 1], 'pixdim': [1, 2, 2, 2, 2.5, 1, 1, 1]},
+    '1d': {'dim': [1, 10, 1, 1, 1, 1, 1, 1]},
+    '0d': {'dim': [0, 1, 1, 1, 1, 1, 1, 1]},
+    'freesurfer': {'dim': [3, -1, 1, 1, 1, 1, 1, 1], 'glmin': 163842},
+    'zero-pixdim': {'pixdim': [1, 0, 2, 0, 1, 1, 1, 1]},
+    'negative-pixdim': {'pixdim': [1, -1, 2, -3, 1, 1, 1, 1]},
+    'bad-qfac': {'pixdim': [0, 1, 2, 3, 1, 1, 1, 1], 'sform_code': 0, 'qform_code': 1},
+    'flipped-qfac': {'pixdim': [-1, 1, 2, 3, 1, 1, 1, 1], 'sform_code': 0, 'qform_code': 1},
+    'qform-only': {'sform_code': 0, 'qform_code': 2},
+    'no-xform': {'sform_code': 0, 'qform_code': 0},
+    'bad-xform-codes': {'sform_code': 9, 'qform_code': 7},
+    'oblique-sform': {'srow_x': [0.7, 0.7, 0, 1], 'srow_y': [-0.7, 0.7, 0, 1]},
+    'degenerate-sform': {'srow_x': [0, 0, 0, 0]},
+    'units': {'xyzt_units': 2 | 40},
+    'no-dim-info': {'dim_info': 0},
+    'pair-magic': {'magic': b'ni1'},
+    'extensions': {
+        'extensions': [(6, b'comment'), (44, b'{"ResonantNucleus": ["1H"], "Nested": {"a": 1}}')]
+    },
+    'other-extension': {'extensions': [(6, b'comment' * 10)]},
+}
+
+
+@pytest.mark.parametrize('suffix', ['.nii', '.nii.gz'])
+@pytest.mark.parametrize('case', CASES)
+def test_read_nifti_header(tmp_path: Path, case: str, suffix: str) -> None:
+    path = write_image(tmp_path / f'img{suffix}', **CASES[case])
+
+    expected = nibabel_header(path)
+    opener = gzip.open if suffix == '.nii.gz' else open
+    with opener(path, 'rb') as fobj:
+        actual = read_nifti_header(fobj)
+
+    assert_headers_equal(actual, expected)
+
+
+def test_read_nifti_header_stops_at_extensions(tmp_path: Path) -> None:
+    path = write_image(tmp_path / 'img.nii')
+    size = len(path.read_bytes())
+
+    with path.open('rb') as fobj:
+        read_nifti_header(fobj)
+        # Without extensions, only the header and extension flag are read
+        assert fobj.tell() == 352 < size
+
+
+INVALID_CASES: list[dict[str, t.Any]] = [
+    {'magic': b'xxx'},
+    {'datatype': 0},
+    {'vox_offset': 100},
+    {'sizeof_hdr': 100},
+]
+
+
+@pytest.mark.parametrize('fields', INVALID_CASES)
+def test_invalid_headers(tmp_path: Path, fields: dict[str, t.Any]) -> None:
+    path = write_image(tmp_path / 'img.nii', **fields)
+    with pytest.raises(ValueError):  # noqa: PT011
+        decode_header(path.read_bytes())
+
+
+def test_read_nifti_headers(tmp_path: Path) -> None:
+    paths = [write_image(tmp_path / f'{case}.nii', **fields) for case, fields in CASES.items()]
+    invalid = [
+        write_image(tmp_path / f'invalid{i}.nii', **fields)
+        for i, fields in enumerate(INVALID_CASES)
+    ]
+    # Interleave versions, byte orders and invalid files
+    paths = paths[::2] + invalid + paths[1::2]
+
+    fobjs = [path.open('rb') for path in paths]
+    try:
+        headers = read_nifti_headers(fobjs)
+    finally:
+        for fobj in fobjs:
+            fobj.close()
+
+    assert len(headers) == len(paths)
+    for path, header in zip(paths, headers, strict=True):
+        if path in invalid:
+            assert isinstance(header, ValueError)
+        else:
+            assert isinstance(header, ctx.NiftiHeader)
+            assert_headers_equal(header, nibabel_header(path))
+
+
+def test_read_nifti_headers_axis_codes() -> None:
+    """Batched axis codes match nibabel for rotations, shears, ties and degenerate affines."""
+    rng = np.random.default_rng(42)
+    affines = []
+    for _ in range(200):
+        perm = np.eye(3)[rng.permutation(3)] * rng.choice([-1, 1], size=3)
+        affines.append(perm @ np.diag(rng.uniform(0.5, 3, size=3)))
+        affines.append(rng.normal(size=(3, 3)))
+        # Exact ties at 45 degrees
+        affines.append(perm @ np.array([[1, 1, 0], [-1, 1, 0], [0, 0, 1]]))
+    affines.extend([np.zeros((3, 3)), np.diag([1, 0, 1]), np.array([[1, 1, 0]] * 3)])
+
+    blocks = []
+    expected = []
+    for linear in affines:
+        affine = np.eye(4)
+        affine[:3, :3] = linear
+        header: t.Any = nb.Nifti1Header()  # type: ignore[no-untyped-call]
+        header.set_sform(affine, code=1)
+        blocks.append(io.BytesIO(header.binaryblock + bytes(4)))
+        expected.append(nb.orientations.aff2axcodes(header.get_best_affine()))  # type: ignore[no-untyped-call]
+
+    headers = read_nifti_headers(blocks)
+    actual = [h.axis_codes for h in headers if isinstance(h, ctx.NiftiHeader)]
+    assert actual == expected
+
+
+def test_mrs_header(mrs_data: Path) -> None:
+    example = mrs_data / 'example_01.nii.gz'
+    with gzip.open(example, 'rb') as fobj:
+        actual = read_nifti_header(fobj)
+
+    assert_headers_equal(actual, nibabel_header(example))
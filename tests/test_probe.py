@@ -0,0 +1,319 @@
+import gzip
+import io
+import json
+import struct
+import threading
+import typing as t
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import fsspec
+import nibabel as nb
+import numpy as np
+import pytest
+from bidsschematools.types.namespace import Namespace
+from upath import UPath
+
+from bids_validator import context
+from bids_validator.cache import LoaderCache, sizeof
+from bids_validator.probe import REMOTE_BLOCK_SIZE, FileProbe
+from bids_validator.types.files import FileTree
+
+
+class RangeReader:
+    """Serve byte ranges of a buffer, recording each request."""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.requests: list[tuple[int, int]] = []
+
+    def __call__(self, offset: int, size: int) -> bytes:
+        self.requests.append((offset, size))
+        return self.data[offset : offset + size]
+
+
+def nifti_bytes() -> bytes:
+    img = nb.Nifti1Image(np.zeros((4, 4, 4), dtype=np.uint8), np.eye(4))  # type: ignore[no-untyped-call]
+    buffer = io.BytesIO()
+    img.to_stream(buffer)
+    return buffer.getvalue()
+
+
+def test_head() -> None:
+    reader = RangeReader(bytes(range(256)) * 100)
+    probe = FileProbe(reader, block_size=1024)
+
+    assert probe.head(4) == b'\x00\x01\x02\x03'
+    assert probe.head(1024) == reader.data[:1024]
+    assert reader.requests == [(0, 1024)]
+
+    # Buffers grow at least geometrically
+    assert probe.head(1500) == reader.data[:1500]
+    assert probe.head(2048) == reader.data[:2048]
+    assert reader.requests == [(0, 1024), (1024, 1024)]
+
+    assert probe.head(10**6) == reader.data
+    assert probe.head(10**7) == reader.data
+    assert reader.requests[-1][0] + reader.requests[-1][1] > len(reader.data)
+
+
+def test_head_empty() -> None:
+    reader = RangeReader(b'')
+    probe = FileProbe(reader)
+    assert probe.head(10) == b''
+    assert probe.decompressed(10) == b''
+    assert len(reader.requests) == 1
+
+
+@pytest.mark.parametrize('block_size', [16, 1024, 8192])
+def test_decompressed(block_size: int) -> None:
+    rng = np.random.default_rng(0)
+    plain = rng.integers(0, 16, 100_000, dtype=np.uint8).tobytes()
+    # Multiple members, as written by bgzip
+    data = b''.join(gzip.compress(plain[i : i + 30_000]) for i in range(0, len(plain), 30_000))
+    reader = RangeReader(data)
+    probe = FileProbe(reader, block_size=block_size)
+
+    assert probe.decompressed(348) == plain[:348]
+    if block_size >= 1024:
+        assert len(reader.requests) == 1
+    assert probe.decompressed(40_000) == plain[:40_000]
+    assert probe.decompressed(10**6) == plain
+    assert probe.reader(decompress=True).read() == plain
+
+
+def test_decompressed_invalid() -> None:
+    data = gzip.compress(b'a' * 1000)
+    noise = np.random.default_rng(0).bytes(1000)
+    assert FileProbe(RangeReader(data + b'garbage')).decompressed(2000) == b'a' * 1000
+    # Truncated streams yield what could be decoded
+    assert FileProbe(RangeReader(data[:20])).decompressed(10) == b'a' * 10
+    truncated = FileProbe(RangeReader(gzip.compress(noise)[:500])).decompressed(2000)
+    assert 0 < len(truncated) < 500
+    assert noise.startswith(truncated)
+    assert FileProbe(RangeReader(zlib.compress(b'a' * 1000))).decompressed(10) == b''
+
+
+def test_reader() -> None:
+    probe = FileProbe(RangeReader(b'0123456789'), block_size=4)
+    reader = probe.reader()
+    assert reader.read(3) == b'012'
+    assert reader.tell() == 3
+    assert reader.read(4) == b'3456'
+    assert reader.read() == b'789'
+    assert reader.read(1) == b''
+
+
+@pytest.fixture
+def memfs() -> fsspec.AbstractFileSystem:
+    mem = fsspec.filesystem('memory')
+    mem.store.clear()
+    yield mem
+    mem.store.clear()
+
+
+def test_context_opens_once(
+    tmp_path: Path, schema: Namespace, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    files = {
+        'dataset_description.json': json.dumps(
+            {'Name': 'Probe', 'BIDSVersion': '1.10.1'}
+        ).encode(),
+        'sub-01/anat/sub-01_T1w.nii.gz': gzip.compress(nifti_bytes()),
+        'sub-01/micr/sub-01_sample-A_SEM.tif': b'II' + struct.pack('<HI', 42, 8),
+        'sub-01/micr/sub-01_sample-B_SEM.ome.btf': b'MM' + struct.pack('>HI', 43, 8),
+    }
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_bytes(content)
+    tree = FileTree.read_from_filesystem(tmp_path)
+    t1w = tree / 'sub-01' / 'anat' / 'sub-01_T1w.nii.gz'
+    tif = tree / 'sub-01' / 'micr' / 'sub-01_sample-A_SEM.tif'
+    btf = tree / 'sub-01' / 'micr' / 'sub-01_sample-B_SEM.ome.btf'
+
+    opened: list[str] = []
+    path_type = type(t1w.path_obj)
+    original_open = path_type.open
+
+    def open_(self: UPath, *args: t.Any, **kwargs: t.Any) -> t.Any:
+        opened.append(self.name)
+        return original_open(self, *args, **kwargs)
+
+    monkeypatch.setattr(path_type, 'open', open_)
+
+    with context.Dataset(tree, schema) as ds:
+        ctx = context.Context(t1w, ds, None)
+        assert ctx.gzip is not None
+        assert ctx.gzip.filename == ''
+        assert ctx.nifti_header is not None
+        assert ctx.nifti_header.shape == (4, 4, 4)
+        assert ctx.tiff is None
+
+        # Other contexts of the same file share the probe
+        other = context.Context(t1w, ds, None)
+        assert other.nifti_header is not None
+        assert other.nifti_header.axis_codes == ctx.nifti_header.axis_codes
+        assert opened == ['sub-01_T1w.nii.gz']
+
+        tif_ctx = context.Context(tif, ds, None)
+        assert tif_ctx.tiff is not None
+        assert tif_ctx.tiff.version == 42
+        assert tif_ctx.gzip is None
+        assert tif_ctx.nifti_header is None
+        btf_ctx = context.Context(btf, ds, None)
+        assert btf_ctx.tiff is not None
+        assert btf_ctx.tiff.version == 43
+        assert opened[1:] == ['sub-01_sample-A_SEM.tif', 'sub-01_sample-B_SEM.ome.btf']
+
+
+def test_cached_probe_size(tmp_path: Path) -> None:
+    """Cached probes are measured again once headers have been read through them."""
+    (tmp_path / 'sub-01_T1w.nii.gz').write_bytes(gzip.compress(nifti_bytes()))
+    file = FileTree.read_from_filesystem(tmp_path) / 'sub-01_T1w.nii.gz'
+
+    cache = LoaderCache()
+    with cache.activate():
+        probe = context.load_probe(file)
+        assert context.load_nifti_header(file).shape == (4, 4, 4)
+        assert context.load_probe(file) is probe
+    # Raw and decompressed buffers, and the decompressor's window
+    assert sizeof(probe) > len(probe.head(10**6)) + 2**zlib.MAX_WBITS
+    assert cache.nbytes >= sizeof(probe)
+
+
+def test_nifti_extension_beyond_block(memfs: fsspec.AbstractFileSystem) -> None:
+    """Headers with extensions larger than the first block are read in full."""
+    metadata = {'ResonantNucleus': ['1H'], 'Padding': 'x' * 50_000}
+    img = nb.Nifti1Image(np.zeros((1, 1, 1, 16), dtype=np.complex64), np.eye(4))  # type: ignore[no-untyped-call]
+    img.header.extensions.append(nb.nifti1.Nifti1Extension(44, json.dumps(metadata).encode()))
+    buffer = io.BytesIO()
+    img.to_stream(buffer)
+    memfs.pipe({'/sub-01_mrs.nii.gz': gzip.compress(buffer.getvalue(), mtime=0)})
+
+    tree = FileTree.read_from_filesystem('memory://')
+    header = context.load_nifti_header(tree / 'sub-01_mrs.nii.gz')
+    assert isinstance(header.mrs, Namespace)
+    assert header.mrs.ResonantNucleus == ['1H']
+    assert header.mrs.Padding == metadata['Padding']
+
+
+class RangeServer(ThreadingHTTPServer):
+    """HTTP server for in-memory files that honors single byte ranges."""
+
+    def __init__(self, files: dict[str, bytes]) -> None:
+        super().__init__(('127.0.0.1', 0), RangeHandler)
+        self.files = files
+        self.bytes_sent = 0
+        self.requests: list[str | None] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host!s}:{port}'
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    server: RangeServer
+
+    def log_message(self, format: str, *args: t.Any) -> None:  # noqa: A002
+        pass
+
+    def do_HEAD(self) -> None:
+        self.respond(head=True)
+
+    def do_GET(self) -> None:
+        self.respond(head=False)
+
+    def respond(self, *, head: bool) -> None:
+        data = self.server.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        range_header = self.headers.get('Range')
+        self.server.requests.append(range_header)
+        status = 200
+        if range_header:
+            first, last = range_header.removeprefix('bytes=').split('-')
+            start = int(first)
+            end = min(int(last) + 1, len(data)) if last else len(data)
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            status = 206
+            body = data[start:end]
+        else:
+            body = data
+        self.send_response(status)
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{len(data)}')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            # Count before writing, as the client may finish reading before the write returns
+            self.server.bytes_sent += len(body)
+            self.wfile.write(body)
+
+
+@pytest.fixture
+def range_server() -> t.Generator[RangeServer, None, None]:
+    server = RangeServer({})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_remote_header_ranges(range_server: RangeServer) -> None:
+    """Headers of remote files are read with bounded range requests."""
+    rng = np.random.default_rng(0)
+    # Incompressible data, so compressed files are as large as the image
+    img = nb.Nifti1Image(rng.integers(0, 2**15, (64, 64, 64), dtype=np.int16), np.eye(4))  # type: ignore[no-untyped-call]
+    nii = img.to_bytes()
+    metadata = {'ResonantNucleus': ['1H'], 'Padding': rng.bytes(60_000).hex()}
+    img.header.extensions.append(nb.nifti1.Nifti1Extension(44, json.dumps(metadata).encode()))
+    mrs = img.to_bytes()
+    range_server.files.update(
+        {
+            '/sub-01_T1w.nii': nii,
+            '/sub-01_T1w.nii.gz': gzip.compress(nii),
+            '/sub-01_mrs.nii.gz': gzip.compress(mrs),
+            '/short.nii.gz': gzip.compress(nii)[:REMOTE_BLOCK_SIZE],
+        }
+    )
+    root = range_server.url
+
+    with LoaderCache().activate():
+        for name in ('sub-01_T1w.nii', 'sub-01_T1w.nii.gz'):
+            file = FileTree(UPath(f'{root}/{name}'), is_dir=False)
+            range_server.bytes_sent = 0
+            header = context.load_nifti_header(file)
+            assert header.shape == (64, 64, 64)
+            if name.endswith('.gz'):
+                assert context.load_gzip_header(file) is not None
+            # One request for the first block serves both headers
+            assert range_server.bytes_sent == REMOTE_BLOCK_SIZE
+            assert len(range_server.files[f'/{name}']) > 4 * REMOTE_BLOCK_SIZE
+
+        # Large extensions grow the buffer geometrically, stopping once they are read
+        file = FileTree(UPath(f'{root}/sub-01_mrs.nii.gz'), is_dir=False)
+        range_server.bytes_sent = 0
+        range_server.requests.clear()
+        header = context.load_nifti_header(file)
+        assert isinstance(header.mrs, Namespace)
+        assert header.mrs.Padding == metadata['Padding']
+        assert range_server.requests == [
+            f'bytes=0-{REMOTE_BLOCK_SIZE - 1}',
+            f'bytes={REMOTE_BLOCK_SIZE}-{2 * REMOTE_BLOCK_SIZE - 1}',
+        ]
+        assert range_server.bytes_sent == 2 * REMOTE_BLOCK_SIZE
+
+        # Objects that end on a block boundary are read to the end without errors
+        file = FileTree(UPath(f'{root}/short.nii.gz'), is_dir=False)
+        probe = context.load_probe(file)
+        assert probe.head(10 * REMOTE_BLOCK_SIZE) == range_server.files['/short.nii.gz']
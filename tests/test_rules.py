@@ -0,0 +1,212 @@
+import gzip
+import json
+from collections.abc import Iterator
+from contextlib import suppress
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+import pytest
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.expressions import compile_conjunction, compile_expression
+from bids_validator.rules import (
+    CONTENT_FIELDS,
+    RuleIndex,
+    find_rules,
+    is_name_selector,
+    referenced_fields,
+    rule_fields,
+)
+from bids_validator.types import _typings as t
+from bids_validator.types.files import FileTree
+
+
+def files(tree: FileTree) -> Iterator[FileTree]:
+    for child in tree.children.values():
+        if child.is_dir:
+            yield from files(child)
+        else:
+            yield child
+
+
+def raw_file_names(schema: Namespace) -> set[str]:
+    """Name files for every suffix and extension of the raw file rules.
+
+    Each is named with the subject alone and with all entities of its rule,
+    except sidecars and the targets of associations, so that each file has at
+    most one sidecar and one file of each association per directory. Targets
+    with several extensions, such as images, are named with the last one.
+    """
+    targets = context._association_targets(schema)[0]
+    single = {(target.suffix, extension) for target in targets for extension in target.extensions}
+    skip = {
+        (target.suffix, extension) for target in targets for extension in target.extensions[:-1]
+    }
+    names = set()
+    for rule in schema.rules.files.raw.values(level=2):
+        datatype = rule.datatypes[0] if rule.datatypes else '.'
+        for suffix in rule.suffixes:
+            for extension in rule.extensions:
+                if extension == '.*' or extension.endswith('/') or (suffix, extension) in skip:
+                    continue
+                if extension == '.json' or {(suffix, extension), (None, extension)} & single:
+                    variants = [rule.entities]
+                else:
+                    variants = [[], rule.entities]
+                for entities in variants:
+                    labels = [
+                        f'{schema.objects.entities[entity].name}-'
+                        f'{schema.objects.entities[entity].get("enum", ["1"])[0]}'
+                        for entity in entities
+                        if entity not in ('subject', 'session')
+                    ]
+                    stem = '_'.join(['sub-01', *labels, suffix])
+                    names.add(f'sub-01/{datatype}/{stem}{extension}')
+    return names
+
+
+@pytest.fixture(scope='module')
+def raw_dataset(tmp_path_factory: pytest.TempPathFactory, schema: Namespace) -> FileTree:
+    root = tmp_path_factory.mktemp('raw')
+    image = nb.Nifti1Image(np.zeros((2, 2, 2), dtype=np.uint8), np.eye(4)).to_bytes()  # type: ignore[no-untyped-call]
+    contents = {
+        '.json': b'{}',
+        '.tsv': b'onset\tduration\n0\t1\n',
+        '.nii': image,
+        '.nii.gz': gzip.compress(image),
+        '.gz': gzip.compress(b''),
+    }
+    (root / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Rules', 'BIDSVersion': '1.10.1'})
+    )
+    for name in raw_file_names(schema):
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(next((v for k, v in contents.items() if name.endswith(k)), b''))
+    return FileTree.read_from_filesystem(root)
+
+
+def test_find_rules(schema: Namespace) -> None:
+    rules = list(find_rules(schema))
+    names = [rule.name for rule in rules]
+    assert len(set(names)) == len(names)
+    assert 'checks.func.RepetitionTimeMismatch' in names
+    rule = rules[names.index('checks.func.RepetitionTimeMismatch')]
+    assert rule.selectors == tuple(schema.rules.checks.func.RepetitionTimeMismatch.selectors)
+    assert rule.definition.checks == schema.rules.checks.func.RepetitionTimeMismatch.checks
+    # Raw filename rules have no selectors
+    assert not any(name.startswith(('files.common.', 'files.raw.')) for name in names)
+
+
+@pytest.mark.parametrize(
+    ('expression', 'expected'),
+    [
+        ('suffix == "bold"', True),
+        ('datatype != "anat" && extension == ".json"', True),
+        ('match(extension, "\\.nii(\\.gz)?$")', True),
+        ('intersects([modality], ["mri", "pet"])', True),
+        ('!("run" in entities)', True),
+        ('entities.run', False),
+        ('"run" in sidecar', False),
+        ('path == "dataset_description.json"', False),
+        ('dataset.dataset_description.DatasetType == "raw"', False),
+        ('exists("participants.tsv", "dataset")', False),
+        ('length(columns.onset) > 0', False),
+    ],
+)
+def test_is_name_selector(expression: str, expected: bool) -> None:
+    assert is_name_selector(expression) is expected
+
+
+def test_rule_fields(schema: Namespace) -> None:
+    rules = {rule.name: rule for rule in find_rules(schema)}
+    assert 'sidecar' in rule_fields(rules['sidecars.func.MRIFuncRepetitionTime'])
+    assert 'columns' in rule_fields(rules['tabular_data.modality_agnostic.Participants'])
+    assert 'json' in rule_fields(rules['json.dataset.dataset_description'])
+    # Checks are included
+    assert rules['checks.nifti.NiftiDimension'].selectors == ('type(nifti_header) != "null"',)
+    assert 'nifti_header' in rule_fields(rules['checks.nifti.NiftiDimension'])
+    assert referenced_fields('exists(sidecar.IntendedFor, "subject") && !null') == {'sidecar'}
+
+
+class Recorder:
+    """Record the fields of a context that expressions read."""
+
+    def __init__(self, ctx: context.Context) -> None:
+        self._context = ctx
+        self.read: set[str] = set()
+
+    def __getattr__(self, name: str) -> t.Any:
+        self.read.add(name)
+        return getattr(self._context, name)
+
+
+def test_fields(raw_dataset: FileTree, schema: Namespace) -> None:
+    """Rules only read the content fields found for each file."""
+    index = RuleIndex(schema)
+    version = schema.schema_version
+
+    read = set()
+    with context.Dataset(raw_dataset, schema) as ds:
+        for file in files(raw_dataset):
+            ctx = context.Context(file, ds, None)
+            recorder = Recorder(ctx)
+            for rule in index.rules:
+                if not compile_conjunction(rule.selectors, version)(recorder):
+                    continue
+                for check in rule.definition.get('checks', ()):
+                    with suppress(Exception):
+                        compile_expression(check, version)(recorder)
+            read |= recorder.read
+
+            fields = index.fields(ctx)
+            assert fields <= CONTENT_FIELDS
+            for field in recorder.read & CONTENT_FIELDS - fields:
+                # Fields of other file types are None, without loading anything
+                assert field in context.FIELD_EXTENSIONS, (file.relative_path, field)
+                assert getattr(ctx, field) is None
+
+        bold = context.Context(raw_dataset / 'sub-01' / 'func' / 'sub-01_bold.nii.gz', ds, None)
+        assert {'nifti_header', 'sidecar'} <= index.fields(bold)
+        assert not {'columns', 'json', 'tiff'} & index.fields(bold)
+
+    assert {'columns', 'json', 'nifti_header', 'sidecar'} <= read
+
+
+def test_select_exhaustive(raw_dataset: FileTree, schema: Namespace) -> None:
+    """Indexed selection is identical to evaluating every selector of every rule."""
+    index = RuleIndex(schema)
+    tests = [compile_conjunction(rule.selectors, schema.schema_version) for rule in index.rules]
+
+    n_candidates = n_files = 0
+    with context.Dataset(raw_dataset, schema) as ds:
+        for file in files(raw_dataset):
+            ctx = context.Context(file, ds, None)
+            expected = [rule for rule, test in zip(index.rules, tests, strict=True) if test(ctx)]
+            assert index.select(ctx) == expected, file.relative_path
+            n_candidates += len(index.candidates(ctx))
+            n_files += 1
+
+    assert n_files > 500
+    # Most rules are skipped without evaluating their other selectors
+    assert n_candidates < n_files * len(index.rules) / 2
+
+
+def test_select_synthetic(examples: Path, schema: Namespace) -> None:
+    tree = FileTree.read_from_filesystem(examples / 'synthetic')
+    func = tree / 'sub-01' / 'ses-01' / 'func'
+    bold = func / 'sub-01_ses-01_task-nback_run-01_bold.nii'
+    other_run = func / 'sub-01_ses-01_task-nback_run-02_bold.nii'
+    index = RuleIndex(schema)
+    with context.Dataset(tree, schema) as ds:
+        selected = [rule.name for rule in index.select(context.Context(bold, ds, None))]
+        candidates = index.candidates(context.Context(bold, ds, None))
+        # Files with the same name parts share candidates
+        assert index.candidates(context.Context(other_run, ds, None)) == candidates
+        assert len(index._candidates) == 1
+    assert 'sidecars.func.MRIFuncRepetitionTime' in selected
+    assert 'checks.func.RepetitionTimeMismatch' in selected
+    assert not any(name.startswith(('sidecars.anat.', 'tabular_data.')) for name in selected)
+    assert set(selected) <= {rule.name for rule in candidates}
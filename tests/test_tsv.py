@@ -0,0 +1,231 @@
+import io
+import itertools
+import math
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from bids_validator.tsv import parse_numbers, read_columns, summarize_columns, summarize_values
+from bids_validator.types import _typings as t
+
+
+def zip_columns(data: bytes, max_rows: int = 0) -> dict[str, tuple[str, ...]]:
+    """Transpose rows the way context.load_tsv does."""
+    lines: list[str] = data.decode().splitlines()
+    if max_rows > 0:
+        lines = list(itertools.islice(lines, max_rows))
+    contents = (line.split('\t') for line in lines)
+    return dict(zip(next(contents), zip(*contents, strict=False), strict=False))
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        b'a\tb\n1\t2\n3\t4\n',
+        b'a\tb\n1\t2\n3\t4',
+        b'a\tb\r\n1\t2\r\n3\t4\r\n',
+        b'a\n1\n2\n',
+        b'a\tb\n\t\n\t\n',
+        b'a\tb\n\xc3\xa9t\xc3\xa9\t2\n3\t4\n',
+        # Ragged rows are truncated to the shortest row
+        b'a\tb\n1\t2\n3\n',
+        b'a\tb\n1\t2\t5\n3\t4\n',
+        b'a\tb\n1\t2\n\n3\t4\n',
+        # Long values are stored in object arrays
+        b'a\tb\n1\t' + b'x' * 100_000 + b'\n' + b'2\ty\n' * 10,
+    ],
+    ids=lambda data: repr(data[:20]),
+)
+@pytest.mark.parametrize('max_rows', [0, 2])
+def test_read_columns(data: bytes, max_rows: int) -> None:
+    columns = read_columns(data, max_rows=max_rows)
+    expected = zip_columns(data, max_rows)
+    assert {name: tuple(values.tolist()) for name, values in columns.items()} == expected
+
+
+def test_read_columns_projection() -> None:
+    data = b'participant_id\tage\tsex\nsub-01\t34\tF\nsub-02\t38\tM\n'
+    columns = read_columns(data, ['sex', 'participant_id', 'handedness'])
+    assert list(columns) == ['participant_id', 'sex']
+    assert columns['sex'].tolist() == ['F', 'M']
+    assert columns['participant_id'].dtype == np.dtype('<U6')
+
+
+def test_read_columns_empty() -> None:
+    assert read_columns(b'') == {}
+    columns = read_columns(b'a\tb\n')
+    assert list(columns) == ['a', 'b']
+    assert columns['a'].size == 0
+
+
+class RowStream(io.RawIOBase):
+    """Generate rows of a numeric TSV file on read, without holding them in memory."""
+
+    def __init__(self, n_rows: int) -> None:
+        self.rows = (f'{i}\t{i % 7 - 3}.5\tn/a\n'.encode() for i in range(n_rows))
+        self.pending = b''
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: t.Any) -> int:
+        while len(self.pending) < len(buffer):
+            row = next(self.rows, None)
+            if row is None:
+                break
+            self.pending += row
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+
+def summarize_rows(
+    rows: list[list[str]], n_columns: int
+) -> list[tuple[int, int, int, float | None, float | None]]:
+    """Compute per-column summaries of well-formed rows directly."""
+    summaries = []
+    for column in range(n_columns):
+        numbers = []
+        non_numeric = 0
+        for row in rows:
+            if len(row) != n_columns:
+                continue
+            try:
+                numbers.append(float('nan') if row[column] == 'n/a' else float(row[column]))
+            except ValueError:
+                non_numeric += 1
+        finite = [x for x in numbers if not math.isnan(x)]
+        summaries.append(
+            (
+                len(numbers),
+                len(numbers) - len(finite),
+                non_numeric,
+                min(finite, default=None),
+                max(finite, default=None),
+            )
+        )
+    return summaries
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        b'1\t2\n3\t4\n',
+        b'1\t2\n3\t4',
+        b'1\t2\r\n3\t4\r\n',
+        b'1\tn/a\nnan\t-inf\n1e3\t2\n',
+        b'n/a\tn/a\n',
+        b'1\t2\n3\n4\t5\t6\n\n7\t8\n',
+        b'1\tx\n2\t\n3\t4\n',
+        b'1 2\t\n3\t4\n',
+        b'\t1\n2\t3\n',
+        b'1\t2\n\t\n',
+        b' 1\t2 \n3\t4\x0b5\n',
+        b'inf\t-inf\ninf\tn/a\n',
+        b'',
+    ],
+)
+@pytest.mark.parametrize('chunk_size', [1, 3, 2**20])
+def test_summarize_columns(data: bytes, chunk_size: int) -> None:
+    summary = summarize_columns(io.BytesIO(data), ('a', 'b'), chunk_size=chunk_size)
+
+    lines = data.replace(b'\r\n', b'\n').decode().split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    rows = [line.split('\t') for line in lines]
+    assert summary.n_rows == len(rows)
+    assert summary.n_columns == 2
+    assert summary.bad_rows == tuple(i for i, row in enumerate(rows, 1) if len(row) != 2)
+    assert summary.n_bad_rows == len(summary.bad_rows)
+    assert [
+        (col.n_numeric, col.n_nan, col.n_non_numeric, col.minimum, col.maximum)
+        for col in summary.columns.values()
+    ] == summarize_rows(rows, 2)
+
+
+def test_summarize_columns_spaces() -> None:
+    """Fields are not split at spaces, and empty fields are not skipped."""
+    summary = summarize_columns(io.BytesIO(b'1 2\t\n3\t4\n'), ('a', 'b'))
+    assert [
+        (col.n_numeric, col.n_non_numeric, col.minimum, col.maximum)
+        for col in summary.columns.values()
+    ] == [(1, 1, 3.0, 3.0), (1, 1, 4.0, 4.0)]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2**20])
+def test_summarize_columns_infinite(chunk_size: int) -> None:
+    """Streamed summaries of infinite values match summaries of loaded columns."""
+    columns = {
+        'inf': ['inf', 'inf'],
+        'neg': ['-inf', 'n/a'],
+        'both': ['-inf', 'inf'],
+        'mixed': ['inf', '1'],
+        'text': ['x', '-inf'],
+    }
+    rows = list(zip(*columns.values(), strict=True))
+    data = ''.join('\t'.join(row) + '\n' for row in rows).encode()
+
+    summary = summarize_columns(io.BytesIO(data), tuple(columns), chunk_size=chunk_size)
+    for header, values in columns.items():
+        expected = summarize_values(np.array(values, dtype=str))
+        assert summary.columns[header] == expected, header
+    assert summary.columns['inf'].minimum == summary.columns['inf'].maximum == math.inf
+    assert summary.columns['neg'].maximum == -math.inf
+
+
+def test_summarize_columns_max_bad_rows() -> None:
+    summary = summarize_columns(io.BytesIO(b'1\n' * 100), ('a', 'b'), max_bad_rows=3)
+    assert summary.n_bad_rows == 100
+    assert summary.bad_rows == (1, 2, 3)
+
+
+def test_summarize_columns_memory() -> None:
+    """Memory use is bounded by the chunk size, not the file size."""
+    n_rows = 100_000
+    stream = io.BufferedReader(RowStream(n_rows))
+
+    tracemalloc.start()
+    try:
+        summary = summarize_columns(stream, ('n', 'x', 'missing'), chunk_size=2**16)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert summary.n_rows == n_rows
+    assert summary.n_bad_rows == 0
+    assert summary.columns['n'].maximum == n_rows - 1
+    assert summary.columns['x'].minimum == -3.5
+    assert summary.columns['x'].maximum == 3.5
+    assert summary.columns['missing'].n_nan == n_rows
+    assert summary.columns['missing'].minimum is None
+    # About 1.5 MB of rows were read
+    assert peak < 2**20
+
+
+@pytest.mark.parametrize(
+    'values',
+    [
+        ['0', '1.5', '-2', '1e3'],
+        ['0.5', 'n/a', 'nan', '-inf'],
+        ['1', 'x', '', 'n/a', ' 2 '],
+        ['n/a'],
+        [],
+    ],
+)
+def test_summarize_values(values: list[str]) -> None:
+    """Columns are summarized as the rows of headerless files are."""
+    summary = summarize_values(np.array(values, dtype=str))
+    [expected] = summarize_rows([[value] for value in values], 1)
+    assert (
+        summary.n_numeric,
+        summary.n_nan,
+        summary.n_non_numeric,
+        summary.minimum,
+        summary.maximum,
+    ) == expected
+
+    numbers, non_numeric = parse_numbers(np.array(values, dtype=str))
+    assert non_numeric.sum() == summary.n_non_numeric
+    assert np.isnan(numbers).sum() == summary.n_nan + summary.n_non_numeric
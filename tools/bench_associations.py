@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Time the resolution of associations for every file of a large functional directory.
+
+Usage: bench_associations.py [N_RUNS]
+
+An in-memory dataset with one subject is created, whose ``func/`` directory
+holds N_RUNS (default 500) runs of BOLD images, sidecars, events and
+physiological recordings. The associations of every file are resolved by
+walking back from each file to each association, and for the whole directory
+at once.
+"""
+
+import sys
+import time
+
+import fsspec
+from bidsschematools.schema import load_schema
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.cache import LoaderCache
+from bids_validator.types.files import FileTree
+
+
+def make_dataset(n_runs: int) -> FileTree:
+    """Create a dataset with n_runs runs of four files each."""
+    mem = fsspec.filesystem('memory')
+    mem.store.clear()
+    files = {'/task-rest_bold.json': b'{}', '/task-rest_events.json': b'{}'}
+    for run in range(1, n_runs + 1):
+        prefix = f'/sub-01/func/sub-01_task-rest_run-{run:04d}'
+        files.update(
+            {
+                f'{prefix}_bold.nii.gz': b'',
+                f'{prefix}_bold.json': b'{}',
+                f'{prefix}_events.tsv': b'',
+                f'{prefix}_physio.tsv.gz': b'',
+            }
+        )
+    mem.pipe(files)
+    return FileTree.read_from_filesystem('memory://')
+
+
+def walk(directory: FileTree, schema: Namespace) -> dict[str, dict[str, tuple[FileTree, ...]]]:
+    """Resolve the associations of each file by walking back from it."""
+    targets = context._association_targets(schema)[0]
+    found = {}
+    for child in directory.children.values():
+        parts = context.FileParts.from_file(child, schema)
+        associations = {}
+        for target in targets:
+            if not target.applies(parts):
+                continue
+            groups = context._walk_back(
+                child, target.inherit, target.extensions, target.suffix, target.entities
+            )
+            files = next((tuple(group) for group in groups if group), ())
+            if files:
+                associations[target.name] = files
+        found[child.name] = associations
+    return found
+
+
+def main(n_runs: int) -> None:
+    """Run benchmark."""
+    schema = load_schema()
+    dataset = make_dataset(n_runs)
+    func = dataset / 'sub-01' / 'func'
+
+    with LoaderCache().activate():
+        start = time.perf_counter()
+        expected = walk(func, schema)
+        walked = time.perf_counter() - start
+
+    with LoaderCache().activate():
+        start = time.perf_counter()
+        actual = context.load_directory_associations(func, schema)
+        batched = time.perf_counter() - start
+
+    if {name: found for name, found in actual.items() if found} != {
+        name: found for name, found in expected.items() if found
+    }:
+        sys.exit('Batched associations differ from walked associations')
+    print(f'{len(func.children)} files in a directory')
+    print(f'{"walk":>8}: {walked:.3f} s')
+    print(f'{"batched":>8}: {batched:.3f} s ({walked / batched:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Measure rows per second of checks of TSV columns against the schema.
+
+Usage: bench_columns.py [N_ROWS]
+
+A table of N_ROWS rows, one million by default, is generated with onset,
+duration, trial_type and response_time columns, and a few invalid values.
+Each column is checked one cell at a time with the compiled regular
+expressions of ``schema.objects.formats``, and as a whole with
+:class:`~bids_validator.columns.ColumnValidator`.
+"""
+
+import re
+import sys
+import time
+
+import numpy as np
+from bidsschematools.schema import load_schema
+
+from bids_validator.columns import ColumnValidators
+
+COLUMNS = ('onset', 'duration', 'trial_type', 'response_time')
+
+
+def make_columns(n_rows: int) -> dict[str, np.ndarray]:
+    """Generate event columns with an invalid value every 10,000 rows."""
+    rng = np.random.default_rng(0)
+    columns = {
+        'onset': np.char.mod('%.3f', np.cumsum(rng.uniform(0.5, 2, n_rows))),
+        'duration': np.char.mod('%.2f', rng.uniform(0, 2, n_rows)),
+        'trial_type': rng.choice(['go', 'stop', 'n/a'], n_rows),
+        'response_time': np.char.mod('%.3f', rng.uniform(0.2, 1, n_rows)),
+    }
+    columns['duration'][::10_000] = '-1'
+    columns['response_time'][5::10_000] = 'fast'
+    return columns
+
+
+def check_cells(definition: dict, formats: dict, values: list[str]) -> list[int]:
+    """Check each value of a column, as a loop over cells would."""
+    fmt = definition.get('format') or {'number': 'number'}.get(definition.get('type', ''))
+    pattern = re.compile(formats[fmt]['pattern']) if fmt else None
+    minimum = definition.get('minimum')
+    invalid = []
+    for row, value in enumerate(values):
+        if value == 'n/a':
+            continue
+        if (pattern is not None and not pattern.fullmatch(value)) or (
+            minimum is not None and float(value) < minimum
+        ):
+            invalid.append(row)
+    return invalid
+
+
+def main(argv: list[str]) -> None:
+    """Run benchmark."""
+    n_rows = int(argv[0]) if argv else 1_000_000
+    schema = load_schema()
+    definitions = schema.objects.columns.to_dict()
+    formats = schema.objects.formats.to_dict()
+    columns = make_columns(n_rows)
+    lists = {name: values.tolist() for name, values in columns.items()}
+    validators = ColumnValidators(schema)
+
+    start = time.perf_counter()
+    per_cell = [len(check_cells(definitions[name], formats, lists[name])) for name in COLUMNS]
+    cells = time.perf_counter() - start
+
+    start = time.perf_counter()
+    errors = [validators[name].check(columns[name]) for name in COLUMNS]
+    whole = time.perf_counter() - start
+
+    vectorized = [0 if error is None else error.n_invalid for error in errors]
+    print(f'{n_rows:,} rows, {len(COLUMNS)} columns, invalid values: {vectorized}')
+    if per_cell != vectorized:
+        print(f'per-cell invalid values differ: {per_cell}')
+    for label, elapsed in [('per cell', cells), ('whole column', whole)]:
+        print(f'{label:>13}: {n_rows * len(COLUMNS) / elapsed:14,.0f} cells/s')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
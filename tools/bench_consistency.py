@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""Time the comparison of subject directories with participants.tsv.
+
+Usage: bench_consistency.py [N_SUBJECTS]
+
+A dataset of N_SUBJECTS (default 50000) empty subject directories is created
+in a temporary directory, with a participants.tsv file that lists all but the
+first, in reverse order. The subjects missing from participants.tsv are found
+by intersecting lists, as rule expressions used to, by evaluating the
+ParticipantIDMismatch rule, and with check_participants. Intersecting lists
+takes about half a minute for 50000 subjects.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bidsschematools.schema import load_schema
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator import context
+from bids_validator.consistency import check_participants
+from bids_validator.expressions import compile_expression
+from bids_validator.types.files import FileTree
+
+
+def make_dataset(root: Path, n_subjects: int) -> FileTree:
+    """Create subject directories and a participants.tsv file missing the first subject."""
+    ids = [f'sub-{i:05d}' for i in range(n_subjects)]
+    for sub in ids:
+        (root / sub).mkdir()
+    (root / 'participants.tsv').write_text('\n'.join(['participant_id', *ids[:0:-1]]) + '\n')
+    return FileTree.read_from_filesystem(root)
+
+
+def main(n_subjects: int) -> None:
+    """Run benchmark."""
+    schema = load_schema()
+    [check] = schema.rules.checks.dataset.ParticipantIDMismatch.checks
+    expression = compile_expression(check, schema.schema_version)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tree = make_dataset(Path(tmpdir), n_subjects)
+        with context.Dataset(tree, schema) as ds:
+            subjects = ds.subjects
+            # Load both collections before timing
+            participant_id, sub_dirs = subjects.participant_id or [], subjects.sub_dirs
+
+            start = time.perf_counter()
+            listed = [sub for sub in sub_dirs if sub in participant_id]
+            lists = time.perf_counter() - start
+
+            start = time.perf_counter()
+            passed = expression(Namespace({'dataset': ds}))
+            evaluated = time.perf_counter() - start
+
+            start = time.perf_counter()
+            missing = check_participants(ds)
+            sets = time.perf_counter() - start
+
+    if passed or missing != sorted(set(sub_dirs) - set(listed)):
+        sys.exit('Checks differ')
+    print(f'{n_subjects} subjects, {len(missing)} missing from participants.tsv')
+    print(f'{"lists":>10}: {lists:.3f} s')
+    print(f'{"expression":>10}: {evaluated:.3f} s ({lists / evaluated:.0f}x)')
+    print(f'{"sets":>10}: {sets:.3f} s ({lists / sets:.0f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""Measure evaluations per second of schema rule selectors.
+
+Usage: bench_expressions.py [DATASET]
+
+Every selector of every rule in the schema is evaluated against the context
+of every file in DATASET, or in a generated dataset of 20 subjects with
+anatomical and functional files. Selectors are evaluated by parsing them for
+each evaluation, as an interpreter would, and with cached compiled functions.
+"""
+
+import gzip
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+from bidsschematools.schema import load_schema
+
+from bids_validator import context
+from bids_validator.expressions import compile_expression
+from bids_validator.types.files import FileTree
+
+
+def make_dataset(root: Path, n_subjects: int = 20) -> None:
+    """Write a dataset with small images, empty sidecars and event files."""
+    image = nb.Nifti1Image(np.zeros((2, 2, 2), dtype=np.uint8), np.eye(4))
+    contents = {
+        '.nii.gz': gzip.compress(image.to_bytes()),
+        '.json': b'{}',
+        '.tsv': b'onset\tduration\n0\t1\n',
+    }
+    (root / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Benchmark', 'BIDSVersion': '1.10.1'})
+    )
+    (root / 'task-rest_bold.json').write_text(json.dumps({'TaskName': 'rest'}))
+    for i in range(1, n_subjects + 1):
+        sub = f'sub-{i:02d}'
+        for datatype, names in {
+            'anat': ['T1w.nii.gz', 'T1w.json'],
+            'func': [
+                f'task-rest_run-{run}_{suffix}'
+                for run in (1, 2)
+                for suffix in ('bold.nii.gz', 'events.tsv')
+            ],
+        }.items():
+            (root / sub / datatype).mkdir(parents=True)
+            for name in names:
+                extension = name[name.find('.') :]
+                (root / sub / datatype / f'{sub}_{name}').write_bytes(contents[extension])
+
+
+def selectors(node: object) -> list[str]:
+    """Collect the selectors of every rule."""
+    found = []
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'selectors' and isinstance(value, list):
+                found.extend(value)
+            else:
+                found.extend(selectors(value))
+    elif isinstance(node, list):
+        for value in node:
+            found.extend(selectors(value))
+    return found
+
+
+def files(tree: FileTree) -> list[FileTree]:
+    """List the files of a tree."""
+    return [
+        node
+        for child in tree.children.values()
+        for node in (files(child) if child.is_dir else [child])
+    ]
+
+
+def run(root: Path) -> None:
+    """Run benchmark."""
+    schema = load_schema()
+    version = schema.schema_version
+    expressions = selectors(schema.rules.to_dict())
+    tree = FileTree.read_from_filesystem(root)
+
+    with context.Dataset(tree, schema) as dataset:
+        contexts = [context.Context(file, dataset, None) for file in files(tree)]
+        n_evaluations = len(contexts) * len(expressions)
+        print(f'{len(expressions)} selectors, {len(contexts)} files')
+
+        # Warm up fields that selectors load, such as sidecars
+        functions = [compile_expression(expression, version) for expression in expressions]
+        for ctx in contexts:
+            for function in functions:
+                function(ctx)
+
+        interpret = compile_expression.__wrapped__
+        start = time.perf_counter()
+        for ctx in contexts:
+            for expression in expressions:
+                interpret(expression, version)(ctx)
+        parsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for ctx in contexts:
+            for expression in expressions:
+                compile_expression(expression, version)(ctx)
+        cached = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for ctx in contexts:
+            for function in functions:
+                function(ctx)
+        compiled = time.perf_counter() - start
+
+    for label, elapsed in [
+        ('parse per evaluation', parsed),
+        ('cached lookup', cached),
+        ('compiled function', compiled),
+    ]:
+        print(f'{label:>22}: {n_evaluations / elapsed:12,.0f} evaluations/s')
+
+
+def main(argv: list[str]) -> None:
+    """Run benchmark on a dataset, or on a generated one."""
+    if argv:
+        run(Path(argv[0]))
+        return
+    with tempfile.TemporaryDirectory() as tmpdir:
+        make_dataset(Path(tmpdir))
+        run(Path(tmpdir))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Compare throughput of regex and token-based filename parsing.
+
+Usage: bench_filenames.py [BIDS_ROOT ...]
+
+Paths are collected from the given datasets, falling back to the bids-examples
+submodule or, if it is not checked out, a synthetic dataset listing.
+"""
+
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from bids_validator import BIDSValidator
+from bids_validator.filenames import FilenameParser
+
+EXAMPLES = Path(__file__).parent.parent / 'tests' / 'data' / 'bids-examples'
+
+
+def dataset_paths(root: Path) -> list[str]:
+    """List dataset-relative paths of all files under a root."""
+    return [
+        '/' + path.relative_to(root).as_posix()
+        for path in root.rglob('*')
+        if path.is_file() and not any(part.startswith('.') for part in path.parts)
+    ]
+
+
+def synthetic_paths(n_subjects: int = 200) -> list[str]:
+    """List paths of a typical multi-session MRI dataset."""
+    paths = ['/dataset_description.json', '/participants.tsv', '/README', '/task-rest_bold.json']
+    for sub in range(n_subjects):
+        for ses in ('pre', 'post'):
+            prefix = f'/sub-{sub:03d}/ses-{ses}'
+            base = f'sub-{sub:03d}_ses-{ses}'
+            paths.append(f'{prefix}/{base}_scans.tsv')
+            paths.extend(f'{prefix}/anat/{base}_T1w{ext}' for ext in ('.nii.gz', '.json'))
+            paths.extend(
+                f'{prefix}/dwi/{base}_acq-multishell_dwi{ext}'
+                for ext in ('.nii.gz', '.json', '.bval', '.bvec')
+            )
+            paths.extend(
+                f'{prefix}/fmap/{base}_dir-{pe}_epi{ext}'
+                for pe in ('AP', 'PA')
+                for ext in ('.nii.gz', '.json')
+            )
+            for run in range(1, 5):
+                paths.extend(
+                    f'{prefix}/func/{base}_task-rest_run-{run}_{suffix}{ext}'
+                    for suffix, ext in (
+                        ('bold', '.nii.gz'),
+                        ('bold', '.json'),
+                        ('events', '.tsv'),
+                        ('physio', '.tsv.gz'),
+                    )
+                )
+    return paths
+
+
+def bench(label: str, func: Callable[[str], object], paths: list[str], repeat: int = 3) -> float:
+    """Report best-of-N paths per second for a parse function."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:>8}: {len(paths) / best:12,.0f} paths/s ({best:.3f}s)')
+    return best
+
+
+def main(roots: list[str]) -> None:
+    """Run benchmark."""
+    if roots:
+        paths = [path for root in roots for path in dataset_paths(Path(root))]
+    elif EXAMPLES.exists() and any(EXAMPLES.iterdir()):
+        paths = [
+            path
+            for dataset in sorted(EXAMPLES.iterdir())
+            if dataset.is_dir() and not dataset.name.startswith('.')
+            for path in dataset_paths(dataset)
+        ]
+    else:
+        paths = synthetic_paths()
+
+    validator = BIDSValidator()
+    parser = FilenameParser()
+    # Load schemas and compile regular expressions outside of the timed loop
+    validator.parse('/README')
+    parser.parse('/README')
+
+    mismatches = sum(validator.parse(path) != parser.parse(path) for path in paths)
+    print(f'{len(paths)} paths, {mismatches} mismatches')
+
+    regex = bench('regex', validator.parse, paths)
+    tokens = bench('tokens', parser.parse, paths)
+    print(f' speedup: {regex / tokens:.1f}x')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
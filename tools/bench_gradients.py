@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Time the parsing of diffusion gradient tables and event onsets.
+
+Usage: bench_gradients.py [N_FILES] [N_EVENTS]
+
+N_FILES (default 2000) .bvec files of three lines of 300 directions each are
+parsed by splitting lines into Python lists, with numpy.loadtxt, and with
+read_gradient_table. An events file of N_EVENTS (default 50000) rows is
+summarized from a tuple of strings and from its onset column.
+"""
+
+import io
+import sys
+import time
+
+import numpy as np
+
+from bids_validator.gradients import read_gradient_table
+from bids_validator.tsv import read_columns, summarize_values
+
+
+def split_lines(data: bytes) -> np.ndarray:
+    """Parse a table the way load_gradient_table used to."""
+    rows = [line.split() for line in data.decode().splitlines() if line.strip()]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), -1)
+
+
+def summarize_strings(values: tuple[str, ...]) -> tuple[float, float]:
+    """Find the range of onsets by converting each string."""
+    numbers = []
+    for value in values:
+        try:
+            numbers.append(float(value))
+        except ValueError:
+            continue
+    return min(numbers), max(numbers)
+
+
+def main(n_files: int, n_events: int) -> None:
+    """Run benchmark."""
+    rng = np.random.default_rng(0)
+    tables = [
+        '\n'.join(' '.join(f'{x:.6f}' for x in row) for row in rng.normal(size=(3, 300))).encode()
+        + b'\n'
+        for _ in range(n_files)
+    ]
+
+    times = {}
+    for name, parse in [
+        ('split', split_lines),
+        ('loadtxt', lambda data: np.loadtxt(io.BytesIO(data), ndmin=2)),
+        ('numpy', read_gradient_table),
+    ]:
+        start = time.perf_counter()
+        results = [parse(data) for data in tables]
+        times[name] = time.perf_counter() - start
+        if not all(
+            np.array_equal(a, b) for a, b in zip(results, map(split_lines, tables), strict=True)
+        ):
+            sys.exit(f'{name} differs from splitting lines')
+
+    print(f'{n_files} .bvec files of 3 x 300 values')
+    for name, elapsed in times.items():
+        print(f'{name:>8}: {elapsed:.3f} s ({times["split"] / elapsed:.1f}x)')
+
+    onsets = rng.uniform(0, 600, n_events).round(3)
+    data = b'onset\tduration\n' + b''.join(f'{x}\t1\n'.encode() for x in onsets.tolist())
+
+    start = time.perf_counter()
+    column = tuple(read_columns(data, ('onset',))['onset'].tolist())
+    strings = summarize_strings(column)
+    from_strings = time.perf_counter() - start
+
+    start = time.perf_counter()
+    summary = summarize_values(read_columns(data, ('onset',))['onset'])
+    from_array = time.perf_counter() - start
+
+    if strings != (summary.minimum, summary.maximum):
+        sys.exit('Summaries differ')
+    print(f'{n_events} event onsets')
+    print(f'{"strings":>8}: {from_strings:.3f} s')
+    print(f'{"numpy":>8}: {from_array:.3f} s ({from_strings / from_array:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50_000,
+    )
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Measure import time of bids_validator entry points with ``python -X importtime``.
+
+Usage: bench_import.py [MODULE ...]
+
+Reports the median cumulative import time over several fresh interpreters,
+and the slowest modules imported along the way.
+"""
+
+import statistics
+import subprocess
+import sys
+
+TARGETS = ['bids_validator', 'bids_validator.__main__', 'bids_validator.context']
+
+
+def importtime(module: str) -> dict[str, int]:
+    """Import a module in a fresh interpreter and return cumulative times in microseconds."""
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.removeprefix('import time:').split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(modules: list[str], repeat: int = 7, top: int = 5) -> None:
+    """Run benchmark."""
+    for module in modules:
+        runs = [importtime(module) for _ in range(repeat)]
+        total = statistics.median(run[module] for run in runs)
+        print(f'{module}: {total / 1000:.1f} ms')
+        slowest = sorted(runs[-1].items(), key=lambda item: -item[1])
+        for name, cumulative in slowest[1 : top + 1]:
+            print(f'    {cumulative / 1000:7.1f} ms  {name}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or TARGETS)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""Time validation of a dataset in one process and sharded by subject across processes.
+
+Usage: bench_jobs.py [N_SUBJECTS] [JOBS]
+
+A dataset of N_SUBJECTS (default 2000) subjects, each with anatomical,
+functional and diffusion files, one of which is misnamed, is created in a
+temporary directory. It is validated serially and with JOBS (default 4)
+processes, and the outputs are compared.
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bidsschematools.schema import load_schema
+
+from bids_validator.__main__ import validate
+from bids_validator.types.files import FileTree
+
+
+def make_dataset(root: Path, n_subjects: int) -> FileTree:
+    """Create empty files for n_subjects subjects."""
+    (root / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Jobs', 'BIDSVersion': '1.10.1'})
+    )
+    for sub in range(n_subjects):
+        subject = f'sub-{sub:05d}'
+        names = [f'anat/{subject}_T1w.nii.gz', f'anat/{subject}_T1w.json']
+        for run in range(1, 5):
+            names += [
+                f'func/{subject}_task-rest_run-{run}_bold.nii.gz',
+                f'func/{subject}_task-rest_run-{run}_bold.json',
+                f'func/{subject}_task-rest_run-{run}_events.tsv',
+            ]
+        names += [f'dwi/{subject}_dwi.{ext}' for ext in ('nii.gz', 'json', 'bval', 'bvec')]
+        names.append(f'dwi/{subject}_dwi.exe')
+        for name in names:
+            path = root / subject / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+    return FileTree.read_from_filesystem(root)
+
+
+def run(tree: FileTree, jobs: int) -> tuple[str, float]:
+    """Validate a dataset, capturing its output."""
+    schema = load_schema()
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        validate(tree, schema, jobs=jobs)
+    return output.getvalue(), time.perf_counter() - start
+
+
+def main(n_subjects: int, jobs: int) -> None:
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tree = make_dataset(Path(tmpdir), n_subjects)
+        serial, serial_time = run(tree, 1)
+        parallel, parallel_time = run(tree, jobs)
+
+    if parallel != serial:
+        sys.exit('Parallel output differs from serial output')
+    print(f'{n_subjects} subjects, {serial.count(chr(10))} invalid files')
+    print(f'{"serial":>8}: {serial_time:.3f} s')
+    print(f'{f"{jobs} jobs":>8}: {parallel_time:.3f} s ({serial_time / parallel_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4,
+    )
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""Measure sidecar checks per second of a multi-echo functional dataset.
+
+Usage: bench_metadata.py [N_SUBJECTS]
+
+A dataset of N_SUBJECTS subjects (default 20) is generated, each with two
+runs of four-echo BOLD images and a sidecar per echo, inheriting timing,
+hardware and sequence metadata from a top-level sidecar. The fields of each
+file's sidecar that its sidecar rules define are checked by compiling their
+definitions for every check, and with the validators cached per schema.
+"""
+
+import gzip
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import nibabel as nb
+import numpy as np
+from bidsschematools.schema import load_schema
+
+from bids_validator import context
+from bids_validator.metadata import check_sidecar, compile_definition
+from bids_validator.rules import RuleIndex
+from bids_validator.types.files import FileTree
+
+N_ECHOES = 4
+
+TOP_LEVEL = {
+    'TaskName': 'rest',
+    'RepetitionTime': 1.5,
+    'MRAcquisitionType': '2D',
+    'SliceTiming': [round(i * 1.5 / 60, 4) for i in range(60)],
+    'SliceEncodingDirection': 'k',
+    'PhaseEncodingDirection': 'j-',
+    'EffectiveEchoSpacing': 0.00058,
+    'TotalReadoutTime': 0.0452,
+    'FlipAngle': 70,
+    'MultibandAccelerationFactor': 4,
+    'ParallelReductionFactorInPlane': 2,
+    'Manufacturer': 'Siemens',
+    'ManufacturersModelName': 'Prisma',
+    'MagneticFieldStrength': 3,
+    'SoftwareVersions': 'syngo MR XA30',
+    'InstitutionName': 'Institute',
+    'PulseSequenceType': 'Multiband Multiecho Gradient Echo EPI',
+    'ScanningSequence': 'EP',
+    'SequenceVariant': ['SK', 'SS'],
+    'ScanOptions': ['FS'],
+}
+
+
+def make_dataset(root: Path, n_subjects: int) -> None:
+    """Write a multi-echo dataset with small images and per-echo sidecars."""
+    image = nb.Nifti1Image(np.zeros((2, 2, 2, 2), dtype=np.uint8), np.eye(4))
+    data = gzip.compress(image.to_bytes())
+    (root / 'dataset_description.json').write_text(
+        json.dumps({'Name': 'Benchmark', 'BIDSVersion': '1.10.1'})
+    )
+    (root / 'task-rest_bold.json').write_text(json.dumps(TOP_LEVEL))
+    for i in range(1, n_subjects + 1):
+        func = root / f'sub-{i:02d}' / 'func'
+        func.mkdir(parents=True)
+        for run in (1, 2):
+            for echo in range(1, N_ECHOES + 1):
+                stem = f'sub-{i:02d}_task-rest_run-{run}_echo-{echo}_bold'
+                (func / f'{stem}.nii.gz').write_bytes(data)
+                (func / f'{stem}.json').write_text(json.dumps({'EchoTime': 0.0135 * echo}))
+
+
+def run(root: Path) -> None:
+    """Run benchmark."""
+    schema = load_schema()
+    metadata = schema.objects.metadata
+    formats = schema.objects.formats
+    tree = FileTree.read_from_filesystem(root)
+    index = RuleIndex(schema)
+
+    with context.Dataset(tree, schema) as dataset:
+        images = [
+            context.Context(func / name, dataset, None)
+            for sub in sorted(tree.children)
+            if sub.startswith('sub-')
+            for func in [tree / sub / 'func']
+            for name in sorted(func.children)
+            if name.endswith('.nii.gz')
+        ]
+        # Select rules and load sidecars ahead of checking them
+        checks = []
+        for ctx in images:
+            rules = index.select(ctx)
+            sidecar = ctx.sidecar
+            fields = {
+                key: metadata[key].name
+                for rule in rules
+                if rule.name.startswith('sidecars.')
+                for key in rule.definition.fields
+                if metadata[key].name in sidecar
+            }
+            checks.append((ctx, rules, sidecar, fields))
+        n_fields = sum(len(fields) for *_, fields in checks)
+
+        start = time.perf_counter()
+        for _, _, sidecar, fields in checks:
+            for key, name in fields.items():
+                compile_definition(metadata[key], formats)(sidecar[name])
+        compiled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        errors = [check_sidecar(ctx, rules) for ctx, rules, *_ in checks]
+        cached = time.perf_counter() - start
+
+    print(f'{len(images)} sidecars, {n_fields} fields, {sum(map(len, errors))} errors')
+    for label, elapsed in [('compile per check', compiled), ('cached validators', cached)]:
+        print(
+            f'{label:>18}: {len(images) / elapsed:10,.0f} sidecars/s'
+            f' {n_fields / elapsed:12,.0f} fields/s'
+        )
+
+
+def main(argv: list[str]) -> None:
+    """Run benchmark on a generated dataset."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        make_dataset(Path(tmpdir), int(argv[0]) if argv else 20)
+        run(Path(tmpdir))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
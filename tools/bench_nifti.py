@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""Compare header loading through nibabel images, the header-only reader and batches.
+
+Usage: bench_nifti.py [DIRECTORY ...]
+
+NIfTI files are collected from the given directories, falling back to the
+mrs_nifti_standard and bids-examples submodules or, if neither is checked out,
+synthetic images with and without extensions.
+"""
+
+import gzip
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import nibabel as nb
+import numpy as np
+from bidsschematools.types import context as ctx
+from bidsschematools.types.namespace import Namespace
+
+from bids_validator.nifti import read_nifti_header, read_nifti_headers
+
+if TYPE_CHECKING:
+    from _typeshed import SupportsRead
+
+DATA = Path(__file__).parent.parent / 'tests' / 'data'
+SUBMODULES = [DATA / 'mrs_nifti_standard', DATA / 'bids-examples']
+
+
+def nibabel_header(path: Path) -> ctx.NiftiHeader:
+    """Derive a NiftiHeader from a full nibabel image."""
+    img = nb.load(path)
+    freq, phase, slc = (dim + 1 if dim is not None else 0 for dim in img.header.get_dim_info())
+    xyz, t = img.header.get_xyzt_units()
+    if t not in ('unknown', 'sec', 'msec', 'usec'):
+        t = 'unknown'
+    mrs = next((ext for ext in img.header.extensions if ext.get_code() == 44), None)
+    return ctx.NiftiHeader(
+        dim_info=ctx.DimInfo(freq, phase, slc),
+        dim=img.header['dim'],
+        pixdim=img.header['pixdim'],
+        shape=img.shape,
+        voxel_sizes=img.header.get_zooms(),
+        xyzt_units=ctx.XyztUnits(xyz, t),
+        qform_code=int(img.header['qform_code']),
+        sform_code=int(img.header['sform_code']),
+        axis_codes=nb.orientations.aff2axcodes(img.affine),
+        mrs=Namespace(mrs.json()) if mrs is not None else None,
+    )
+
+
+def header_only(path: Path) -> ctx.NiftiHeader:
+    """Read a NiftiHeader with the header-only reader."""
+    with path.open('rb') as fobj:
+        if path.name.endswith('.gz'):
+            with gzip.GzipFile(fileobj=fobj, mode='rb') as gzobj:
+                return read_nifti_header(gzobj)
+        return read_nifti_header(fobj)
+
+
+def batched(paths: list[Path]) -> None:
+    """Read all headers in one batch."""
+    with ExitStack() as stack:
+        fobjs: list[SupportsRead[bytes]] = []
+        for path in paths:
+            fobj = stack.enter_context(path.open('rb'))
+            if path.name.endswith('.gz'):
+                fobj = stack.enter_context(gzip.GzipFile(fileobj=fobj, mode='rb'))
+            fobjs.append(fobj)
+        read_nifti_headers(fobjs)
+
+
+def synthetic_images(root: Path, n_images: int = 200) -> list[Path]:
+    """Write 4D images, half of them compressed, and MRS images with a JSON extension."""
+    paths = []
+    for i in range(n_images):
+        img = nb.Nifti1Image(np.zeros((64, 64, 32, 10), dtype=np.int16), np.eye(4))
+        if i % 4 == 3:
+            img.header.extensions.append(
+                nb.nifti1.Nifti1Extension(44, b'{"ResonantNucleus": ["1H"]}')
+            )
+        path = root / f'img{i}.nii{".gz" if i % 2 else ""}'
+        nb.save(img, path)
+        paths.append(path)
+    return paths
+
+
+def each(func: Callable[[Path], object]) -> Callable[[list[Path]], None]:
+    """Apply a per-file loader to each of a list of files."""
+
+    def load(paths: list[Path]) -> None:
+        for path in paths:
+            func(path)
+
+    return load
+
+
+def bench(
+    label: str, func: Callable[[list[Path]], object], paths: list[Path], repeat: int = 3
+) -> float:
+    """Report best-of-N files per second for a loader of a list of files."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(paths)
+        best = min(best, time.perf_counter() - start)
+    print(f'{label:>12}: {len(paths) / best:10,.0f} files/s ({best:.3f}s)')
+    return best
+
+
+def main(roots: list[str]) -> None:
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        dirs = [Path(root) for root in roots] or [
+            path for path in SUBMODULES if path.exists() and any(path.iterdir())
+        ]
+        paths = sorted(
+            path
+            for root in dirs
+            for pattern in ('*.nii', '*.nii.gz')
+            for path in root.rglob(pattern)
+            if path.stat().st_size >= 348
+        )
+        if not paths:
+            paths = synthetic_images(Path(tmpdir))
+
+        # Warm up imports outside of the timed loops
+        nibabel_header(paths[0])
+        header_only(paths[0])
+
+        compressed = sum(path.name.endswith('.gz') for path in paths)
+        print(f'{len(paths)} files ({compressed} compressed)')
+        for name, subset in (
+            ('all', paths),
+            ('.nii', [p for p in paths if not p.name.endswith('.gz')]),
+            ('.nii.gz', [p for p in paths if p.name.endswith('.gz')]),
+        ):
+            if not subset:
+                continue
+            print(f'{name}:')
+            full = bench('nibabel', each(nibabel_header), subset)
+            light = bench('header-only', each(header_only), subset)
+            batch = bench('batched', batched, subset)
+            print(f'{"speedup":>12}: {full / light:.1f}x, batched {full / batch:.1f}x')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
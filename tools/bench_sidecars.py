@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""Time sidecar lookups for every file of a large functional directory.
+
+Usage: bench_sidecars.py [N_RUNS]
+
+An in-memory dataset with one subject is created, whose ``func/`` directory
+holds N_RUNS (default 500) runs of BOLD images, sidecars, events and
+physiological recordings. Every image is resolved to its sidecars by scanning
+each ancestor directory, as ``walk_back`` used to, and with the per-directory
+index.
+"""
+
+import sys
+import time
+
+import fsspec
+
+from bids_validator import context
+from bids_validator.cache import LoaderCache
+from bids_validator.types.files import FileTree
+
+
+def make_dataset(n_runs: int) -> FileTree:
+    """Create a dataset with n_runs runs of four files each."""
+    mem = fsspec.filesystem('memory')
+    mem.store.clear()
+    files = {'/task-rest_bold.json': b'{}', '/sub-01/sub-01_task-rest_bold.json': b'{}'}
+    for run in range(1, n_runs + 1):
+        prefix = f'/sub-01/func/sub-01_task-rest_run-{run:04d}'
+        files.update(
+            {
+                f'{prefix}_bold.nii.gz': b'',
+                f'{prefix}_bold.json': b'{}',
+                f'{prefix}_events.tsv': b'',
+                f'{prefix}_physio.tsv.gz': b'',
+            }
+        )
+    mem.pipe(files)
+    return FileTree.read_from_filesystem('memory://')
+
+
+def scan(source: FileTree) -> list[FileTree]:
+    """Find sidecars by parsing every file name of every ancestor directory."""
+    source_parts = context.FileParts.from_file(source)
+    sidecars = []
+    tree = source.parent
+    while tree:
+        for child in tree.children.values():
+            parts = context.FileParts.from_file(child)
+            if (
+                not child.is_dir
+                and parts.extension == '.json'
+                and parts.suffix == source_parts.suffix
+                and all(
+                    source_parts.entities.get(key) == value
+                    for key, value in parts.entities.items()
+                )
+            ):
+                sidecars.append(child)
+        tree = tree.parent
+    return sidecars
+
+
+def main(n_runs: int) -> None:
+    """Run benchmark."""
+    dataset = make_dataset(n_runs)
+    func = dataset / 'sub-01' / 'func'
+    images = [child for child in func.children.values() if child.name.endswith('.nii.gz')]
+
+    start = time.perf_counter()
+    expected = [scan(image) for image in images]
+    scanned = time.perf_counter() - start
+
+    with LoaderCache().activate():
+        start = time.perf_counter()
+        actual = [list(context.walk_back(image, inherit=True)) for image in images]
+        indexed = time.perf_counter() - start
+
+    if actual != expected:
+        sys.exit('Indexed lookups differ from scanned lookups')
+    print(f'{len(images)} images in a directory of {len(func.children)} files')
+    print(f'{"scan":>8}: {scanned:.3f} s')
+    print(f'{"index":>8}: {indexed:.3f} s ({scanned / indexed:.0f}x)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""Compare time and peak memory of row-wise and columnar TSV loading.
+
+Usage: bench_tsv.py [N_ROWS]
+
+A participants file with N_ROWS rows (default 500,000) and ten columns is
+written to a temporary directory. Each loader runs in a fresh interpreter,
+so that peak resident set sizes are comparable.
+"""
+
+import random
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+LOADERS = {
+    'load_tsv': 'context.load_tsv(tree)',
+    'load_tsv_columns': 'context.load_tsv_columns(tree)',
+    'load_tsv_columns[participant_id]': "context.load_tsv_columns(tree, ('participant_id',))",
+}
+
+RUNNER = """
+import resource, sys, time
+from bids_validator import context
+from bids_validator.types.files import FileTree
+tree = FileTree.read_from_filesystem(sys.argv[1])
+import numpy  # Loaded by either loader, exclude from timing
+start = time.perf_counter()
+{call}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def write_participants(path: Path, n_rows: int) -> None:
+    """Write a participants file with a mix of short, numeric and free-text columns."""
+    rng = random.Random(0)  # noqa: S311
+    with path.open('w') as fobj:
+        fobj.write(
+            'participant_id\tage\tsex\thandedness\tsite\tscore1\tscore2\tscore3\tgroup\tnotes\n'
+        )
+        for i in range(n_rows):
+            fobj.write(
+                f'sub-{i:06d}\t{rng.randint(18, 90)}\t{rng.choice("MF")}\t{rng.choice("LR")}'
+                f'\tsite{i % 7}\t{rng.random():.4f}\t{rng.random():.4f}\tn/a\tcontrol'
+                f'\tfree text {i}\n'
+            )
+
+
+def measure(call: str, path: Path) -> tuple[float, float]:
+    """Run a loader in a fresh interpreter, returning seconds and peak RSS in MiB."""
+    proc = subprocess.run(  # noqa: S603
+        [sys.executable, '-c', RUNNER.format(call=call), str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, maxrss = proc.stdout.split()
+    return float(elapsed), int(maxrss) / 1024
+
+
+def main(n_rows: int) -> None:
+    """Run benchmark."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / 'participants.tsv'
+        write_participants(path, n_rows)
+        size = path.stat().st_size / 2**20
+        print(f'{n_rows:,} rows, {size:.1f} MiB')
+        baseline = measure('pass', path)[1]
+        print(f'{"interpreter":>34}: {"":>8}  {baseline:7.0f} MiB peak RSS')
+        for label, call in LOADERS.items():
+            elapsed, maxrss = measure(call, path)
+            print(f'{label:>34}: {elapsed:7.2f}s  {maxrss:7.0f} MiB peak RSS')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)